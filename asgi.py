@@ -20,6 +20,13 @@ sys.path.insert(0, str(project_root))
 
 # Import the FastAPI ASGI application
 from src.api.app import app
+from src.api.core.config import PRELOAD_ARTIFACTS
+
+# With gunicorn's preload_app this runs once in the master, before workers fork,
+# so every worker shares the loaded model and data copy-on-write
+if PRELOAD_ARTIFACTS:
+    from src.api.utils.model_loader import preload_artifacts
+    preload_artifacts()
 
 # Verify it's an ASGI app
 if not callable(app):
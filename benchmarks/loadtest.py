@@ -0,0 +1,356 @@
+"""
+Load test /predict and /similar-pokemon against a local server.
+
+Generates open-loop traffic: requests arrive as a Poisson process at a
+fixed offered rate whether or not earlier ones have finished, so a slow
+server builds a queue exactly as it would under real users. Latency is
+measured from each request's scheduled arrival, which keeps queueing
+delay in the numbers. Payloads mix stat lines sampled from the training
+data with uniformly random ones.
+
+The offered rate is stepped up until the server stops keeping up (errors,
+throughput below the offered rate, or p99 above --slo-ms); the last rate
+it sustained is reported as the saturation point.
+
+By default the harness starts its own server for every combination of
+--workers and --explanation-mode and stops it afterwards; pass --url to
+test a server that is already running instead.
+
+Usage:
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --workers 1 --workers 2 --explanation-mode tree --explanation-mode none
+    python -m benchmarks.loadtest --mix predict=0.5,similar=0.5 --rates 50,100,200 --duration 20
+    python -m benchmarks.loadtest --url http://localhost:8000 --output loadtest.json
+
+The load generator shares the machine with the server, so on small hosts
+its own CPU use lowers the saturation point it can find.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from src.api.core.config import FEATURE_NAMES, EXPLANATION_MODES, PROJECT_ROOT
+from src.api.core.logger import set_log_level
+from src.api.utils.model_loader import load_training_data
+from .run import summarize
+
+# The load generator is an async HTTP client
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+ENDPOINTS = {
+    'predict': '/predict',
+    'similar': '/similar-pokemon',
+}
+SERVERS = ('gunicorn', 'uvicorn')
+
+
+# ============================================================================
+# TRAFFIC
+# ============================================================================
+
+class TrafficGenerator:
+    """
+    Endpoint and payload for each request. Stat lines come from the
+    training data with probability `training_fraction` and are uniformly
+    random 1-255 otherwise; a fixed pool is drawn up front so generating
+    traffic costs nothing while the test runs.
+    """
+
+    def __init__(
+        self,
+        mix: Dict[str, float],
+        training_stats: Optional[np.ndarray] = None,
+        training_fraction: float = 0.7,
+        pool_size: int = 10000,
+        seed: int = 0
+    ):
+        rng = np.random.default_rng(seed)
+        rows = rng.integers(1, 256, size=(pool_size, len(FEATURE_NAMES)))
+        if training_stats is not None and len(training_stats):
+            from_training = rng.random(pool_size) < training_fraction
+            picks = rng.integers(0, len(training_stats), size=int(from_training.sum()))
+            rows[from_training] = np.clip(np.rint(training_stats[picks]), 1, 255)
+
+        names = list(mix)
+        weights = np.asarray([mix[name] for name in names], dtype=float)
+        kinds = rng.choice(len(names), size=pool_size, p=weights / weights.sum())
+
+        self.requests: List[Tuple[str, Dict[str, int]]] = [
+            (names[kind], dict(zip(FEATURE_NAMES, map(int, row))))
+            for kind, row in zip(kinds, rows)
+        ]
+        self._position = 0
+
+    def next(self) -> Tuple[str, Dict[str, int]]:
+        request = self.requests[self._position % len(self.requests)]
+        self._position += 1
+        return request
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'predict=0.8,similar=0.2' -> {'predict': 0.8, 'similar': 0.2}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("Mix weights must add up to more than 0")
+    return mix
+
+
+# ============================================================================
+# OPEN-LOOP RUNNER
+# ============================================================================
+
+async def _send(client, endpoint: str, payload: Dict[str, int], scheduled: float, timeout: float):
+    """(endpoint, latency from scheduled arrival, status or None on failure)"""
+    try:
+        response = await client.post(ENDPOINTS[endpoint], json=payload, timeout=timeout)
+        status = response.status_code
+    except httpx.HTTPError:
+        status = None
+    return endpoint, time.perf_counter() - scheduled, status
+
+
+async def run_step(client, traffic: TrafficGenerator, rate: float, duration: float, timeout: float, seed: int = 0) -> Dict[str, Any]:
+    """Offer `rate` requests per second for `duration` seconds and summarize what came back"""
+    rng = np.random.default_rng(seed)
+    arrivals = np.cumsum(rng.exponential(1.0 / rate, size=max(1, int(rate * duration))))
+
+    tasks = []
+    started = time.perf_counter()
+    for offset in arrivals:
+        scheduled = started + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint, payload = traffic.next()
+        tasks.append(asyncio.create_task(_send(client, endpoint, payload, scheduled, timeout)))
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    ok = [latency for _, latency, status in results if status == 200]
+    shed = sum(1 for _, _, status in results if status == 503)
+    failed = len(results) - len(ok) - shed
+
+    step = {"offered_rps": rate, "requests": len(results), "ok": len(ok), "shed_503": shed, "errors": failed}
+    step["error_rate"] = round((shed + failed) / len(results), 4)
+    if ok:
+        step.update(summarize(ok, elapsed))
+        step["achieved_rps"] = step.pop("throughput_per_s")
+        step.pop("iterations")
+        step["max_us"] = round(max(ok) * 1e6, 2)
+    step["by_endpoint"] = {}
+    for endpoint in sorted({name for name, _, _ in results}):
+        latencies = [latency for name, latency, status in results if name == endpoint and status == 200]
+        if latencies:
+            summary = summarize(latencies, elapsed)
+            step["by_endpoint"][endpoint] = {"ok": summary["iterations"], "p50_us": summary["p50_us"], "p99_us": summary["p99_us"]}
+    return step
+
+
+def sustained(step: Dict[str, Any], slo_ms: float, max_error_rate: float) -> bool:
+    """Whether the server kept up with a step's offered load"""
+    return (
+        step["error_rate"] <= max_error_rate
+        and step.get("achieved_rps", 0) >= 0.9 * step["offered_rps"]
+        and step.get("p99_us", float("inf")) <= slo_ms * 1000
+    )
+
+
+async def sweep(base_url: str, traffic: TrafficGenerator, rates: Sequence[float], args) -> Dict[str, Any]:
+    """Step through `rates` until the server saturates (or through all of them with --full-curve)"""
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    steps = []
+    saturation = None
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        # Warm up connections and first-request code paths
+        await run_step(client, traffic, rate=min(rates[0], 20), duration=1.0, timeout=args.timeout)
+        for i, rate in enumerate(rates):
+            step = await run_step(client, traffic, rate, args.duration, args.timeout, seed=i + 1)
+            step["sustained"] = sustained(step, args.slo_ms, args.max_error_rate)
+            steps.append(step)
+            _report_step(step)
+            if step["sustained"]:
+                saturation = rate
+            elif not args.full_curve:
+                break
+    return {"steps": steps, "saturation_rps": saturation}
+
+
+# ============================================================================
+# LOCAL SERVER
+# ============================================================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server: str, workers: int, port: int) -> List[str]:
+    """Command line matching the deployed setup (Procfile) for a worker count"""
+    if server == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(workers), "--log-level", "warning"]
+    return [sys.executable, "-m", "gunicorn", "asgi:app", "--workers", str(workers),
+            "--worker-class", "uvicorn.workers.UvicornWorker", "--bind", f"127.0.0.1:{port}",
+            "--timeout", "120", "--log-level", "warning"]
+
+
+@contextmanager
+def local_server(server: str, workers: int, explanation_mode: str, cold: bool, log_path: str,
+                 startup_timeout: float = 120.0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Start a server for one configuration; yields (base URL, /health) once it is ready"""
+    port = _free_port()
+    env = {**os.environ, "EXPLANATION_MODE": explanation_mode, "LOG_LEVEL": "WARNING"}
+    if cold:
+        # Every request computes its answer instead of hitting a lookup
+        env.update({"CACHE_CAPACITY": "0", "ANSWER_TABLE_PATH": ""})
+
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            server_command(server, workers, port), cwd=str(PROJECT_ROOT), env=env,
+            stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+        )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        health = _wait_until_ready(base_url, process, startup_timeout)
+        yield base_url, health
+    finally:
+        # The server runs in its own session, so this reaches every worker
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=15)
+        except ProcessLookupError:
+            pass
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> Dict[str, Any]:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode} before becoming ready")
+        try:
+            health = httpx.get(f"{base_url}/health", timeout=2.0).json()
+            if health.get("ready", True) and health.get("model_loaded"):
+                return health
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} not ready after {timeout}s")
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def _report_step(step: Dict[str, Any]):
+    if "p50_us" in step:
+        latency = f"p50 {step['p50_us'] / 1000:8.1f}ms  p95 {step['p95_us'] / 1000:8.1f}ms  p99 {step['p99_us'] / 1000:8.1f}ms"
+        achieved = f"{step['achieved_rps']:8.1f}"
+    else:
+        latency, achieved = "no successful requests", "     0.0"
+    print(
+        f"  offered {step['offered_rps']:8.1f}/s  achieved {achieved}/s  {latency}  "
+        f"errors {step['error_rate']:.1%}  {'ok' if step['sustained'] else 'SATURATED'}",
+        file=sys.stderr
+    )
+
+
+def ramp(start: float, maximum: float, growth: float) -> List[float]:
+    rates = []
+    rate = start
+    while rate <= maximum:
+        rates.append(round(rate, 1))
+        rate *= growth
+    return rates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the request rate a server sustains before latency breaks down")
+    parser.add_argument("--url", help="Test this running server instead of starting one per configuration")
+    parser.add_argument("--server", choices=SERVERS, default="gunicorn", help="Server to start (default: gunicorn)")
+    parser.add_argument("--workers", type=int, action="append", help="Worker processes to test (repeatable, default: 1)")
+    parser.add_argument("--explanation-mode", action="append", choices=EXPLANATION_MODES,
+                        help="Explainer modes to test (repeatable, default: auto)")
+    parser.add_argument("--cold", action="store_true", help="Disable the response cache and answer table on started servers")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("predict=0.8,similar=0.2"),
+                        help="Endpoint weights (default: predict=0.8,similar=0.2)")
+    parser.add_argument("--training-fraction", type=float, default=0.7,
+                        help="Share of stat lines sampled from the training data (default: 0.7)")
+    parser.add_argument("--rates", help="Comma-separated offered rates in requests/s (default: ramp)")
+    parser.add_argument("--start-rate", type=float, default=25, help="First rate of the ramp (default: 25)")
+    parser.add_argument("--max-rate", type=float, default=3200, help="Last rate of the ramp (default: 3200)")
+    parser.add_argument("--growth", type=float, default=2.0, help="Ramp multiplier per step (default: 2)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step (default: 10)")
+    parser.add_argument("--full-curve", action="store_true", help="Keep stepping after the server saturates")
+    parser.add_argument("--slo-ms", type=float, default=250.0, help="p99 latency a sustained step must meet (default: 250)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Errors and 503s a sustained step may have (default: 0.01)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--max-connections", type=int, default=512, help="Client connection pool size (default: 512)")
+    parser.add_argument("--server-log", default="loadtest-server.log", help="Where started servers log (default: loadtest-server.log)")
+    parser.add_argument("--output", help="Write results JSON here")
+    args = parser.parse_args(argv)
+
+    if not HTTPX_AVAILABLE:
+        raise SystemExit("The load generator needs httpx (pip install httpx)")
+
+    set_log_level("WARNING")
+    rates = [float(r) for r in args.rates.split(",")] if args.rates else ramp(args.start_rate, args.max_rate, args.growth)
+    index = load_training_data(shared_dir=None)
+    traffic = TrafficGenerator(
+        args.mix, training_stats=np.asarray(index.stats) if index is not None else None,
+        training_fraction=args.training_fraction
+    )
+
+    runs = []
+    if args.url:
+        print(f"{args.url}", file=sys.stderr)
+        runs.append({"url": args.url, **asyncio.run(sweep(args.url, traffic, rates, args))})
+    else:
+        for workers in args.workers or [1]:
+            for mode in args.explanation_mode or ["auto"]:
+                config = {"server": args.server, "workers": workers, "explanation_mode": mode, "cold": args.cold}
+                print(f"{args.server} workers={workers} explanation_mode={mode}{' cold' if args.cold else ''}", file=sys.stderr)
+                with local_server(args.server, workers, mode, args.cold, args.server_log) as (base_url, health):
+                    config["explanation_method"] = health.get("explanation_method")
+                    runs.append({**config, **asyncio.run(sweep(base_url, traffic, rates, args))})
+
+    print("\nSaturation points", file=sys.stderr)
+    for run in runs:
+        label = run.get("url") or f"{run['server']} workers={run['workers']} explanation_mode={run['explanation_mode']}"
+        saturation = run["saturation_rps"]
+        print(f"  {label:<56} {f'{saturation:.1f} req/s' if saturation else 'below the first rate'}", file=sys.stderr)
+
+    if args.output:
+        report = {
+            "mix": args.mix, "training_fraction": args.training_fraction, "duration": args.duration,
+            "slo_ms": args.slo_ms, "max_error_rate": args.max_error_rate, "cpu_count": os.cpu_count(), "runs": runs
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,476 @@
+"""
+Benchmark the request path and compare against a stored baseline.
+
+Covers the per-request building blocks (feature preparation, confidence,
+fallback and SHAP contributions for every explainer mode, similarity
+search) and end-to-end /predict through an in-process ASGI client at
+several concurrency levels. Results are written as JSON with p50/p95/p99
+latency, throughput and peak allocated memory per benchmark.
+
+The prediction cache and answer table are bypassed, so every call does the
+full computation rather than measuring a lookup.
+
+Usage:
+    python -m benchmarks.run                              # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --only predict --concurrency 1 --concurrency 16
+    python -m benchmarks.run --save-baseline              # record a new baseline
+
+Exits with status 1 when a benchmark regressed beyond --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+import numpy as np
+
+from src.api.core.config import FEATURE_NAMES, EXPLANATION_MODES
+from src.api.core.logger import set_log_level
+from src.api.core.schemas import PokemonStats, PredictionResponse, PredictionSummary, ResponseDetail, SimilarityMetric
+from src.api.utils.metrics import process_memory
+from src.api.utils.model_loader import compute_model_version, initialize_shap_explainer, load_training_data
+from src.api.utils.pipeline import InferencePipeline
+from src.api.utils.registry import load_model_version
+from src.api.utils.responses import dump_model, model_response
+from src.api.utils.prediction import (
+    FALLBACK_METHOD, calculate_confidence, calculate_fallback_contributions,
+    calculate_fallback_contributions_batch, calculate_shap_contributions
+)
+
+# The end-to-end benchmark needs httpx for the in-process ASGI client
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Explainer modes worth timing separately ('auto' resolves to one of these)
+SHAP_MODES = [mode for mode in EXPLANATION_MODES if mode not in ('auto', 'none')]
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def summarize(latencies: Sequence[float], elapsed: float, peak_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Percentiles in microseconds plus calls per second over `elapsed` seconds"""
+    values = np.asarray(latencies) * 1e6
+    result = {
+        "iterations": len(values),
+        "p50_us": round(float(np.percentile(values, 50)), 2),
+        "p95_us": round(float(np.percentile(values, 95)), 2),
+        "p99_us": round(float(np.percentile(values, 99)), 2),
+        "mean_us": round(float(values.mean()), 2),
+        "throughput_per_s": round(len(values) / elapsed, 1) if elapsed > 0 else None,
+    }
+    if peak_bytes is not None:
+        result["peak_alloc_kb"] = round(peak_bytes / 1024, 1)
+    return result
+
+
+def _peak_allocation(call: Callable[[Any], Any], inputs: Sequence[Any], samples: int) -> int:
+    """Peak traced allocation over a few calls (tracing is too slow to leave on while timing)"""
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            call(inputs[i % len(inputs)])
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(
+    call: Callable[[Any], Any],
+    inputs: Sequence[Any],
+    iterations: int,
+    max_seconds: float,
+    warmup: int = 10
+) -> Dict[str, Any]:
+    """
+    Time `call` over `inputs` (cycled) for up to `iterations` calls or
+    `max_seconds`, whichever comes first; slow paths still get 5 samples.
+    """
+    for i in range(min(warmup, iterations)):
+        call(inputs[i % len(inputs)])
+
+    latencies: List[float] = []
+    started = time.perf_counter()
+    deadline = started + max_seconds
+    for i in range(iterations):
+        begin = time.perf_counter()
+        call(inputs[i % len(inputs)])
+        end = time.perf_counter()
+        latencies.append(end - begin)
+        if end > deadline and len(latencies) >= 5:
+            break
+    elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed, _peak_allocation(call, inputs, min(20, len(latencies))))
+
+
+# ============================================================================
+# COMPONENT BENCHMARKS
+# ============================================================================
+
+def sample_stats(count: int, seed: int = 0) -> List[PokemonStats]:
+    """Deterministic stat lines covering the usual range of base stats"""
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(20, 201, size=(count, len(FEATURE_NAMES)))
+    return [PokemonStats(**dict(zip(FEATURE_NAMES, map(int, row)))) for row in rows]
+
+
+def component_benchmarks(inputs: List[PokemonStats], iterations: int, max_seconds: float, selected) -> Dict[str, Any]:
+    """Benchmark each building block of /predict and /similar-pokemon on its own"""
+    version = load_model_version()
+    model, scaler, pipeline = version.model, version.scaler, version.pipeline
+    feature_importance = version.feature_importance
+    # The same pipeline calling the scaler's own transform()
+    unfused = InferencePipeline(model, scaler, version.compiled_model, fuse_scaler=False)
+
+    # Precompute what each stage receives so only that stage is timed
+    scored = [pipeline.score([stats]) for stats in inputs]
+    features = [s[0] for s in scored]
+    predictions = [int(s[1][0]) for s in scored]
+    probabilities = [float(s[2][0]) for s in scored]
+    non_legendary = [float(s[3][0]) for s in scored]
+    rows = list(range(len(inputs)))
+
+    benchmarks: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {
+        "prepare_features": lambda: measure(
+            lambda i: pipeline.features([inputs[i]]), rows, iterations, max_seconds
+        ),
+        # Scaling plus model inference, through sklearn's transform() and fused
+        "prepare_and_predict": lambda: measure(
+            lambda i: unfused.score([inputs[i]]), rows, iterations, max_seconds
+        ),
+        "inference_pipeline": lambda: measure(
+            lambda i: pipeline.score([inputs[i]]), rows, iterations, max_seconds
+        ),
+        f"inference_pipeline[{len(inputs)}]": lambda: measure(
+            lambda _: pipeline.score(inputs), [None], max(1, iterations // 20), max_seconds
+        ),
+        "calculate_confidence": lambda: measure(
+            lambda i: calculate_confidence(probabilities[i]), rows, iterations, max_seconds
+        ),
+        "calculate_fallback_contributions": lambda: measure(
+            lambda i: calculate_fallback_contributions(inputs[i], predictions[i], probabilities[i], feature_importance),
+            rows, iterations, max_seconds
+        ),
+        # One call over every input row; per-row cost is p50 / len(inputs)
+        f"calculate_fallback_contributions_batch[{len(inputs)}]": lambda: measure(
+            lambda _: calculate_fallback_contributions_batch(inputs, predictions, probabilities, feature_importance),
+            [None], max(1, iterations // 20), max_seconds
+        ),
+    }
+
+    for mode in SHAP_MODES:
+        def shap_benchmark(mode=mode):
+            explainer = initialize_shap_explainer(model, mode=mode, scaler=scaler)
+            if explainer is None:
+                return None
+            return measure(
+                lambda i: calculate_shap_contributions(
+                    features[i], inputs[i], predictions[i], probabilities[i], feature_importance, explainer
+                ),
+                rows, iterations, max_seconds
+            )
+        benchmarks[f"calculate_shap_contributions[{mode}]"] = shap_benchmark
+
+    def similarity_benchmark():
+        from src.api.routes.predict import find_similar_pokemon, state, cache
+        index = load_training_data()
+        if index is None:
+            return None
+        state['training_data'] = index
+        cache.capacity = 0
+        options = dict(k=5, metric=SimilarityMetric.euclidean, legendary=None, min_bst=None, max_bst=None)
+        loop = asyncio.new_event_loop()
+        try:
+            return measure(
+                lambda i: loop.run_until_complete(find_similar_pokemon(inputs[i], **options)),
+                rows, iterations, max_seconds
+            )
+        finally:
+            loop.close()
+    benchmarks["find_similar_pokemon"] = similarity_benchmark
+
+    # Index queries with each metric and with filters narrowing the candidate rows
+    vectors = [[getattr(stats, name) for name in FEATURE_NAMES] for stats in inputs]
+    similarity_queries = {
+        "euclidean": {},
+        "standardized": {"metric": "standardized"},
+        "cosine": {"metric": "cosine"},
+        "bst_range": {"min_bst": 450, "max_bst": 550},
+        "legendary": {"legendary": True},
+        "k=50": {"k": 50},
+    }
+    for label, query in similarity_queries.items():
+        def query_benchmark(query=query):
+            index = load_training_data()
+            if index is None:
+                return None
+            return measure(lambda i: index.query(vectors[i], **query), rows, iterations, max_seconds)
+        benchmarks[f"similarity_query[{label}]"] = query_benchmark
+
+    # Returning a finished /predict response from a route: FastAPI's
+    # response_model pass (validate the object again, then serialize) vs
+    # model_response(). Called as raw ASGI, so only framework work is timed
+    responses = [
+        PredictionResponse(
+            prediction=predictions[i], probability_legendary=probabilities[i],
+            probability_non_legendary=non_legendary[i], confidence=calculate_confidence(probabilities[i]),
+            stats=dump_model(inputs[i]), explanation_method=FALLBACK_METHOD,
+            feature_contributions=calculate_fallback_contributions(inputs[i], predictions[i], probabilities[i], feature_importance)
+        )
+        for i in rows
+    ]
+
+    def render_benchmark(fast: bool):
+        from fastapi import FastAPI
+        app = FastAPI()
+
+        @app.post("/{i}", response_model=Union[PredictionResponse, PredictionSummary], response_model_exclude_none=True)
+        async def respond(i: int):
+            return model_response(responses[i]) if fast else responses[i]
+
+        loop = asyncio.new_event_loop()
+        try:
+            return measure(lambda i: loop.run_until_complete(_asgi_post(app, f"/{i}")), rows, iterations, max_seconds)
+        finally:
+            loop.close()
+    benchmarks["render_response[response_model]"] = lambda: render_benchmark(fast=False)
+    benchmarks["render_response[model_response]"] = lambda: render_benchmark(fast=True)
+
+    results = {}
+    for name, benchmark in benchmarks.items():
+        if not _selected(name, selected):
+            continue
+        result = benchmark()
+        results[name] = result if result is not None else {"skipped": "not available in this environment"}
+        _report(name, results[name])
+    return results
+
+
+async def _asgi_post(app, path: str) -> bytes:
+    """POST an empty body straight to an ASGI app; returns the response body"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "client": ("bench", 0), "server": ("bench", 80)
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+# ============================================================================
+# END-TO-END BENCHMARK
+# ============================================================================
+
+async def _predict_run(client, payloads: List[Dict[str, int]], requests: int, concurrency: int, path: str = "/predict") -> Dict[str, Any]:
+    """`concurrency` clients sharing `requests` POST calls to `path`"""
+    latencies: List[float] = []
+    failures = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal failures
+        for i in remaining:
+            begin = time.perf_counter()
+            response = await client.post(path, json=payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - begin)
+            if response.status_code != 200:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = summarize(latencies, elapsed)
+    result["concurrency"] = concurrency
+    result["failures"] = failures
+    return result
+
+
+async def _predict_benchmarks(inputs: List[PokemonStats], requests: int, levels: Sequence[int], details: Sequence[str]) -> Dict[str, Any]:
+    from src.api.app import app, startup_event, shutdown_event
+    from src.api.routes.predict import cache, set_answer_table
+
+    await startup_event()
+    # Measure the computation, not cache or answer-table lookups
+    cache.capacity = 0
+    set_answer_table(None)
+
+    payloads = [stats.dict() for stats in inputs]
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            await _predict_run(client, payloads, min(20, requests), 1)
+            for detail in details:
+                # The default detail keeps the plain name so baselines stay comparable
+                path = "/predict" if detail == "contributions" else f"/predict?detail={detail}"
+                label = "" if detail == "contributions" else f"detail={detail},"
+                for concurrency in levels:
+                    name = f"predict_e2e[{label}c={concurrency}]"
+                    tracemalloc.start()
+                    try:
+                        await _predict_run(client, payloads, min(20, requests), concurrency, path)
+                        peak = tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+                    results[name] = await _predict_run(client, payloads, requests, concurrency, path)
+                    results[name]["peak_alloc_kb"] = round(peak / 1024, 1)
+                    _report(name, results[name])
+    finally:
+        await shutdown_event()
+    return results
+
+
+def predict_benchmarks(inputs: List[PokemonStats], requests: int, levels: Sequence[int], details: Sequence[str]) -> Dict[str, Any]:
+    """End-to-end /predict (validation, routing, inference pool, serialization) in process"""
+    if not HTTPX_AVAILABLE:
+        print("Skipping end-to-end benchmarks: httpx is not installed", file=sys.stderr)
+        return {}
+    return asyncio.run(_predict_benchmarks(inputs, requests, levels, details))
+
+
+# ============================================================================
+# BASELINE COMPARISON
+# ============================================================================
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_us: float) -> List[Dict[str, Any]]:
+    """
+    Compare p50 and p95 of every benchmark present in both runs. A
+    benchmark regressed when it is slower by more than `tolerance`
+    (a fraction) and by more than `min_delta_us`, so noise on very
+    fast paths is not reported.
+    """
+    rows = []
+    for name, result in current.get("benchmarks", {}).items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before or "p50_us" not in before or "p50_us" not in result:
+            continue
+        row = {"benchmark": name, "regressed": False}
+        for key in ("p50_us", "p95_us"):
+            old, new = before[key], result[key]
+            row[key] = {"baseline": old, "current": new, "change": round(new / old - 1, 4) if old else None}
+            if new > old * (1 + tolerance) and new - old > min_delta_us:
+                row["regressed"] = True
+        rows.append(row)
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    print(f"\n{'benchmark':<48} {'p50 base':>10} {'p50 now':>10} {'change':>8} {'p95 base':>10} {'p95 now':>10} {'change':>8}", file=sys.stderr)
+    for row in rows:
+        columns = []
+        for key in ("p50_us", "p95_us"):
+            values = row[key]
+            change = f"{values['change']:+.1%}" if values["change"] is not None else "n/a"
+            columns.append(f"{values['baseline']:>10.1f} {values['current']:>10.1f} {change:>8}")
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{row['benchmark']:<48} {' '.join(columns)}{flag}", file=sys.stderr)
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def _selected(name: str, selected) -> bool:
+    return not selected or any(part in name for part in selected)
+
+
+def _report(name: str, result: Dict[str, Any]):
+    if "skipped" in result:
+        print(f"{name:<48} skipped ({result['skipped']})", file=sys.stderr)
+    else:
+        print(
+            f"{name:<48} p50 {result['p50_us']:>10.1f}us  p95 {result['p95_us']:>10.1f}us  "
+            f"p99 {result['p99_us']:>10.1f}us  {result['throughput_per_s']:>10.1f}/s",
+            file=sys.stderr
+        )
+
+
+def environment() -> Dict[str, Any]:
+    """Where the numbers came from; baselines are only comparable on similar machines"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "model_version": compute_model_version(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the API hot paths")
+    parser.add_argument("--only", action="append", help="Run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Max calls per component benchmark (default: 2000)")
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="Time budget per component benchmark (default: 3)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per end-to-end run (default: 500)")
+    parser.add_argument("--concurrency", type=int, action="append", help="End-to-end concurrency levels (default: 1, 8, 32)")
+    parser.add_argument("--detail", action="append", choices=[d.value for d in ResponseDetail],
+                        help="/predict response detail levels (repeatable, default: contributions, probability)")
+    parser.add_argument("--inputs", type=int, default=256, help="Distinct stat lines to cycle through (default: 256)")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown as a fraction (default: 0.25)")
+    parser.add_argument("--min-delta-us", type=float, default=20.0, help="Ignore slowdowns smaller than this (default: 20us)")
+    args = parser.parse_args(argv)
+
+    set_log_level("WARNING")
+    inputs = sample_stats(max(1, args.inputs))
+
+    results = component_benchmarks(inputs, args.iterations, args.max_seconds, args.only)
+    if _selected("predict_e2e", args.only):
+        results.update(predict_benchmarks(
+            inputs, args.requests, args.concurrency or [1, 8, 32], args.detail or ["contributions", "probability"]
+        ))
+
+    report = {"environment": environment(), "benchmarks": results, "process": process_memory()}
+    report["process"].pop("pid", None)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}", file=sys.stderr)
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return
+    with open(args.baseline) as f:
+        rows = compare(report, json.load(f), args.tolerance, args.min_delta_us)
+    print_comparison(rows)
+    regressed = [row["benchmark"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"\nRegressed: {', '.join(regressed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Gunicorn configuration, picked up automatically from the project root.
+
+Set PRELOAD_ARTIFACTS=1 to import the app (and load the model, scaler,
+explainer and training data) once in the master process before forking.
+Workers then share those pages copy-on-write instead of each holding a
+private copy, so worker count is bounded by CPU rather than RAM.
+"""
+
+import os
+
+preload_app = os.getenv("PRELOAD_ARTIFACTS", "false").lower() in ("1", "true", "yes")
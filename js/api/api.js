@@ -5,9 +5,10 @@
 import { logger } from '../utils/logger.js';
 import { CONFIG } from '../config/config.js';
 
-export async function predictLegendary(stats) {
+// Prediction, contributions and similar Pokémon in one round-trip
+export async function analyzePokemon(stats) {
     try {
-        const response = await fetch(`${CONFIG.API_BASE_URL}/predict`, {
+        const response = await fetch(`${CONFIG.API_BASE_URL}/analyze`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -50,21 +51,3 @@ export async function checkHealthStatus() {
         return false;
     }
 }
-
-export async function getSimilarPokemon(stats) {
-    try {
-        const response = await fetch(`${CONFIG.API_BASE_URL}/similar-pokemon`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(stats)
-        });
-        
-        if (response.ok) {
-            return await response.json();
-        }
-    } catch (error) {
-        logger.warn('Could not fetch similar Pokémon:', error);
-    }
-    
-    return null;
-}
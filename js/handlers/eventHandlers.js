@@ -5,7 +5,7 @@
 import { logger } from '../utils/logger.js';
 import { elements, getNumberInputs } from '../dom/domElements.js';
 import { validateInputs, getStatInputs as getValidatedStats } from '../utils/validation.js';
-import { predictLegendary, fetchFeatureImportance, getSimilarPokemon } from '../api/api.js';
+import { analyzePokemon } from '../api/api.js';
 import { showError, clearError } from '../ui/notifications.js';
 import { updatePredictionDisplay, updateConfidenceDisplay, updateModelInfo } from '../ui/uiUpdate.js';
 import { renderFeatureContributions, updateComparisonChart, displaySimilarPokemon, updateRadarChart } from '../ui/visualizations.js';
@@ -24,7 +24,8 @@ export async function handlePredict() {
     const pokemonName = elements.name.value.trim();
     
     try {
-        const result = await predictLegendary(stats);
+        const analysis = await analyzePokemon(stats);
+        const result = analysis.prediction;
         
         updatePredictionDisplay(
             result.prediction,
@@ -36,8 +37,7 @@ export async function handlePredict() {
         updateComparisonChart(stats, result.prediction);
         updateModelInfo(result.model_type, result.explanation_method);
         
-        const similarData = await getSimilarPokemon(stats);
-        displaySimilarPokemon(similarData);
+        displaySimilarPokemon(analysis.similar || null);
         
         renderFeatureContributions(result.feature_contributions, result.explanation_method);
         
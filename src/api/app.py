@@ -11,18 +11,35 @@ Modular structure:
 - src/frontend/: Frontend files (HTML, CSS, JS)
 """
 
+import time
+from contextlib import contextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
 
 from src.api.core.config import (
     API_TITLE, API_DESCRIPTION, API_VERSION,
-    CORS_ORIGINS, CORS_CREDENTIALS, CORS_METHODS, CORS_HEADERS
+    CORS_ORIGINS, CORS_CREDENTIALS, CORS_METHODS, CORS_HEADERS,
+    MICRO_BATCH_ENABLED, STARTUP_MODE, STARTUP_MODES, ADMIN_TOKEN
 )
+from src.api.core.logger import get_logger
 from src.api.utils.model_loader import (
-    load_model, load_scaler, load_feature_importance,
-    load_training_data, extract_feature_importance, initialize_shap_explainer
+    load_model, compute_model_version, load_scaler, load_feature_importance,
+    load_training_data, extract_feature_importance, initialize_shap_explainer,
+    load_compiled_model, get_preloaded_artifacts
+)
+from src.api.routes.predict import (
+    router, state, registry, set_state, attach_answer_table, register_component, start_inference_executor,
+    stop_inference_executor, start_micro_batcher, stop_micro_batcher, start_model_watcher,
+    stop_model_watcher, MODEL_VERSION_HEADER
 )
-from src.api.routes.predict import router, set_state
+from src.api.routes.admin import router as admin_router
+from src.api.routes.metrics import router as metrics_router
+from src.api.routes.stream import router as stream_router
+from src.api.utils.metrics import REQUEST_COUNT, REQUEST_ERRORS, REQUEST_LATENCY
+
+logger = get_logger("app")
 
 
 # ============================================================================
@@ -47,48 +64,188 @@ app.add_middleware(
 
 # Include routes
 app.include_router(router)
+# Admin endpoints load pickles and swap models, so they exist only behind a token
+if ADMIN_TOKEN:
+    app.include_router(admin_router)
+app.include_router(metrics_router)
+app.include_router(stream_router)
+
+
+# ============================================================================
+# REQUEST METRICS
+# ============================================================================
+
+class RequestMetricsMiddleware:
+    """
+    Count requests and errors and time them, labelled by route template.
+
+    A plain ASGI middleware rather than @app.middleware("http"): that one
+    returns as soon as the response headers are ready, so a streamed body
+    would be timed without its streaming. Here the clock stops at the final
+    body message.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        recorded = False
+
+        def record(failed: bool = False):
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            method = scope["method"]
+            path = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_COUNT.inc(method, path, status)
+            REQUEST_LATENCY.observe(method, path, value=time.perf_counter() - started)
+            if failed or status >= 500:
+                REQUEST_ERRORS.inc(method, path)
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Prediction endpoints name the exact version that answered; default to the active one
+                headers = MutableHeaders(scope=message)
+                if state['model_version'] is not None and MODEL_VERSION_HEADER not in headers:
+                    headers[MODEL_VERSION_HEADER] = state['model_version']
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except BaseException:
+            record(failed=True)
+            raise
+        # A response that never sent its final body (e.g. the client went away)
+        record()
+
+
+app.add_middleware(RequestMetricsMiddleware)
 
 
 # ============================================================================
 # STARTUP EVENT
 # ============================================================================
 
-@app.on_event("startup")
-async def startup_event():
-    """Load models and data on application startup"""
-    print("🚀 Starting Legendary Pokémon Classifier API...")
-    
+@contextmanager
+def startup_phase(name: str):
+    """Log how long a startup phase takes"""
+    started = time.perf_counter()
+    yield
+    logger.info("Startup phase complete", extra={"phase": name, "seconds": round(time.perf_counter() - started, 4)})
+
+
+def load_artifacts(startup_mode: str):
+    """Load artifacts in this process and set route state; returns (model, model_version)"""
     # Load model (required)
     model = None
-    try:
-        model = load_model()
-    except Exception as e:
-        print(f"❌ Critical error loading model: {str(e)}")
+    model_version = None
+    with startup_phase("model"):
+        try:
+            model = load_model()
+            model_version = compute_model_version()
+        except Exception as e:
+            logger.critical("Critical error loading model: %s", e)
     
     # Load scaler (optional)
-    scaler = load_scaler()
+    with startup_phase("scaler"):
+        scaler = load_scaler()
+    
+    # Flatten tree ensembles for fast small-batch inference (checked against sklearn)
+    with startup_phase("compile_model"):
+        compiled_model = load_compiled_model(model, scaler)
     
     # Load or compute feature importance
     feature_importance = None
-    shap_explainer = None
     
     if model is not None:
-        feature_importance = load_feature_importance()
-        if feature_importance is None:
-            feature_importance = extract_feature_importance(model)
-        
+        with startup_phase("feature_importance"):
+            feature_importance = load_feature_importance()
+            if feature_importance is None:
+                feature_importance = extract_feature_importance(model)
+    else:
+        logger.warning("Skipping feature importance and SHAP initialization (model not loaded)")
+    
+    def build_explainer():
+        return initialize_shap_explainer(model, scaler=scaler) if model is not None else None
+    
+    if startup_mode == "eager":
         # Initialize SHAP explainer
-        shap_explainer = initialize_shap_explainer(model)
+        with startup_phase("shap_explainer"):
+            shap_explainer = build_explainer()
+        
+        # Load training data for similar Pokemon lookup
+        with startup_phase("training_data"):
+            training_data = load_training_data()
+        
+        set_state(model, scaler, feature_importance, shap_explainer, training_data, model_version, compiled_model)
+    else:
+        # Serve immediately; explainer and training data load later
+        set_state(model, scaler, feature_importance, None, None, model_version, compiled_model)
+        background = startup_mode == "background"
+        register_component('shap_explainer', build_explainer, background=background)
+        register_component('training_data', load_training_data, background=background)
+    
+    return model, model_version
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Load models and data on application startup"""
+    started = time.perf_counter()
+    startup_mode = STARTUP_MODE if STARTUP_MODE in STARTUP_MODES else "eager"
+    preloaded = get_preloaded_artifacts()
+    if preloaded:
+        startup_mode = "preloaded"
+    logger.info("Starting Legendary Pokémon Classifier API", extra={"startup_mode": startup_mode})
+    
+    if preloaded:
+        # Attach to the artifacts the gunicorn master loaded before forking
+        model = preloaded['model']
+        model_version = preloaded['model_version']
+        set_state(
+            model, preloaded['scaler'], preloaded['feature_importance'],
+            preloaded['shap_explainer'], preloaded['training_data'], model_version,
+            preloaded['compiled_model']
+        )
     else:
-        print("⚠️ Skipping feature importance and SHAP initialization (model not loaded)")
+        model, model_version = load_artifacts(startup_mode)
+    
+    # Attach precomputed answers if they were built for this model and explainer
+    # (with a deferred explainer, once it has loaded)
+    with startup_phase("answer_table"):
+        attach_answer_table(registry.active)
+    
+    # Run model and SHAP work in a bounded pool instead of on the event loop
+    executor = start_inference_executor()
+    logger.info("Inference pool ready", extra={"workers": executor.max_workers, "max_pending": executor.max_pending})
+    
+    # Queue concurrent /predict calls into micro-batches if enabled
+    if MICRO_BATCH_ENABLED and model is not None:
+        batcher = start_micro_batcher()
+        logger.info("Micro-batching enabled", extra={"window_ms": batcher.window * 1000, "max_batch_size": batcher.max_batch_size})
     
-    # Load training data for similar Pokemon lookup
-    training_data = load_training_data()
+    # Load and swap in new model versions when the artifact files change
+    watcher = start_model_watcher()
+    if watcher is not None:
+        logger.info("Watching model files", extra={"interval_seconds": watcher.interval})
     
-    # Set state in routes
-    set_state(model, scaler, feature_importance, shap_explainer, training_data)
+    if not ADMIN_TOKEN:
+        logger.info("Admin endpoints disabled (set ADMIN_TOKEN to enable them)")
     
-    print("✅ API is ready to serve predictions!")
+    logger.info("API is ready to serve predictions", extra={
+        "model_version": model_version, "startup_seconds": round(time.perf_counter() - started, 4)
+    })
 
 
 # ============================================================================
@@ -98,7 +255,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown"""
-    print("👋 Shutting down API...")
+    logger.info("Shutting down API")
+    stop_model_watcher()
+    await stop_micro_batcher()
+    stop_inference_executor()
 
 
 # ============================================================================
@@ -0,0 +1,112 @@
+"""
+Build the precomputed answer table served by /predict.
+
+Scores a region of the 1-255 stat space with the same model, scaler and
+explainer the API uses and writes the results to a memory-mappable file.
+
+Usage:
+    python -m src.api.cli.build_answer_table                       # every training stat line
+    python -m src.api.cli.build_answer_table --region grid --grid-step 32
+    python -m src.api.cli.build_answer_table --region training --region grid
+"""
+
+import argparse
+import time
+from typing import Iterator, List, Tuple
+import numpy as np
+
+from ..core.config import ANSWER_TABLE_PATH, FEATURE_NAMES
+from ..core.schemas import PokemonStats
+from ..core.logger import get_logger
+from ..utils.answer_table import write_answer_table
+from ..utils.model_loader import load_training_data
+from ..utils.prediction import calculate_batch_contributions, describe_explainer
+from ..utils.registry import ModelVersion, load_model_version
+
+logger = get_logger("build_answer_table")
+
+REGIONS = ('training', 'grid')
+
+
+# ============================================================================
+# REGIONS
+# ============================================================================
+
+def training_region() -> np.ndarray:
+    """Every distinct stat line in the training data"""
+    index = load_training_data(shared_dir=None)
+    if index is None:
+        raise SystemExit("Training data not available")
+    rows = np.unique(np.asarray(index.stats).round().astype(np.int64), axis=0)
+    # Only stat lines /predict accepts can ever be looked up
+    return rows[((rows >= 1) & (rows <= 255)).all(axis=1)]
+
+
+def grid_region(step: int, start: int = 1, stop: int = 255) -> np.ndarray:
+    """A regular grid with `step` spacing on every stat, both ends included"""
+    values = np.unique(np.append(np.arange(start, stop + 1, step), stop))
+    mesh = np.meshgrid(*[values] * len(FEATURE_NAMES), indexing='ij')
+    return np.stack([m.ravel() for m in mesh], axis=1)
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def score_rows(
+    rows: np.ndarray,
+    version: ModelVersion,
+    chunk_size: int = 1024
+) -> Iterator[Tuple[List[int], float, float, str, List[float]]]:
+    """Yield (stats, probability, probability_non_legendary, method, contributions) with the API's own pipeline"""
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        stats_list = [PokemonStats(**dict(zip(FEATURE_NAMES, map(int, row)))) for row in chunk]
+        features, predictions, probabilities, non_legendary = version.pipeline.score(stats_list)
+        contributions = calculate_batch_contributions(
+            features, stats_list, predictions, probabilities, version.feature_importance, version.shap_explainer
+        )
+        for row, (items, method) in enumerate(contributions):
+            by_feature = {item.feature: item.contribution for item in items}
+            yield (
+                [int(v) for v in chunk[row]],
+                float(probabilities[row]),
+                float(non_legendary[row]),
+                method,
+                [by_feature[name] for name in FEATURE_NAMES]
+            )
+        logger.info("Scored chunk", extra={"rows": min(start + chunk_size, len(rows)), "total": len(rows)})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute /predict answers into a memory-mapped table")
+    parser.add_argument("--region", action="append", choices=REGIONS,
+                        help="Stat lines to precompute (repeatable, default: training)")
+    parser.add_argument("--grid-step", type=int, default=32, help="Spacing of the grid region (default: 32)")
+    parser.add_argument("--output", default=ANSWER_TABLE_PATH, help=f"Table path (default: {ANSWER_TABLE_PATH})")
+    parser.add_argument("--chunk-size", type=int, default=1024, help="Rows scored per model/explainer call")
+    args = parser.parse_args(argv)
+
+    regions = args.region or ['training']
+    parts = [training_region() if region == 'training' else grid_region(args.grid_step) for region in regions]
+    rows = np.unique(np.vstack(parts), axis=0)
+    logger.info("Building answer table", extra={"regions": ",".join(regions), "rows": len(rows)})
+
+    started = time.perf_counter()
+    # The model, scaler and explainer the API would serve with
+    version = load_model_version()
+    header = write_answer_table(
+        args.output,
+        score_rows(rows, version, args.chunk_size),
+        model_version=version.version,
+        explanation_method=describe_explainer(version.shap_explainer),
+        region="+".join(f"grid/{args.grid_step}" if r == 'grid' else r for r in regions)
+    )
+    logger.info("Answer table written", extra={
+        "path": args.output, "entries": header['entries'], "slots": header['slots'],
+        "methods": header['methods'], "seconds": round(time.perf_counter() - started, 2)
+    })
+
+
+if __name__ == "__main__":
+    main()
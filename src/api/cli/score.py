@@ -0,0 +1,351 @@
+"""
+Score a CSV or Parquet file of stat lines without running the HTTP server.
+
+Uses the same artifacts and pipeline as the API (model_loader and
+utils/prediction), but works on plain NumPy chunks, so there is no HTTP
+work per row and, unless --contributions is given, no Pydantic work
+either. Chunks are scored in parallel worker processes.
+
+Usage:
+    python -m src.api.cli.score roster.csv scored.csv
+    python -m src.api.cli.score roster.parquet scored.parquet --contributions --neighbors 5 --workers 4
+
+The input needs the columns hp, attack, defense, sp_attack, sp_defense and
+speed; any other columns are copied to the output unchanged (CSV input is
+read as text, so values keep their original spelling). Parquet input or
+output needs pyarrow (pip install pyarrow).
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+
+from ..core.config import FEATURE_NAMES, EXPLANATION_MODE, EXPLANATION_MODES
+from ..core.logger import get_logger
+from ..core.schemas import PokemonStats
+from ..utils.model_loader import (
+    load_model, compute_model_version, load_scaler, load_feature_importance, extract_feature_importance,
+    initialize_shap_explainer, load_compiled_model, load_training_data
+)
+from ..utils.pipeline import InferencePipeline
+from ..utils.prediction import calculate_confidence, calculate_batch_contributions
+
+logger = get_logger("score")
+
+# Parquet support is optional
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Artifacts for the current process, loaded once per worker
+_artifacts: Dict[str, Any] = {}
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+
+# ============================================================================
+# ARTIFACTS
+# ============================================================================
+
+def load_artifacts(explanation_mode: str = EXPLANATION_MODE, contributions: bool = False, neighbors: int = 0):
+    """Load what scoring needs into this process (skipping what the run won't use)"""
+    model = load_model()
+    scaler = load_scaler()
+    _artifacts.update({
+        'model': model,
+        'pipeline': InferencePipeline(model, scaler, load_compiled_model(model, scaler)),
+        'feature_importance': None,
+        'shap_explainer': None,
+        'training_data': None,
+    })
+    if contributions:
+        _artifacts['feature_importance'] = load_feature_importance() or extract_feature_importance(model)
+        _artifacts['shap_explainer'] = initialize_shap_explainer(model, mode=explanation_mode, scaler=scaler)
+    if neighbors > 0:
+        _artifacts['training_data'] = load_training_data()
+
+
+def _init_worker(explanation_mode: str, contributions: bool, neighbors: int):
+    # Forked workers inherit the parent's artifacts; spawned ones load their own
+    if not _artifacts:
+        load_artifacts(explanation_mode, contributions, neighbors)
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def score_chunk(chunk: pd.DataFrame, contributions: bool = False, neighbors: int = 0) -> pd.DataFrame:
+    """Score one chunk of input rows; returns the input columns plus results"""
+    stats = chunk[FEATURE_NAMES].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    # NaN fails every comparison, so missing or non-numeric values are invalid too
+    valid = ((stats >= 1) & (stats <= 255) & (stats == np.round(stats))).all(axis=1)
+
+    # Every chunk gets every result column, even when none of its rows are valid
+    result = chunk.copy()
+    result['error'] = np.where(valid, "", "stats must be integers from 1 to 255")
+    result['prediction'] = pd.array([pd.NA] * len(chunk), dtype="Int64")
+    result['probability_legendary'] = np.nan
+    result['confidence'] = None
+    if contributions:
+        for name in FEATURE_NAMES:
+            result[f'contribution_{name}'] = np.nan
+        result['explanation_method'] = None
+    if neighbors > 0:
+        result['similar_pokemon'] = None
+        result['similar_distances'] = None
+
+    rows = np.flatnonzero(valid)
+    if len(rows) == 0:
+        return result
+
+    # Same fused scaling and model routing as the API; stats[rows] is a fresh copy, scale it in place
+    pipeline = _artifacts['pipeline']
+    features = stats[rows]
+    pipeline.transform(features, out=features)
+    predictions, probabilities = pipeline.predict(features)
+
+    result.loc[result.index[rows], 'prediction'] = predictions
+    result.loc[result.index[rows], 'probability_legendary'] = probabilities
+    result.loc[result.index[rows], 'confidence'] = [calculate_confidence(float(p)) for p in probabilities]
+
+    if contributions:
+        values, methods = _contributions(stats[rows], features, predictions, probabilities)
+        for i, name in enumerate(FEATURE_NAMES):
+            result.loc[result.index[rows], f'contribution_{name}'] = values[:, i]
+        result.loc[result.index[rows], 'explanation_method'] = methods
+
+    if neighbors > 0 and _artifacts['training_data'] is not None:
+        index = _artifacts['training_data']
+        names, distances = [], []
+        for vector in stats[rows]:
+            found, dist = index.query(vector, k=neighbors)
+            names.append(";".join(str(index.names[i]) for i in found))
+            distances.append(";".join(f"{d:.4f}" for d in dist))
+        result.loc[result.index[rows], 'similar_pokemon'] = names
+        result.loc[result.index[rows], 'similar_distances'] = distances
+
+    return result
+
+
+def _contributions(stats: np.ndarray, features: np.ndarray, predictions, probabilities):
+    """Per-feature contribution values and method per row, chosen by the API's own code"""
+    # Rows were range-checked in score_chunk, so they skip validation here
+    stats_list = [PokemonStats.model_construct(**dict(zip(FEATURE_NAMES, row))) for row in stats.astype(int).tolist()]
+    results = calculate_batch_contributions(
+        features, stats_list, predictions, probabilities,
+        _artifacts['feature_importance'], _artifacts['shap_explainer']
+    )
+    values = np.zeros((len(stats), len(FEATURE_NAMES)))
+    methods = []
+    for row, (contributions, method) in enumerate(results):
+        # Contributions come largest first; put them back in feature order
+        for contribution in contributions:
+            values[row, FEATURE_INDEX[contribution.feature]] = contribution.contribution
+        methods.append(method)
+    return values, methods
+
+
+def _score_job(job) -> pd.DataFrame:
+    chunk, contributions, neighbors = job
+    return score_chunk(chunk, contributions, neighbors)
+
+
+# ============================================================================
+# INPUT AND OUTPUT
+# ============================================================================
+
+def _is_parquet(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def _require_parquet(path: str):
+    if not PARQUET_AVAILABLE:
+        raise SystemExit(f"Parquet support needs pyarrow (pip install pyarrow): {path}")
+
+
+def _normalize_column(name) -> str:
+    return str(name).strip().lower()
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield the input file in chunks of `chunk_size` rows"""
+    if _is_parquet(path):
+        _require_parquet(path)
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    else:
+        # As text, so a column's type can't change from one chunk to the next
+        chunks = pd.read_csv(path, chunksize=chunk_size, dtype=str)
+
+    for chunk in chunks:
+        chunk.columns = [_normalize_column(column) for column in chunk.columns]
+        missing = [name for name in FEATURE_NAMES if name not in chunk.columns]
+        if missing:
+            raise SystemExit(f"Input is missing columns: {', '.join(missing)}")
+        yield chunk
+
+
+def input_fields(path: str) -> List[Tuple[str, Any]]:
+    """(column, Arrow type) of the input as read_chunks yields it"""
+    if _is_parquet(path):
+        schema = pq.read_schema(path)
+        # Columns pandas restores as the index are not data columns
+        index_columns = (schema.pandas_metadata or {}).get('index_columns', [])
+        return [(_normalize_column(field.name), field.type) for field in schema if field.name not in index_columns]
+    return [(_normalize_column(column), pa.string()) for column in pd.read_csv(path, nrows=0).columns]
+
+
+def output_schema(input_path: str, contributions: bool = False, neighbors: int = 0) -> "pa.Schema":
+    """
+    Parquet schema of the scored output: the input columns followed by the
+    columns score_chunk adds. Fixed up front, so a chunk where a column is
+    entirely null can't decide its type.
+    """
+    fields = input_fields(input_path)
+    added = [
+        ('error', pa.string()),
+        ('prediction', pa.int64()),
+        ('probability_legendary', pa.float64()),
+        ('confidence', pa.string()),
+    ]
+    if contributions:
+        added += [(f'contribution_{name}', pa.float64()) for name in FEATURE_NAMES]
+        added.append(('explanation_method', pa.string()))
+    if neighbors > 0:
+        added += [('similar_pokemon', pa.string()), ('similar_distances', pa.string())]
+    # A result column replaces an input column of the same name, as in score_chunk
+    names = {name for name, _ in added}
+    return pa.schema([field for field in fields if field[0] not in names] + added)
+
+
+class ResultWriter:
+    """Append scored chunks to a CSV or Parquet file (Parquet needs the output schema)"""
+
+    def __init__(self, path: str, schema=None):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        if self.parquet:
+            _require_parquet(path)
+            if schema is None:
+                raise ValueError("Parquet output needs an explicit schema (see output_schema)")
+        self.schema = schema
+        self._writer = None
+        self._started = False
+
+    def write(self, frame: pd.DataFrame):
+        if self.parquet:
+            table = pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, self.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def run(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = 10000,
+    workers: int = 1,
+    contributions: bool = False,
+    neighbors: int = 0,
+    explanation_mode: str = EXPLANATION_MODE
+) -> Dict[str, Any]:
+    """Score `input_path` into `output_path`; returns a summary with rows per second"""
+    # Before anything touches pyarrow, so a missing install is reported plainly
+    for path in (input_path, output_path):
+        if _is_parquet(path):
+            _require_parquet(path)
+
+    started = time.perf_counter()
+    load_artifacts(explanation_mode, contributions, neighbors)
+    if workers > 1 and hasattr(_artifacts['model'], 'n_jobs'):
+        # Parallelism comes from the worker processes; don't oversubscribe with threads
+        _artifacts['model'].n_jobs = 1
+    load_seconds = time.perf_counter() - started
+
+    jobs = ((chunk, contributions, neighbors) for chunk in read_chunks(input_path, chunk_size))
+    schema = output_schema(input_path, contributions, neighbors) if _is_parquet(output_path) else None
+    writer = ResultWriter(output_path, schema)
+    rows = errors = 0
+    scoring_started = time.perf_counter()
+
+    pool = None
+    try:
+        if workers > 1:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(explanation_mode, contributions, neighbors))
+            # imap keeps output in input order while chunks are scored in parallel
+            results = pool.imap(_score_job, jobs)
+        else:
+            results = map(_score_job, jobs)
+
+        for frame in results:
+            writer.write(frame)
+            rows += len(frame)
+            errors += int((frame['error'] != "").sum())
+            logger.info("Chunk scored", extra={"rows": rows})
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    scoring_seconds = time.perf_counter() - scoring_started
+    return {
+        "rows": rows,
+        "errors": errors,
+        "workers": workers,
+        "model_version": compute_model_version(),
+        "load_seconds": round(load_seconds, 3),
+        "scoring_seconds": round(scoring_seconds, 3),
+        "rows_per_second": round(rows / scoring_seconds, 1) if scoring_seconds > 0 else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of Pokémon stat lines offline")
+    parser.add_argument("input", help="Input .csv or .parquet file")
+    parser.add_argument("output", help="Output .csv or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per vectorized chunk (default: 10000)")
+    parser.add_argument("--workers", type=int, default=1, help="Scoring processes (default: 1)")
+    parser.add_argument("--contributions", action="store_true", help="Add per-feature contribution columns")
+    parser.add_argument("--neighbors", type=int, default=0, help="Add the K most similar training Pokémon")
+    parser.add_argument("--explanation-mode", choices=EXPLANATION_MODES, default=EXPLANATION_MODE,
+                        help="Explainer for --contributions (default: EXPLANATION_MODE)")
+    args = parser.parse_args(argv)
+
+    summary = run(
+        args.input, args.output,
+        chunk_size=max(1, args.chunk_size),
+        workers=max(1, args.workers),
+        contributions=args.contributions,
+        neighbors=max(0, args.neighbors),
+        explanation_mode=args.explanation_mode
+    )
+    logger.info("Scoring complete", extra=summary)
+    print(
+        f"Scored {summary['rows']} rows ({summary['errors']} invalid) in {summary['scoring_seconds']}s "
+        f"= {summary['rows_per_second']} rows/s with {summary['workers']} worker(s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
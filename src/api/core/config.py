@@ -18,6 +18,36 @@ FEATURE_IMPORTANCE_PATH = os.getenv("FEATURE_IMPORTANCE_PATH", str(PROJECT_ROOT
 TRAINING_DATA_PATH = os.getenv("TRAINING_DATA_PATH", str(PROJECT_ROOT / "backend" / "models" / "training_data.pkl"))
 BACKGROUND_DATA_PATH = os.getenv("BACKGROUND_DATA_PATH", str(PROJECT_ROOT / "background_data.pkl"))
 
+# ============================================================================
+# STARTUP CONFIGURATION
+# ============================================================================
+
+# eager: load everything before serving
+# lazy: build the SHAP explainer and training data index on first use
+# background: build them in a background thread, serving fallback contributions meanwhile
+STARTUP_MODES = ('eager', 'lazy', 'background')
+STARTUP_MODE = os.getenv("STARTUP_MODE", "eager").lower()
+
+# Load all artifacts in the gunicorn master before forking (see gunicorn.conf.py)
+PRELOAD_ARTIFACTS = os.getenv("PRELOAD_ARTIFACTS", "false").lower() in ("1", "true", "yes")
+
+# Columnar .npy cache of the training data, keyed on the source file's hash and
+# memory-mapped read-only, so starts skip unpickling and workers share pages (empty disables)
+SHARED_ARRAYS_DIR = os.getenv("SHARED_ARRAYS_DIR", str(PROJECT_ROOT / "backend" / "models" / "training_cache"))
+
+# ============================================================================
+# MODEL REGISTRY CONFIGURATION
+# ============================================================================
+
+# Admin-loaded model artifacts must live in this directory
+MODEL_DIR = os.getenv("MODEL_DIR", str(Path(MODEL_PATH).parent))
+
+# Previous model versions kept loaded for instant rollback
+MODEL_REGISTRY_KEEP = int(os.getenv("MODEL_REGISTRY_KEEP", "1"))
+
+# Poll the model, scaler and feature importance files and hot-swap when they change (0 disables)
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "0"))
+
 # ============================================================================
 # FEATURE CONFIGURATION
 # ============================================================================
@@ -33,6 +63,14 @@ FEATURE_DISPLAY_NAMES = {
     'speed': 'Speed'
 }
 
+# ============================================================================
+# EXPLANATION CONFIGURATION
+# ============================================================================
+
+# Explainer used for per-prediction contributions (see initialize_shap_explainer)
+EXPLANATION_MODES = ('auto', 'tree', 'linear', 'exact', 'kernel', 'none')
+EXPLANATION_MODE = os.getenv("EXPLANATION_MODE", "auto").lower()
+
 # ============================================================================
 # REFERENCE STATS
 # ============================================================================
@@ -56,6 +94,43 @@ REFERENCE_STATS: Dict[str, Dict[str, int]] = {
     }
 }
 
+# ============================================================================
+# PREDICTION CONFIGURATION
+# ============================================================================
+
+# A Pokemon is labelled Legendary when its probability is above this threshold
+PREDICTION_THRESHOLD = float(os.getenv("PREDICTION_THRESHOLD", "0.5"))
+
+# Opt-in micro-batching of concurrent /predict requests
+MICRO_BATCH_ENABLED = os.getenv("MICRO_BATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICRO_BATCH_WINDOW_MS = float(os.getenv("MICRO_BATCH_WINDOW_MS", "5"))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+
+# Serve tree ensembles from flat NumPy node arrays (verified against sklearn at startup)
+COMPILED_INFERENCE = os.getenv("COMPILED_INFERENCE", "true").lower() in ("1", "true", "yes")
+# Larger batches go through sklearn, whose compiled traversal wins at that size
+COMPILED_MAX_ROWS = int(os.getenv("COMPILED_MAX_ROWS", "64"))
+
+# Precomputed answers built by `python -m src.api.cli.build_answer_table` (used if present)
+ANSWER_TABLE_PATH = os.getenv("ANSWER_TABLE_PATH", str(PROJECT_ROOT / "backend" / "models" / "answer_table.bin"))
+
+# Bounded pool for model and SHAP work: worker threads plus jobs allowed to wait
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "64"))
+
+# In-process cache for /predict and /similar-pokemon (capacity 0 disables it)
+CACHE_CAPACITY = int(os.getenv("CACHE_CAPACITY", "4096"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+
+# ============================================================================
+# LOGGING CONFIGURATION
+# ============================================================================
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+# Per-request debug detail (SHAP values, timings); can also be toggled at runtime
+LOG_REQUEST_DEBUG = os.getenv("LOG_REQUEST_DEBUG", "false").lower() in ("1", "true", "yes")
+
 # ============================================================================
 # API CONFIGURATION
 # ============================================================================
@@ -64,6 +139,18 @@ API_TITLE = "Legendary Pokémon Classifier API"
 API_DESCRIPTION = "ML-powered API to predict if a Pokémon is Legendary based on base stats"
 API_VERSION = "1.0.0"
 
+# Maximum number of rows accepted by /predict/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+# Largest k accepted by /similar-pokemon
+MAX_SIMILAR_K = int(os.getenv("MAX_SIMILAR_K", "100"))
+# Rows scored per chunk by /predict/stream
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "256"))
+# Longest input line /predict/stream accepts; longer ones become error rows
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+
+# Bearer token required by /admin/*; without one the admin endpoints are not served
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 CORS_ORIGINS = ["*"]
 CORS_CREDENTIALS = True
 CORS_METHODS = ["*"]
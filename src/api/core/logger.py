@@ -0,0 +1,102 @@
+"""Leveled, structured logging for the Pokemon Classifier API"""
+
+import json
+import logging
+import sys
+from typing import Optional
+
+from .config import LOG_LEVEL, LOG_FORMAT, LOG_REQUEST_DEBUG
+
+ROOT_LOGGER_NAME = "pokemon_api"
+REQUEST_LOGGER_NAME = f"{ROOT_LOGGER_NAME}.request"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RESERVED_ATTRS}
+
+
+# ============================================================================
+# FORMATTERS
+# ============================================================================
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with `extra` fields appended as key=value pairs"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log pipelines"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(_extra_fields(record))
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, request_debug: bool = LOG_REQUEST_DEBUG):
+    """Attach a stdout handler to the API logger tree (safe to call repeatedly)"""
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(level.upper())
+    root.propagate = False
+
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        root.addHandler(handler)
+    for handler in root.handlers:
+        handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    set_request_debug(request_debug)
+
+
+def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """Logger inside the API namespace, e.g. get_logger('model_loader')"""
+    if not logging.getLogger(ROOT_LOGGER_NAME).handlers:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}" if name else ROOT_LOGGER_NAME)
+
+
+def get_request_logger() -> logging.Logger:
+    """Logger for per-request detail, silent unless request debugging is on"""
+    return logging.getLogger(REQUEST_LOGGER_NAME)
+
+
+def set_request_debug(enabled: bool):
+    """Switch per-request debug logging on or off at runtime"""
+    request_logger = get_request_logger()
+    request_logger.setLevel(logging.DEBUG if enabled else logging.INFO)
+
+
+def request_debug_enabled() -> bool:
+    return get_request_logger().isEnabledFor(logging.DEBUG)
+
+
+def set_log_level(level: str):
+    """Change the API log level at runtime"""
+    logging.getLogger(ROOT_LOGGER_NAME).setLevel(level.upper())
+
+
+def get_log_level() -> str:
+    return logging.getLevelName(logging.getLogger(ROOT_LOGGER_NAME).level)
@@ -1,7 +1,8 @@
 """Pydantic models and schemas for API requests and responses"""
 
+from enum import Enum
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional, Union
 
 
 class PokemonStats(BaseModel):
@@ -37,6 +38,38 @@ class FeatureContribution(BaseModel):
     explanation: str = Field(..., description="Human-readable explanation")
 
 
+class SimilarPokemonItem(BaseModel):
+    """Similar Pokemon entry"""
+    name: str
+    distance: float
+    bst: int
+    legendary: int
+
+
+class ResponseDetail(str, Enum):
+    """How much of a prediction to compute and return"""
+    probability = "probability"        # prediction and probabilities only
+    contributions = "contributions"    # plus input echo and feature contributions
+    full = "full"                      # plus the most similar training Pokémon
+
+
+class SimilarityMetric(str, Enum):
+    """How closeness between two stat lines is measured"""
+    euclidean = "euclidean"            # distance between raw stats
+    standardized = "standardized"      # distance in the model's scaled feature space
+    cosine = "cosine"                  # 1 - cosine similarity: stat spread, ignoring total
+
+
+class PredictionSummary(BaseModel):
+    """Lean response for detail=probability"""
+    prediction: int = Field(..., description="0 = Non-Legendary, 1 = Legendary")
+    probability_legendary: float = Field(..., description="Probability of being Legendary (0-1)")
+    probability_non_legendary: float = Field(..., description="Probability of being Non-Legendary (0-1)")
+    confidence: str = Field(..., description="Confidence level (Low/Medium/High)")
+    model_type: str = Field(default="ML Classifier")
+    model_version: Optional[str] = Field(None, description="Version of the model that produced the prediction")
+
+
 class PredictionResponse(BaseModel):
     """Response schema for prediction endpoint"""
     prediction: int = Field(..., description="0 = Non-Legendary, 1 = Legendary")
@@ -47,6 +80,19 @@ class PredictionResponse(BaseModel):
     feature_contributions: List[FeatureContribution] = Field(..., description="Per-feature contributions")
     explanation_method: str = Field(..., description="Method used for explanation")
     model_type: str = Field(default="ML Classifier")
+    model_version: Optional[str] = Field(None, description="Version of the model that produced the prediction")
+    similar_pokemon: Optional[List[SimilarPokemonItem]] = Field(None, description="Most similar training Pokémon (detail=full only)")
+
+
+class BatchPredictionRequest(BaseModel):
+    """Input schema for batch prediction endpoint"""
+    pokemon: List[PokemonStats] = Field(..., description="Pokemon stat rows to score")
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response schema for batch prediction endpoint"""
+    predictions: List[Union[PredictionResponse, PredictionSummary]] = Field(..., description="One prediction per input row, in order")
+    count: int
 
 
 class FeatureImportanceItem(BaseModel):
@@ -63,20 +109,19 @@ class FeatureImportanceResponse(BaseModel):
     features: List[FeatureImportanceItem]
 
 
-class SimilarPokemonItem(BaseModel):
-    """Similar Pokemon entry"""
-    name: str
-    distance: float
-    bst: int
-    legendary: int
-
-
 class SimilarPokemonResponse(BaseModel):
     """Response schema for similar Pokemon endpoint"""
     similar_pokemon: List[SimilarPokemonItem]
     count: int
 
 
+class AnalysisResponse(BaseModel):
+    """Response schema for the combined analysis endpoint"""
+    prediction: PredictionResponse
+    similar: Optional[SimilarPokemonResponse] = Field(None, description="Absent when training data is unavailable")
+    feature_importance: Optional[FeatureImportanceResponse] = Field(None, description="Only with include_importance=true")
+
+
 class HealthCheckResponse(BaseModel):
     """Health check response schema"""
     status: str
@@ -85,3 +130,18 @@ class HealthCheckResponse(BaseModel):
     shap_available: bool
     feature_importance_available: bool
     explanation_method: str
+    prediction_threshold: float
+
+
+class ModelLoadRequest(BaseModel):
+    """Artifacts for a new model version; paths are relative to MODEL_DIR"""
+    model_path: str = Field(..., description="Model file")
+    scaler_path: Optional[str] = Field(None, description="Scaler file (default: the configured scaler)")
+    feature_importance_path: Optional[str] = Field(None, description="Feature importance file (default: the configured one)")
+    activate: bool = Field(True, description="Serve the new version as soon as it is warmed up")
+
+
+class LoggingSettings(BaseModel):
+    """Runtime logging settings"""
+    level: Optional[str] = Field(None, description="API log level (DEBUG/INFO/WARNING/ERROR)")
+    request_debug: Optional[bool] = Field(None, description="Log per-request debug detail")
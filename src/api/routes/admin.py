@@ -0,0 +1,115 @@
+"""Administrative endpoints"""
+
+import asyncio
+import logging
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from ..core.config import ADMIN_TOKEN, MODEL_DIR, SCALER_PATH, FEATURE_IMPORTANCE_PATH
+from ..core.schemas import LoggingSettings, ModelLoadRequest
+from ..core.logger import (
+    get_logger, get_log_level, set_log_level,
+    request_debug_enabled, set_request_debug
+)
+from ..utils.registry import ModelLoadInProgressError
+from .predict import registry
+
+logger = get_logger("admin")
+
+
+# ============================================================================
+# AUTHENTICATION
+# ============================================================================
+
+def require_admin_token(authorization: Optional[str] = Header(None)):
+    """Admit only requests with `Authorization: Bearer <ADMIN_TOKEN>`"""
+    if not ADMIN_TOKEN:
+        # No token configured: the admin endpoints don't exist
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required", headers={"WWW-Authenticate": "Bearer"})
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin_token)])
+
+
+# ============================================================================
+# LOGGING ENDPOINTS
+# ============================================================================
+
+@router.get("/logging", response_model=LoggingSettings)
+async def get_logging_settings():
+    """Current API log level and per-request debug switch"""
+    return LoggingSettings(level=get_log_level(), request_debug=request_debug_enabled())
+
+
+@router.put("/logging", response_model=LoggingSettings)
+async def update_logging_settings(settings: LoggingSettings):
+    """Change the log level or toggle per-request debug logging without a restart"""
+    if settings.level is not None:
+        if not isinstance(logging.getLevelName(settings.level.upper()), int):
+            raise HTTPException(status_code=422, detail=f"Unknown log level: {settings.level}")
+        set_log_level(settings.level)
+    
+    if settings.request_debug is not None:
+        set_request_debug(settings.request_debug)
+    
+    logger.info("Logging settings updated", extra={"level": get_log_level(), "request_debug": request_debug_enabled()})
+    return LoggingSettings(level=get_log_level(), request_debug=request_debug_enabled())
+
+
+# ============================================================================
+# MODEL REGISTRY ENDPOINTS
+# ============================================================================
+
+def resolve_artifact(path: Optional[str], default: str) -> str:
+    """Absolute path of an artifact under MODEL_DIR; anything outside it is rejected"""
+    if path is None:
+        return default
+    root = os.path.realpath(MODEL_DIR)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise HTTPException(status_code=422, detail=f"Artifact path must be inside the model directory: {path}")
+    return resolved
+
+
+@router.get("/models")
+async def list_model_versions():
+    """Loaded model versions, the active one and any still draining"""
+    return registry.describe()
+
+
+@router.post("/models")
+async def load_model_version(request: ModelLoadRequest):
+    """
+    Load, warm up and (by default) activate a new model version. Loading runs
+    in a separate thread, so the current version keeps serving until the swap.
+    """
+    paths = {
+        'model_path': resolve_artifact(request.model_path, None),
+        'scaler_path': resolve_artifact(request.scaler_path, SCALER_PATH),
+        'importance_path': resolve_artifact(request.feature_importance_path, FEATURE_IMPORTANCE_PATH),
+    }
+    try:
+        version = await asyncio.to_thread(registry.load, activate=request.activate, **paths)
+    except ModelLoadInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Model version failed to load: {str(e)}")
+    
+    return {"active": registry.active.version, "loaded": version.describe()}
+
+
+@router.post("/models/{version}/activate")
+async def activate_model_version(version: str):
+    """Serve an already loaded version (e.g. roll back to the previous one)"""
+    try:
+        registry.activate(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Model version not loaded: {version}")
+    
+    return registry.describe()
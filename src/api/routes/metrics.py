@@ -0,0 +1,40 @@
+"""Prometheus metrics endpoint"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..utils.metrics import registry, RUNTIME_GAUGES
+from .predict import state, cache
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def refresh_runtime_gauges():
+    """Copy current cache, answer table, pool and batcher values into gauges before a scrape"""
+    cache_stats = cache.stats()
+    for name in ("size", "hits", "misses", "evictions", "expirations", "invalidations"):
+        RUNTIME_GAUGES.set(f"cache_{name}", value=cache_stats[name])
+    
+    if state['answer_table'] is not None:
+        table_stats = state['answer_table'].stats()
+        for name in ("hits", "misses", "entries"):
+            RUNTIME_GAUGES.set(f"answer_table_{name}", value=table_stats[name])
+    
+    if state['executor'] is not None:
+        executor_stats = state['executor'].stats()
+        for name in ("in_flight", "completed", "failed", "rejected"):
+            RUNTIME_GAUGES.set(f"inference_pool_{name}", value=executor_stats[name])
+    
+    if state['batcher'] is not None:
+        batcher_stats = state['batcher'].stats()
+        for name in ("queue_depth", "batches_processed", "items_processed", "last_batch_size", "rejected"):
+            RUNTIME_GAUGES.set(f"micro_batch_{name}", value=batcher_stats[name])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request counts, error counts and per-stage latency histograms"""
+    refresh_runtime_gauges()
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,17 +1,42 @@
 """API routes and endpoints"""
 
-from fastapi import APIRouter, HTTPException
-import numpy as np
-from scipy.spatial.distance import euclidean
+import asyncio
+from typing import Dict, List, Optional, Union
 
-from ..core.config import FEATURE_NAMES, FEATURE_DISPLAY_NAMES
+from fastapi import APIRouter, HTTPException, Query
+
+from ..core.config import (
+    FEATURE_NAMES, FEATURE_DISPLAY_NAMES, MAX_BATCH_SIZE, PREDICTION_THRESHOLD,
+    MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_SIZE, INFERENCE_WORKERS, INFERENCE_MAX_PENDING, MODEL_WATCH_INTERVAL_SECONDS,
+    CACHE_CAPACITY, CACHE_TTL_SECONDS, EXPLANATION_MODE, STARTUP_MODE, COMPILED_MAX_ROWS, ANSWER_TABLE_PATH,
+    MAX_SIMILAR_K
+)
 from ..core.schemas import (
-    PokemonStats, PredictionResponse, FeatureImportanceResponse,
-    FeatureImportanceItem, SimilarPokemonResponse, SimilarPokemonItem
+    PokemonStats, PredictionResponse, BatchPredictionRequest, BatchPredictionResponse,
+    FeatureImportanceResponse, FeatureImportanceItem, SimilarPokemonResponse, SimilarPokemonItem,
+    PredictionSummary, ResponseDetail, AnalysisResponse, SimilarityMetric
+)
+from ..utils.prediction import (
+    calculate_confidence,
+    calculate_shap_contributions, calculate_batch_contributions, describe_explainer,
+    build_shap_contributions, calculate_fallback_contributions
 )
-from ..utils.prediction import prepare_features, calculate_confidence, calculate_shap_contributions
+from ..core.logger import get_logger, request_debug_enabled
+from ..utils.batching import MicroBatcher
+from ..utils.executor import InferenceExecutor, ExecutorSaturatedError
+from ..utils.cache import PredictionCache, stats_key
+from ..utils.metrics import time_stage, process_memory
+from ..utils.model_loader import get_preloaded_artifacts
+from ..utils.components import LazyComponent
+from ..utils.registry import ModelRegistry, ModelVersion, ModelWatcher
+from ..utils.answer_table import load_answer_table
+from ..utils.responses import dump_model, model_response
 
 router = APIRouter()
+logger = get_logger("routes")
+
+# Response header naming the model version(s) that answered
+MODEL_VERSION_HEADER = "X-Model-Version"
 
 
 # ============================================================================
@@ -20,20 +45,211 @@ router = APIRouter()
 
 state = {
     'model': None,
+    'compiled_model': None,
     'scaler': None,
     'feature_importance': None,
     'shap_explainer': None,
-    'training_data': None
+    'training_data': None,
+    'model_version': None,
+    'answer_table': None,
+    'batcher': None,
+    'executor': None,
+    'watcher': None,
+    'components': {}
 }
 
+cache = PredictionCache(capacity=CACHE_CAPACITY, ttl_seconds=CACHE_TTL_SECONDS)
+
+# Loaded model versions; scoring pins the active one per request
+registry = ModelRegistry()
+
 
-def set_state(model, scaler, feature_importance, shap_explainer, training_data):
+def set_state(model, scaler, feature_importance, shap_explainer, training_data, model_version=None, compiled_model=None):
     """Set the global state with loaded models and data"""
-    state['model'] = model
-    state['scaler'] = scaler
-    state['feature_importance'] = feature_importance
-    state['shap_explainer'] = shap_explainer
     state['training_data'] = training_data
+    if model is None:
+        for name in ('model', 'compiled_model', 'scaler', 'feature_importance', 'shap_explainer', 'model_version'):
+            state[name] = None
+        return
+    
+    registry.add(ModelVersion(
+        model_version, model, scaler=scaler, compiled_model=compiled_model,
+        feature_importance=feature_importance, shap_explainer=shap_explainer
+    ))
+    registry.activate(model_version)
+
+
+def _on_model_activated(version: ModelVersion, previous: Optional[ModelVersion]):
+    """Mirror the active version into `state` and drop what belonged to the previous one"""
+    state['model'] = version.model
+    state['compiled_model'] = version.compiled_model
+    state['scaler'] = version.scaler
+    state['feature_importance'] = version.feature_importance
+    state['shap_explainer'] = version.shap_explainer
+    state['model_version'] = version.version
+    
+    # A deferred explainer only counts towards readiness while its version serves
+    component = version.components.get('shap_explainer')
+    if component is not None:
+        state['components']['shap_explainer'] = component
+    else:
+        state['components'].pop('shap_explainer', None)
+    
+    # Cached responses belong to the previous model, drop them if it changed
+    cache.set_model_version(version.version)
+    
+    # On a hot-swap, attach the answer table only if it was built for the new model
+    if previous is not None:
+        attach_answer_table(version)
+
+
+registry.on_activate(_on_model_activated)
+
+
+def set_answer_table(table):
+    """Attach a precomputed answer table (or None to serve everything live)"""
+    state['answer_table'] = table
+
+
+def attach_answer_table(version: Optional[ModelVersion]):
+    """
+    Attach the answer table if it was built for `version` and its explainer.
+    While that explainer is still deferred nothing is attached; the
+    component calls this again once it is ready, so the check always runs
+    against the explainer that will actually serve.
+    """
+    set_answer_table(None)
+    if version is None:
+        return
+    component = version.components.get('shap_explainer')
+    if version.shap_explainer is None and component is not None and not component.ready:
+        logger.info("Answer table waits for the explainer", extra={"model_version": version.version})
+        return
+    set_answer_table(load_answer_table(ANSWER_TABLE_PATH, version.version, describe_explainer(version.shap_explainer)))
+
+
+def register_component(name: str, loader, background: bool = False) -> LazyComponent:
+    """
+    Defer loading of a state entry ('shap_explainer' or 'training_data').
+    Lazy components load on first use; background components load in a thread
+    and read as unavailable until they are ready.
+    """
+    # The explainer belongs to the model version serving now, not whichever serves later
+    owner = registry.active if name == 'shap_explainer' else None
+    
+    def on_ready(value):
+        if owner is not None:
+            owner.shap_explainer = value
+        if owner is None or owner is registry.active:
+            state[name] = value
+            if owner is not None:
+                attach_answer_table(owner)
+    
+    component = LazyComponent(name, loader, blocking=not background, on_ready=on_ready)
+    state['components'][name] = component
+    if owner is not None:
+        owner.components[name] = component
+    if background:
+        component.start_background()
+    return component
+
+
+def get_component(name: str):
+    """Return a state entry, triggering a deferred load if it is lazy"""
+    value = state[name]
+    component = state['components'].get(name)
+    if value is None and component is not None:
+        value = component.get()
+    return value
+
+
+async def load_component(name: str):
+    """
+    get_component for async routes: a lazy load runs in a worker thread, so
+    building the component never blocks the event loop for other requests
+    """
+    component = state['components'].get(name)
+    if state[name] is None and component is not None and component.blocking and not component.ready:
+        return await asyncio.to_thread(component.get)
+    return get_component(name)
+
+
+def components_ready() -> bool:
+    """Whether every deferred component has finished loading"""
+    return all(component.ready for component in state['components'].values())
+
+
+# ============================================================================
+# INFERENCE EXECUTION
+# ============================================================================
+
+def start_inference_executor(max_workers: int = INFERENCE_WORKERS, max_pending: int = INFERENCE_MAX_PENDING):
+    """Create the bounded pool that runs model and SHAP work off the event loop"""
+    executor = InferenceExecutor(max_workers=max_workers, max_pending=max_pending)
+    state['executor'] = executor
+    return executor
+
+
+def stop_inference_executor():
+    """Shut down the inference pool, waiting for running jobs"""
+    executor = state['executor']
+    state['executor'] = None
+    if executor is not None:
+        executor.shutdown()
+
+
+async def run_inference(fn, *args):
+    """Run blocking inference in the pool, shedding load with a 503 when it is full"""
+    try:
+        if state['executor'] is None:
+            return fn(*args)
+        return await state['executor'].run(fn, *args)
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+# ============================================================================
+# MICRO-BATCHING
+# ============================================================================
+
+def start_micro_batcher(window_ms: float = MICRO_BATCH_WINDOW_MS, max_batch_size: int = MICRO_BATCH_MAX_SIZE):
+    """Start queueing /predict requests into micro-batches (requires a running event loop)"""
+    batcher = MicroBatcher(
+        score_batch, window_ms=window_ms, max_batch_size=max_batch_size,
+        executor=state['executor'], max_queue_size=INFERENCE_MAX_PENDING * max_batch_size
+    )
+    batcher.start()
+    state['batcher'] = batcher
+    return batcher
+
+
+async def stop_micro_batcher():
+    """Stop the micro-batcher and return /predict to inline scoring"""
+    batcher = state['batcher']
+    state['batcher'] = None
+    if batcher is not None:
+        await batcher.stop()
+
+
+# ============================================================================
+# MODEL FILE WATCHING
+# ============================================================================
+
+def start_model_watcher(interval: float = MODEL_WATCH_INTERVAL_SECONDS) -> Optional[ModelWatcher]:
+    """Hot-swap the model when its files change on disk (interval 0 disables)"""
+    if interval <= 0:
+        return None
+    watcher = ModelWatcher(registry, interval)
+    watcher.start()
+    state['watcher'] = watcher
+    return watcher
+
+
+def stop_model_watcher():
+    watcher = state['watcher']
+    state['watcher'] = None
+    if watcher is not None:
+        watcher.stop()
 
 
 # ============================================================================
@@ -48,25 +264,57 @@ async def root():
         "version": "1.0.0",
         "status": "running",
         "endpoints": {
-            "predict": "/predict (POST)",
+            "predict": "/predict (POST, ?detail=probability|contributions|full)",
+            "predict-batch": "/predict/batch (POST)",
+            "predict-stream": "/predict/stream (POST, NDJSON or CSV body)",
             "feature-importance": "/feature-importance (GET)",
-            "similar-pokemon": "/similar-pokemon (POST)",
+            "similar-pokemon": "/similar-pokemon (POST, ?k=&metric=&legendary=&min_bst=&max_bst=)",
+            "analyze": "/analyze (POST, prediction + similar Pokémon in one call)",
             "health": "/health (GET)",
+            "metrics": "/metrics (GET)",
             "docs": "/docs"
         }
     }
 
 
+def describe_components():
+    """Readiness of each startup component"""
+    components = {}
+    for name in ('model', 'scaler', 'feature_importance', 'shap_explainer', 'training_data'):
+        if name in state['components']:
+            components[name] = state['components'][name].describe()
+        else:
+            components[name] = {"status": "ready", "available": state[name] is not None}
+    return components
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint - returns status of loaded models and data"""
     return {
         "status": "healthy",
+        "ready": components_ready(),
+        "startup_mode": "preloaded" if get_preloaded_artifacts() else STARTUP_MODE,
+        "components": describe_components(),
         "model_loaded": state['model'] is not None,
         "scaler_loaded": state['scaler'] is not None,
         "shap_available": state['shap_explainer'] is not None,
         "feature_importance_available": state['feature_importance'] is not None,
-        "explanation_method": "SHAP" if state['shap_explainer'] is not None else "fallback"
+        "explanation_method": describe_explainer(state['shap_explainer']) if state['shap_explainer'] is not None else "fallback",
+        "explanation_mode": EXPLANATION_MODE,
+        "prediction_threshold": PREDICTION_THRESHOLD,
+        "compiled_inference": {
+            "enabled": state['compiled_model'] is not None,
+            "max_rows": COMPILED_MAX_ROWS
+        },
+        "micro_batching": state['batcher'].stats() if state['batcher'] is not None else {"enabled": False},
+        "inference_pool": state['executor'].stats() if state['executor'] is not None else None,
+        "model_version": state['model_version'],
+        "model_registry": registry.describe(),
+        "model_watcher": state['watcher'].describe() if state['watcher'] is not None else {"enabled": False},
+        "cache": cache.stats(),
+        "answer_table": state['answer_table'].stats() if state['answer_table'] is not None else {"enabled": False},
+        "memory": process_memory()
     }
 
 
@@ -74,54 +322,355 @@ async def health_check():
 # PREDICTION ENDPOINTS
 # ============================================================================
 
-@router.post("/predict", response_model=PredictionResponse)
-async def predict_legendary(stats: PokemonStats):
-    """Predict whether a Pokémon is Legendary based on base stats"""
-    if state['model'] is None:
-        raise HTTPException(status_code=500, detail="Model not loaded")
-    
-    try:
-        # Prepare features
-        features = prepare_features(stats, state['scaler'])
-        
-        # Make prediction
-        prediction = state['model'].predict(features)[0]
-        
-        # Get probability scores
-        try:
-            probabilities = state['model'].predict_proba(features)[0]
-            prob_non_legendary = float(probabilities[0])
-            prob_legendary = float(probabilities[1])
-        except AttributeError:
-            prob_legendary = 1.0 if prediction == 1 else 0.0
-            prob_non_legendary = 1.0 - prob_legendary
-        
-        # Calculate confidence
-        confidence = calculate_confidence(prob_legendary)
-        
-        # Calculate feature contributions
-        feature_contributions, method = calculate_shap_contributions(
-            features, stats, int(prediction), prob_legendary,
-            state['feature_importance'], state['shap_explainer']
-        )
+def table_answer(stats: PokemonStats, current: ModelVersion):
+    """Precomputed (probability, probability_non_legendary, method, contributions) for a stat line, or None"""
+    table = state['answer_table']
+    # Right after a swap the table may still be the previous model's
+    if table is None or table.model_version != current.version:
+        return None
+    return table.lookup(stats_key(stats))
+
+
+def answer_from_table(stats: PokemonStats) -> Optional[PredictionResponse]:
+    """Build the response for a precomputed stat line, or None on a miss"""
+    with registry.use() as current:
+        answer = table_answer(stats, current)
+        if answer is None:
+            return None
         
+        with time_stage("answer_table"):
+            prob_legendary, prob_non_legendary, method, contribution_values = answer
+            prediction = int(prob_legendary > PREDICTION_THRESHOLD)
+            if method.startswith("fallback"):
+                feature_contributions = calculate_fallback_contributions(
+                    stats, prediction, prob_legendary, current.feature_importance
+                )
+            else:
+                feature_contributions = build_shap_contributions(stats, contribution_values)
+            
+            return PredictionResponse(
+                prediction=prediction,
+                probability_legendary=prob_legendary,
+                probability_non_legendary=prob_non_legendary,
+                confidence=calculate_confidence(prob_legendary),
+                stats=dump_model(stats),
+                feature_contributions=feature_contributions,
+                explanation_method=method,
+                model_type=current.model_type,
+                model_version=current.version
+            )
+
+
+def score_batch(stats_list: List[PokemonStats]) -> List[PredictionResponse]:
+    """Score a batch with one vectorized scaler, model and SHAP pass"""
+    with registry.use() as current:
+        return _score_batch(current, stats_list)
+
+
+def _score_batch(current: ModelVersion, stats_list: List[PokemonStats]) -> List[PredictionResponse]:
+    # Scale into one (n_samples, n_features) matrix and run a single model pass
+    features, predictions, prob_legendary, prob_non_legendary = current.pipeline.score(stats_list)
+    
+    # Calculate feature contributions with a single explainer call
+    contributions = calculate_batch_contributions(
+        features, stats_list, predictions, prob_legendary,
+        current.feature_importance, current.explainer()
+    )
+    
+    model_type = current.model_type
+    results = []
+    with time_stage("build_response"):
+        for row, stats in enumerate(stats_list):
+            feature_contributions, method = contributions[row]
+            results.append(PredictionResponse(
+                prediction=int(predictions[row]),
+                probability_legendary=float(prob_legendary[row]),
+                probability_non_legendary=float(prob_non_legendary[row]),
+                confidence=calculate_confidence(float(prob_legendary[row])),
+                stats=dump_model(stats),
+                feature_contributions=feature_contributions,
+                explanation_method=method,
+                model_type=model_type,
+                model_version=current.version
+            ))
+    
+    return results
+
+
+def score_single(stats: PokemonStats) -> PredictionResponse:
+    """Score one Pokémon with the scaler, model and explainer"""
+    with registry.use() as current:
+        return _score_single(current, stats)
+
+
+def _score_single(current: ModelVersion, stats: PokemonStats) -> PredictionResponse:
+    # Scale and predict in a single fused pass
+    features, predictions, probabilities, non_legendary = current.pipeline.score([stats])
+    prediction = int(predictions[0])
+    prob_legendary = float(probabilities[0])
+    prob_non_legendary = float(non_legendary[0])
+    
+    # Calculate confidence
+    confidence = calculate_confidence(prob_legendary)
+    
+    # Calculate feature contributions
+    feature_contributions, method = calculate_shap_contributions(
+        features, stats, prediction, prob_legendary,
+        current.feature_importance, current.explainer()
+    )
+    
+    with time_stage("build_response"):
         return PredictionResponse(
-            prediction=int(prediction),
+            prediction=prediction,
             probability_legendary=prob_legendary,
             probability_non_legendary=prob_non_legendary,
             confidence=confidence,
-            stats=stats.dict(),
+            stats=dump_model(stats),
             feature_contributions=feature_contributions,
             explanation_method=method,
-            model_type=type(state['model']).__name__
+            model_type=current.model_type,
+            model_version=current.version
+        )
+
+
+def build_summary(prob_legendary: float, prob_non_legendary: float, current: ModelVersion) -> PredictionSummary:
+    """Lean response from the probabilities alone"""
+    return PredictionSummary(
+        prediction=int(prob_legendary > PREDICTION_THRESHOLD),
+        probability_legendary=prob_legendary,
+        probability_non_legendary=prob_non_legendary,
+        confidence=calculate_confidence(prob_legendary),
+        model_type=current.model_type,
+        model_version=current.version
+    )
+
+
+def summarize(response: PredictionResponse) -> PredictionSummary:
+    """Lean response cut from a full one (e.g. a cached response)"""
+    return PredictionSummary(
+        prediction=response.prediction,
+        probability_legendary=response.probability_legendary,
+        probability_non_legendary=response.probability_non_legendary,
+        confidence=response.confidence,
+        model_type=response.model_type,
+        model_version=response.model_version
+    )
+
+
+def summary_from_table(stats: PokemonStats) -> Optional[PredictionSummary]:
+    """Lean response for a precomputed stat line, or None on a miss"""
+    with registry.use() as current:
+        answer = table_answer(stats, current)
+        if answer is None:
+            return None
+        return build_summary(answer[0], answer[1], current)
+
+
+def score_probabilities(stats_list: List[PokemonStats]) -> List[PredictionSummary]:
+    """Score a batch with the scaler and model only; no explainer or contributions"""
+    with registry.use() as current:
+        _, predictions, prob_legendary, prob_non_legendary = current.pipeline.score(stats_list)
+        
+        with time_stage("build_response"):
+            return [
+                PredictionSummary(
+                    prediction=int(predictions[row]),
+                    probability_legendary=float(prob_legendary[row]),
+                    probability_non_legendary=float(prob_non_legendary[row]),
+                    confidence=calculate_confidence(float(prob_legendary[row])),
+                    model_type=current.model_type,
+                    model_version=current.version
+                )
+                for row in range(len(stats_list))
+            ]
+
+
+def similar_items(
+    index,
+    stats: PokemonStats,
+    k: int = 5,
+    metric: SimilarityMetric = SimilarityMetric.euclidean,
+    legendary: Optional[bool] = None,
+    min_bst: Optional[int] = None,
+    max_bst: Optional[int] = None
+) -> List[SimilarPokemonItem]:
+    """The k training Pokémon closest to a stat line, closest first"""
+    metric = SimilarityMetric(metric)
+    scale = None
+    if metric == SimilarityMetric.standardized:
+        # The serving model's scaler; the index falls back to the training data's spread
+        current = registry.active
+        scale = current.pipeline.scale if current is not None else None
+    indices, distances = index.query(
+        stats_key(stats), k=k, metric=metric.value, scale=scale,
+        legendary=legendary, min_bst=min_bst, max_bst=max_bst
+    )
+    return [
+        SimilarPokemonItem(
+            name=index.names[i],
+            distance=float(dist),
+            bst=int(index.bst[i]),
+            legendary=int(index.legendary[i])
         )
+        for i, dist in zip(indices, distances)
+    ]
+
+
+async def with_similar(responses: List[PredictionResponse], stats_list: List[PokemonStats]) -> List[PredictionResponse]:
+    """Copies of full responses with similar_pokemon filled in (cached responses stay untouched)"""
+    index = await load_component('training_data')
+    if index is None:
+        raise HTTPException(status_code=503, detail="Training data not available")
+    with time_stage("similar_search"):
+        return [
+            response.model_copy(update={'similar_pokemon': similar_items(index, stats)})
+            for response, stats in zip(responses, stats_list)
+        ]
+
+
+async def score_rows(
+    stats_list: List[PokemonStats],
+    detail: ResponseDetail = ResponseDetail.contributions
+) -> List[Union[PredictionResponse, PredictionSummary]]:
+    """
+    Answer precomputed rows from the table and score the rest in one pooled
+    batch, computing only what `detail` asks for.
+    """
+    if detail == ResponseDetail.probability:
+        results = [summary_from_table(stats) for stats in stats_list]
+        score = score_probabilities
+    else:
+        results = [answer_from_table(stats) for stats in stats_list]
+        score = score_batch
+    
+    misses = [row for row, result in enumerate(results) if result is None]
+    if misses:
+        scored = await run_inference(score, [stats_list[row] for row in misses])
+        for row, result in zip(misses, scored):
+            results[row] = result
+    
+    if detail == ResponseDetail.full:
+        results = await with_similar(results, stats_list)
+    return results
+
+
+async def predict_summary(stats: PokemonStats) -> PredictionSummary:
+    """detail=probability: reuse a cached or precomputed answer, else run the model alone"""
+    cached = cache.get('predict', stats_key(stats))
+    if cached is not None:
+        return summarize(cached)
+    
+    response = summary_from_table(stats)
+    if response is not None:
+        return response
+    
+    return (await run_inference(score_probabilities, [stats]))[0]
+
+
+async def predict_with_contributions(stats: PokemonStats) -> PredictionResponse:
+    """detail=contributions: the full response, from the cache, answer table or model"""
+    key = stats_key(stats)
+    cached = cache.get('predict', key)
+    if cached is not None:
+        return cached
+    
+    # Precomputed stat lines are answered without touching the model
+    response = answer_from_table(stats)
+    if response is not None:
+        return response
+    
+    # Route through the micro-batcher when enabled
+    if state['batcher'] is not None and state['batcher'].running:
+        response = await state['batcher'].submit(stats)
+    else:
+        response = await run_inference(score_single, stats)
+    
+    # Don't pin fallback explanations served while SHAP is still loading, or
+    # answers from a model that was swapped out while this one was scoring
+    if components_ready() and response.model_version == cache.model_version:
+        cache.put('predict', key, response)
+    return response
+
+
+def model_version_headers(results) -> Dict[str, str]:
+    """Header naming the model version(s) behind `results`"""
+    versions = sorted({result.model_version for result in results if result.model_version is not None})
+    return {MODEL_VERSION_HEADER: ",".join(versions)} if versions else {}
+
+
+DETAIL_DESCRIPTION = (
+    "probability: prediction and probabilities only (no explainer work); "
+    "contributions: plus input echo and feature contributions; "
+    "full: plus the 5 most similar training Pokémon"
+)
+
+
+@router.post(
+    "/predict",
+    response_model=Union[PredictionResponse, PredictionSummary],
+    response_model_exclude_none=True
+)
+async def predict_legendary(
+    stats: PokemonStats,
+    detail: ResponseDetail = Query(ResponseDetail.contributions, description=DETAIL_DESCRIPTION)
+):
+    """Predict whether a Pokémon is Legendary based on base stats"""
+    if state['model'] is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    
+    try:
+        if detail == ResponseDetail.probability:
+            result = await predict_summary(stats)
+        else:
+            result = await predict_with_contributions(stats)
+            if detail == ResponseDetail.full:
+                result = (await with_similar([result], [stats]))[0]
         
+        return model_response(result, headers=model_version_headers([result]))
+    
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.error("Prediction error: %s", e, exc_info=request_debug_enabled())
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
 
+@router.post("/predict/batch", response_model=BatchPredictionResponse, response_model_exclude_none=True)
+async def predict_legendary_batch(
+    request: BatchPredictionRequest,
+    detail: ResponseDetail = Query(ResponseDetail.contributions, description=DETAIL_DESCRIPTION)
+):
+    """Predict Legendary status for many Pokémon with one vectorized model and SHAP pass"""
+    if state['model'] is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    
+    stats_list = request.pokemon
+    if not stats_list:
+        raise HTTPException(status_code=422, detail="Batch must contain at least one Pokemon")
+    if len(stats_list) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(stats_list)} rows (max {MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        results = await score_rows(stats_list, detail)
+        return model_response(
+            BatchPredictionResponse(predictions=results, count=len(results)),
+            headers=model_version_headers(results)
+        )
+    
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error("Batch prediction error: %s", e, exc_info=request_debug_enabled(), extra={"rows": len(stats_list)})
+        raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
+
+
 # ============================================================================
 # FEATURE IMPORTANCE ENDPOINTS
 # ============================================================================
@@ -136,84 +685,143 @@ async def get_feature_importance():
         raise HTTPException(status_code=500, detail="Feature importance not available")
     
     try:
-        model_type = type(state['model']).__name__
-        importance_type = state['feature_importance'].get('type', 'unknown')
-        importances = state['feature_importance']['importances']
-        
-        features = []
-        for i, feature_name in enumerate(FEATURE_NAMES):
-            features.append(FeatureImportanceItem(
-                feature=feature_name,
-                display_name=FEATURE_DISPLAY_NAMES[feature_name],
-                importance=float(importances[i])
-            ))
-        
-        features.sort(key=lambda x: x.importance, reverse=True)
-        
-        return FeatureImportanceResponse(
-            model_type=model_type,
-            importance_type=importance_type,
-            features=features
-        )
+        return feature_importance_response()
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving feature importance: {str(e)}")
 
 
+def feature_importance_response() -> FeatureImportanceResponse:
+    """Overall feature importance of the loaded model, most important first"""
+    current = registry.active
+    model_type = current.model_type
+    importance_type = current.feature_importance.get('type', 'unknown')
+    importances = current.feature_importance['importances']
+    
+    features = []
+    for i, feature_name in enumerate(FEATURE_NAMES):
+        features.append(FeatureImportanceItem(
+            feature=feature_name,
+            display_name=FEATURE_DISPLAY_NAMES[feature_name],
+            importance=float(importances[i])
+        ))
+    
+    features.sort(key=lambda x: x.importance, reverse=True)
+    
+    return FeatureImportanceResponse(
+        model_type=model_type,
+        importance_type=importance_type,
+        features=features
+    )
+
+
 # ============================================================================
 # SIMILARITY ENDPOINTS
 # ============================================================================
 
 @router.post("/similar-pokemon", response_model=SimilarPokemonResponse)
-async def find_similar_pokemon(stats: PokemonStats):
-    """Find the 5 most similar Pokémon from training data"""
-    if state['training_data'] is None:
+async def find_similar_pokemon(
+    stats: PokemonStats,
+    k: int = Query(5, ge=1, le=MAX_SIMILAR_K, description="Number of Pokémon to return"),
+    metric: SimilarityMetric = Query(SimilarityMetric.euclidean, description="Distance measure"),
+    legendary: Optional[bool] = Query(None, description="Only legendary (true) or non-legendary (false) Pokémon"),
+    min_bst: Optional[int] = Query(None, ge=0, description="Lowest base stat total to include"),
+    max_bst: Optional[int] = Query(None, ge=0, description="Highest base stat total to include")
+):
+    """Find the k most similar Pokémon from training data, optionally filtered"""
+    if min_bst is not None and max_bst is not None and min_bst > max_bst:
+        raise HTTPException(status_code=422, detail=f"min_bst ({min_bst}) is greater than max_bst ({max_bst})")
+
+    index = await load_component('training_data')
+    if index is None:
         raise HTTPException(status_code=503, detail="Training data not available")
     
     try:
-        # Convert input stats to array
-        input_vector = np.array([
-            stats.hp, stats.attack, stats.defense,
-            stats.sp_attack, stats.sp_defense, stats.speed
-        ])
-        
-        # Calculate distances to all training samples
-        distances = []
-        for idx, row in state['training_data'].iterrows():
-            train_vector = np.array([
-                row['hp'], row['attack'], row['defense'],
-                row['sp_attack'], row['sp_defense'], row['speed']
-            ])
-            dist = euclidean(input_vector, train_vector)
-            
-            # Try multiple column names for Pokemon name
-            pokemon_name = None
-            for col_name in ['name_stats', 'Name', 'pokemon_name']:
-                if col_name in row.index:
-                    potential_name = row[col_name]
-                    if not (isinstance(potential_name, float) and np.isnan(potential_name)) and potential_name != '':
-                        pokemon_name = str(potential_name)
-                        break
-            
-            # Fallback to Pokemon number if no name found
-            if pokemon_name is None or pokemon_name == '':
-                pokemon_name = f"Pokemon #{idx + 1}"
-            
-            distances.append(SimilarPokemonItem(
-                name=pokemon_name,
-                distance=float(dist),
-                bst=int(train_vector.sum()),
-                legendary=int(row.get('legendary', 0))
-            ))
-        
-        # Sort by distance and get top 5
-        distances.sort(key=lambda x: x.distance)
-        similar = distances[:5]
-        
-        return SimilarPokemonResponse(
-            similar_pokemon=similar,
-            count=len(similar)
+        return similar_response(
+            index, stats, k=k, metric=metric, legendary=legendary, min_bst=min_bst, max_bst=max_bst
         )
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error finding similar Pokemon: {str(e)}")
+
+
+def similar_response(
+    index,
+    stats: PokemonStats,
+    k: int = 5,
+    metric: SimilarityMetric = SimilarityMetric.euclidean,
+    legendary: Optional[bool] = None,
+    min_bst: Optional[int] = None,
+    max_bst: Optional[int] = None
+) -> SimilarPokemonResponse:
+    """The k nearest training Pokémon matching the filters, from the cache when possible"""
+    metric = SimilarityMetric(metric)
+    key = stats_key(stats) + (k, metric.value, legendary, min_bst, max_bst)
+    cached = cache.get('similar', key)
+    if cached is not None:
+        return cached
+    
+    # Vectorized top-k search over the BST-sorted stat matrix, filtered rows only
+    with time_stage("similar_search"):
+        similar = similar_items(
+            index, stats, k=k, metric=metric, legendary=legendary, min_bst=min_bst, max_bst=max_bst
+        )
+    
+    response = SimilarPokemonResponse(
+        similar_pokemon=similar,
+        count=len(similar)
+    )
+    cache.put('similar', key, response)
+    return response
+
+
+# ============================================================================
+# COMBINED ANALYSIS ENDPOINT
+# ============================================================================
+
+async def _similar_or_none(stats: PokemonStats) -> Optional[SimilarPokemonResponse]:
+    index = await load_component('training_data')
+    if index is None:
+        return None
+    try:
+        return similar_response(index, stats)
+    except Exception as e:
+        logger.warning("Similar Pokemon lookup failed during analysis: %s", e)
+        return None
+
+
+@router.post("/analyze", response_model=AnalysisResponse, response_model_exclude_none=True)
+async def analyze_pokemon(
+    stats: PokemonStats,
+    include_importance: bool = Query(False, description="Also return the model's overall feature importance")
+):
+    """
+    Prediction, feature contributions and similar Pokémon in one request.
+    The input is validated once; the similarity search runs on the event
+    loop while the model and explainer run in the inference pool.
+    """
+    if state['model'] is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    
+    try:
+        # gather starts the prediction first, so it is already in the pool
+        # when the similarity search runs
+        prediction, similar = await asyncio.gather(
+            predict_with_contributions(stats), _similar_or_none(stats)
+        )
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error("Analysis error: %s", e, exc_info=request_debug_enabled())
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+    
+    importance = None
+    if include_importance and state['feature_importance'] is not None:
+        importance = feature_importance_response()
+    
+    return model_response(
+        AnalysisResponse(prediction=prediction, similar=similar, feature_importance=importance),
+        headers=model_version_headers([prediction])
+    )
@@ -0,0 +1,127 @@
+"""Streaming bulk scoring endpoint"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from ..core.config import STREAM_CHUNK_SIZE
+from ..core.logger import get_logger
+from ..core.schemas import PokemonStats, ResponseDetail
+from ..utils.responses import dump_model, dumps
+from ..utils.streaming import (
+    prime_stream, iter_lines, decode_line, make_row_parser, to_stats, describe_row_error, HeaderError
+)
+from .predict import state, score_rows, DETAIL_DESCRIPTION
+
+router = APIRouter()
+logger = get_logger("stream")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that leaves the receive channel to the endpoint.
+
+    The stock class listens for a client disconnect on `receive` while it
+    streams, which swallows request body messages the generator still needs
+    to read. Here the generator itself is the only reader; a disconnect
+    surfaces as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _line(payload: Dict[str, Any]) -> bytes:
+    return dumps(payload) + b"\n"
+
+
+async def stream_predictions(
+    chunks: AsyncIterator[bytes],
+    content_type: Optional[str],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    detail: ResponseDetail = ResponseDetail.contributions
+) -> AsyncIterator[bytes]:
+    """
+    Read rows as the body arrives and score them `chunk_size` at a time.
+    Only one chunk of input and output is held at once, so memory does not
+    grow with the size of the upload. Every output line carries its 0-based
+    input `row`, in input order; invalid rows get an `error` instead of a
+    prediction and don't stop the stream.
+    """
+    parser = make_row_parser(content_type)
+    # (row, stats or None, echoed id fields, error or None)
+    pending: List[Tuple[int, Optional[PokemonStats], Dict[str, Any], Optional[str]]] = []
+    rows = 0
+    errors = 0
+
+    async def flush() -> AsyncIterator[bytes]:
+        results = iter(await score_rows([stats for _, stats, _, _ in pending if stats is not None], detail))
+        for row, stats, ids, error in pending:
+            if stats is None:
+                yield _line({"row": row, **ids, "error": error})
+            else:
+                yield _line({"row": row, **ids, **dump_model(next(results), exclude_none=True)})
+        pending.clear()
+
+    async for line in iter_lines(chunks):
+        try:
+            record = parser.parse(decode_line(line))
+            if record is None:
+                continue
+            stats, ids = to_stats(record)
+            pending.append((rows, stats, ids, None))
+        except HeaderError as e:
+            yield _line({"row": None, "error": str(e)})
+            return
+        except (ValueError, ValidationError) as e:
+            pending.append((rows, None, {}, describe_row_error(e)))
+            errors += 1
+        rows += 1
+
+        if len(pending) >= chunk_size:
+            async for payload in flush():
+                yield payload
+
+    if pending:
+        async for payload in flush():
+            yield payload
+
+    logger.info("Stream scored", extra={"rows": rows, "errors": errors})
+
+
+@router.post("/predict/stream")
+async def predict_stream(
+    request: Request,
+    detail: ResponseDetail = Query(ResponseDetail.contributions, description=DETAIL_DESCRIPTION)
+):
+    """
+    Score an NDJSON (default) or CSV (Content-Type: text/csv) body of stat
+    lines, streaming one NDJSON result per input row as chunks complete.
+    """
+    if state['model'] is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    executor = state['executor']
+    if executor is not None and executor.in_flight >= executor.capacity:
+        raise HTTPException(status_code=503, detail="Inference pool saturated", headers={"Retry-After": "1"})
+
+    chunks = await prime_stream(request.stream())
+    content_type = request.headers.get("content-type")
+    
+    async def body():
+        try:
+            async for payload in stream_predictions(chunks, content_type, detail=detail):
+                yield payload
+        except HTTPException as e:
+            # Headers are already sent, so report the failure in-band
+            yield _line({"row": None, "error": e.detail})
+        except Exception as e:
+            logger.error("Streaming prediction error: %s", e)
+            yield _line({"row": None, "error": f"Prediction error: {str(e)}"})
+
+    return DuplexStreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
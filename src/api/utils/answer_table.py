@@ -0,0 +1,231 @@
+"""Precomputed /predict answers stored in a memory-mapped hash table"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from ..core.config import FEATURE_NAMES
+from ..core.logger import get_logger
+
+logger = get_logger("answer_table")
+
+MAGIC = b"PKMNANS1"
+# Bump when the slot layout changes; tables in another format are ignored
+TABLE_FORMAT = 2
+# Multiplicative (Fibonacci) hashing constant, 2^64 / golden ratio
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK_64 = (1 << 64) - 1
+DATA_ALIGNMENT = 64
+
+# One hash table slot; key 0 marks an empty slot (stats are never 0)
+SLOT_DTYPE = np.dtype([
+    ('key', '<u8'),
+    ('probability', '<f8'),
+    ('probability_non_legendary', '<f8'),
+    ('method', 'u1'),
+    ('contributions', '<f8', (len(FEATURE_NAMES),)),
+], align=True)
+
+
+def pack_stats(values: Sequence[int]) -> int:
+    """Pack six 1-255 stat values into one integer key, one byte per stat"""
+    key = 0
+    for shift, value in enumerate(values):
+        key |= (int(value) & 0xFF) << (8 * shift)
+    return key
+
+
+def _home_slot(key: int, bits: int) -> int:
+    return ((key * HASH_MULTIPLIER) & MASK_64) >> (64 - bits)
+
+
+# ============================================================================
+# ANSWER TABLE
+# ============================================================================
+
+class AnswerTable:
+    """
+    Read-only open-addressing hash table of precomputed predictions.
+
+    File layout: 8-byte magic, little-endian uint64 header length, a JSON
+    header (model version, explanation methods, slot count), padding to a
+    64-byte boundary, then `n_slots` fixed-size records. The records are
+    memory-mapped, so a lookup touches a handful of pages and workers share
+    the file through the page cache.
+    """
+
+    def __init__(self, slots: np.ndarray, header: Dict, path: Optional[str] = None):
+        self.slots = slots
+        self.header = header
+        self.path = path
+        self.methods: List[str] = header['methods']
+        self.model_version: Optional[str] = header.get('model_version')
+        self.bits = int(len(slots)).bit_length() - 1
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return int(self.header['entries'])
+
+    @classmethod
+    def load(cls, path: str) -> "AnswerTable":
+        """Memory-map a table written by write_answer_table()"""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not an answer table: {path}")
+            header_length = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(header_length))
+        if header.get('format') != TABLE_FORMAT:
+            raise ValueError(f"Answer table format {header.get('format')} is not {TABLE_FORMAT}, rebuild it: {path}")
+        slots = np.memmap(
+            path, dtype=SLOT_DTYPE, mode='r',
+            offset=header['data_offset'], shape=(header['slots'],)
+        )
+        return cls(slots, header, path)
+
+    def lookup(self, values: Sequence[int]) -> Optional[Tuple[float, float, str, np.ndarray]]:
+        """
+        Return (probability_legendary, probability_non_legendary, method,
+        contributions) for a stat line, or None
+        """
+        key = pack_stats(values)
+        mask = len(self.slots) - 1
+        slot = _home_slot(key, self.bits)
+        while True:
+            record = self.slots[slot]
+            stored = int(record['key'])
+            if stored == key:
+                self._count(hit=True)
+                return (
+                    float(record['probability']), float(record['probability_non_legendary']),
+                    self.methods[record['method']], record['contributions']
+                )
+            if stored == 0:
+                self._count(hit=False)
+                return None
+            slot = (slot + 1) & mask
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "path": self.path,
+            "entries": len(self),
+            "slots": len(self.slots),
+            "region": self.header.get('region'),
+            "model_version": self.model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# ============================================================================
+# BUILDING
+# ============================================================================
+
+def write_answer_table(
+    path: str,
+    entries: Iterable[Tuple[Sequence[int], float, float, str, Sequence[float]]],
+    model_version: Optional[str],
+    explanation_method: Optional[str] = None,
+    region: str = "custom",
+    load_factor: float = 0.5
+) -> Dict:
+    """
+    Write (stats, probability_legendary, probability_non_legendary, method,
+    contributions) entries to `path`. `explanation_method` names the
+    explainer the entries were computed with (see describe_explainer).
+    The table is sized to a power of two at or below `load_factor` so probe
+    sequences stay short. Returns the header that was written.
+    """
+    entries = list(entries)
+    bits = max(4, int(np.ceil(np.log2(max(1, len(entries)) / load_factor))))
+    slots = np.zeros(1 << bits, dtype=SLOT_DTYPE)
+    mask = len(slots) - 1
+    methods: List[str] = []
+    inserted = 0
+
+    for values, probability, probability_non_legendary, method, contributions in entries:
+        key = pack_stats(values)
+        slot = _home_slot(key, bits)
+        while slots[slot]['key'] not in (0, key):
+            slot = (slot + 1) & mask
+        if slots[slot]['key'] == 0:
+            inserted += 1
+        if method not in methods:
+            methods.append(method)
+        slots[slot] = (key, probability, probability_non_legendary, methods.index(method), contributions)
+
+    header = {
+        'format': TABLE_FORMAT,
+        'features': FEATURE_NAMES,
+        'model_version': model_version,
+        'explanation_method': explanation_method,
+        'region': region,
+        'methods': methods,
+        'entries': inserted,
+        'slots': len(slots),
+    }
+    # data_offset depends on the header length, so encode once to measure it
+    prefix_length = len(MAGIC) + 8
+    encoded = json.dumps({**header, 'data_offset': 0}).encode()
+    data_offset = -(-(prefix_length + len(encoded) + 32) // DATA_ALIGNMENT) * DATA_ALIGNMENT
+    header['data_offset'] = data_offset
+    encoded = json.dumps(header).encode()
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(encoded).to_bytes(8, 'little'))
+        f.write(encoded)
+        f.write(b'\0' * (data_offset - prefix_length - len(encoded)))
+        f.write(slots.tobytes())
+    os.replace(tmp_path, path)
+    return header
+
+
+def load_answer_table(path: str, model_version: Optional[str], explanation_method: Optional[str]) -> Optional[AnswerTable]:
+    """
+    Open the answer table at `path` if it matches the serving model and
+    explainer; a table built for anything else would serve stale answers.
+    """
+    if not path or not os.path.exists(path):
+        logger.info("No answer table found", extra={"path": path})
+        return None
+    try:
+        table = AnswerTable.load(path)
+    except Exception as e:
+        logger.warning("Error loading answer table: %s", e, extra={"path": path})
+        return None
+
+    if table.model_version != model_version:
+        logger.warning("Answer table built for another model, ignoring it", extra={
+            "table_model_version": table.model_version, "model_version": model_version
+        })
+        return None
+    # Rows can fall back per stat line, so the methods stored per row can't
+    # tell a fallback-only build from a SHAP one; the header records the explainer
+    built_with = table.header.get('explanation_method')
+    if explanation_method is not None and built_with != explanation_method:
+        logger.warning("Answer table built with another explainer, ignoring it", extra={
+            "table_explanation_method": built_with, "explanation_method": explanation_method
+        })
+        return None
+
+    logger.info("Answer table attached (memory-mapped)", extra={
+        "entries": len(table), "region": table.header.get('region'), "path": path
+    })
+    return table
@@ -0,0 +1,167 @@
+"""Micro-batching scheduler for concurrent prediction requests"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .executor import ExecutorSaturatedError, InferenceExecutor
+
+
+# ============================================================================
+# MICRO-BATCHER
+# ============================================================================
+
+class MicroBatcher:
+    """
+    Collect concurrent requests into small batches.
+
+    Items submitted within `window_ms` of the first queued item (or until
+    `max_batch_size` items are queued) are passed together to `process_batch`,
+    which runs in a worker thread and must return one result per item.
+    Submissions beyond `max_queue_size` are rejected with ExecutorSaturatedError.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        window_ms: float = 5.0,
+        max_batch_size: int = 32,
+        executor: Optional[InferenceExecutor] = None,
+        max_queue_size: int = 1024
+    ):
+        self.process_batch = process_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.executor = executor
+        self.max_queue_size = max(1, max_queue_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.batches_processed = 0
+        self.items_processed = 0
+        self.last_batch_size = 0
+        self.largest_batch_size = 0
+        self.total_wait_seconds = 0.0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the batching loop on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching loop and fail any requests still queued or in flight"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        queued = []
+        while self._queue is not None and not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        self._fail(queued, RuntimeError("Micro-batcher stopped"))
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future, float]], error: BaseException):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its own result"""
+        if not self.running:
+            raise RuntimeError("Micro-batcher is not running")
+        if self.queue_depth >= self.max_queue_size:
+            self.rejected += 1
+            raise ExecutorSaturatedError(f"Micro-batch queue full ({self.max_queue_size} waiting)")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        """
+        Wait for the first item, then gather more until the window closes.
+        Items are appended to `batch` as they arrive, so the caller still
+        holds them if the collection is cancelled halfway.
+        """
+        batch.append(await self._queue.get())
+        deadline = time.perf_counter() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[Any, asyncio.Future, float]] = []
+            try:
+                await self._collect(batch)
+                items = [item for item, _, _ in batch]
+                started = time.perf_counter()
+
+                if self.executor is not None:
+                    results = await self.executor.run(self.process_batch, items)
+                else:
+                    results = await loop.run_in_executor(None, self.process_batch, items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"Batch returned {len(results)} results for {len(items)} items"
+                    )
+            except asyncio.CancelledError:
+                # Stopped while this batch was being collected or scored; its callers would wait forever
+                self._fail(batch, RuntimeError("Micro-batcher stopped"))
+                raise
+            except Exception as e:
+                self._fail(batch, e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+            self.batches_processed += 1
+            self.items_processed += len(batch)
+            self.last_batch_size = len(batch)
+            self.largest_batch_size = max(self.largest_batch_size, len(batch))
+            self.total_wait_seconds += sum(started - queued_at for _, _, queued_at in batch)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and batch size metrics for tuning the window"""
+        return {
+            "enabled": True,
+            "running": self.running,
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "rejected": self.rejected,
+            "batches_processed": self.batches_processed,
+            "items_processed": self.items_processed,
+            "last_batch_size": self.last_batch_size,
+            "largest_batch_size": self.largest_batch_size,
+            "average_batch_size": (
+                self.items_processed / self.batches_processed if self.batches_processed else 0.0
+            ),
+            "average_queue_wait_ms": (
+                self.total_wait_seconds * 1000.0 / self.items_processed if self.items_processed else 0.0
+            )
+        }
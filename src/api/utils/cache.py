@@ -0,0 +1,103 @@
+"""In-process LRU/TTL cache for prediction and similarity responses"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from ..core.config import FEATURE_NAMES
+
+
+def stats_key(stats) -> Tuple[int, ...]:
+    """Cache key for a PokemonStats input: its six stat values in feature order"""
+    return tuple(getattr(stats, name) for name in FEATURE_NAMES)
+
+
+# ============================================================================
+# PREDICTION CACHE
+# ============================================================================
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with optional time-to-live.
+
+    Keys are (kind, model_version, stat tuple). Switching to a different model
+    version drops every entry, so stale predictions are never served.
+    """
+
+    def __init__(self, capacity: int = 4096, ttl_seconds: float = 3600.0):
+        self.capacity = max(0, capacity)
+        self.ttl = ttl_seconds if ttl_seconds > 0 else None
+        self.model_version: Optional[str] = None
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def set_model_version(self, version: Optional[str]):
+        """Record the active model version, clearing the cache if it changed"""
+        with self._lock:
+            if version != self.model_version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.model_version = version
+
+    def get(self, kind: str, key: Tuple[int, ...]) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        full_key = (kind, self.model_version, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[full_key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(full_key)
+            self.hits += 1
+            return value
+
+    def put(self, kind: str, key: Tuple[int, ...], value: Any):
+        if not self.enabled:
+            return
+        full_key = (kind, self.model_version, key)
+        with self._lock:
+            self._entries[full_key] = (time.monotonic(), value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "model_version": self.model_version,
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
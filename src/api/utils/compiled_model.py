@@ -0,0 +1,221 @@
+"""Tree ensembles compiled to flat NumPy node arrays for low-latency inference"""
+
+from typing import Optional
+import numpy as np
+
+from ..core.logger import get_logger
+
+logger = get_logger("compiled_model")
+
+# Rows per traversal chunk; each chunk materializes a (rows, n_nodes) index matrix
+CHUNK_ROWS = 64
+
+
+# ============================================================================
+# COMPILED FOREST
+# ============================================================================
+
+class CompiledForest:
+    """
+    A fitted sklearn tree ensemble flattened into one set of node arrays.
+
+    Every node of every tree sits in the same arrays, so a prediction needs a
+    single vectorized comparison of the input against all split thresholds,
+    followed by `depth` gathers that walk all trees at once. Leaves point to
+    themselves, so the walk needs no per-tree termination check.
+
+    Nodes are addressed by slot = 2 * node: `children[slot]` is the left child's
+    slot and `children[slot + 1]` the right one, so each step of the walk is
+    `slot = children[slot + goes_right[slot]]`.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        leaf_proba: np.ndarray,
+        root_slots: np.ndarray,
+        depth: int,
+        classes: np.ndarray,
+        n_features: int
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf_proba = leaf_proba
+        self.root_slots = root_slots
+        self.depth = depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.root_slots)
+
+    @classmethod
+    def from_sklearn(cls, model) -> "CompiledForest":
+        """Flatten a fitted single-output tree classifier or forest of them"""
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None and hasattr(model, 'tree_'):
+            estimators = [model]
+        if not estimators or not all(hasattr(e, 'tree_') for e in estimators):
+            raise ValueError(f"{type(model).__name__} is not a tree ensemble")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output tree models can be compiled")
+
+        trees = [e.tree_ for e in estimators]
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+        n_nodes = int(offsets[-1])
+        n_classes = trees[0].value.shape[2]
+
+        feature = np.zeros(n_nodes, dtype=np.intp)
+        threshold = np.full(n_nodes, np.inf)
+        children = np.empty((n_nodes, 2), dtype=np.intp)
+        leaf_proba = np.zeros((n_nodes, n_classes))
+
+        for offset, tree in zip(offsets[:-1], trees):
+            nodes = slice(offset, offset + tree.node_count)
+            is_leaf = tree.children_left == -1
+            own_index = np.arange(tree.node_count) + offset
+
+            # Leaves compare against +inf and loop back to themselves
+            feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            threshold[nodes] = np.where(is_leaf, np.inf, tree.threshold)
+            children[nodes, 0] = np.where(is_leaf, own_index, tree.children_left + offset)
+            children[nodes, 1] = np.where(is_leaf, own_index, tree.children_right + offset)
+
+            # Older sklearn stores class counts, newer stores fractions; normalize both
+            value = tree.value[:, 0, :]
+            totals = value.sum(axis=1, keepdims=True)
+            leaf_proba[nodes] = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+
+        return cls(
+            feature=feature,
+            threshold=_float32_floor(threshold),
+            children=(2 * children).ravel(),
+            leaf_proba=leaf_proba,
+            root_slots=2 * offsets[:-1].astype(np.intp),
+            depth=max(t.max_depth for t in trees),
+            classes=np.asarray(getattr(model, 'classes_', np.arange(n_classes))),
+            n_features=trees[0].n_features
+        )
+
+    def apply(self, X) -> np.ndarray:
+        """Leaf node reached in every tree, shape (n_rows, n_trees)"""
+        X = np.asarray(X, dtype=np.float32).reshape(-1, self.n_features_in_)
+        if len(X) == 1:
+            return self._apply_row(X[0])[None, :]
+
+        leaves = np.empty((len(X), self.n_trees), dtype=np.intp)
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            leaves[start:start + len(chunk)] = self._apply_chunk(chunk)
+        return leaves
+
+    def _apply_row(self, row: np.ndarray) -> np.ndarray:
+        # Only even entries are read; the odd half just keeps slots addressable
+        goes_right = np.empty(len(self.children), dtype=bool)
+        np.greater(row.take(self.feature), self.threshold, out=goes_right[::2])
+        slot = self.root_slots
+        for _ in range(self.depth):
+            slot = self.children.take(slot + goes_right.take(slot))
+        return slot >> 1
+
+    def _apply_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        n_slots = len(self.children)
+        goes_right = np.empty((len(chunk), n_slots), dtype=bool)
+        np.greater(chunk[:, self.feature], self.threshold, out=goes_right[:, ::2])
+        goes_right = goes_right.ravel()
+
+        row_offsets = (np.arange(len(chunk)) * n_slots)[:, None]
+        slot = np.broadcast_to(self.root_slots, (len(chunk), self.n_trees))
+        for _ in range(self.depth):
+            slot = self.children.take(slot + goes_right.take(slot + row_offsets))
+        return slot >> 1
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities averaged over trees, as sklearn's forests do"""
+        leaves = self.apply(X)
+        per_tree = self.leaf_proba.take(leaves.ravel(), axis=0).reshape(leaves.shape + (-1,))
+        return per_tree.sum(axis=1) / self.n_trees
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+    """
+    Round float64 thresholds down to float32. sklearn casts inputs to float32
+    and tests `x <= threshold` in float64; for any float32 x that is the same
+    test as `x <= floor32(threshold)`, so the whole comparison stays float32.
+    """
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+# ============================================================================
+# COMPILATION WITH SELF-CHECK
+# ============================================================================
+
+def _check_rows(compiled: CompiledForest, scaler=None, n_rows: int = 512, seed: int = 0) -> np.ndarray:
+    """
+    Rows for the startup self-check: realistic stat lines (scaled like live
+    requests) plus values placed exactly on split thresholds, where a
+    float32/float64 or <=/< mismatch would show up.
+    """
+    rng = np.random.default_rng(seed)
+    n_features = compiled.n_features_in_
+
+    stats = rng.integers(1, 256, size=(n_rows, n_features)).astype(float)
+    realistic = scaler.transform(stats) if scaler is not None else stats
+
+    internal = np.isfinite(compiled.threshold)
+    on_threshold = np.asarray(realistic, dtype=float).copy()
+    for i in range(n_features):
+        thresholds = compiled.threshold[internal & (compiled.feature == i)]
+        if len(thresholds):
+            on_threshold[:, i] = rng.choice(thresholds, size=n_rows)
+
+    return np.vstack([realistic, on_threshold])
+
+
+def compile_model(model, scaler=None, tolerance: float = 1e-9) -> Optional[CompiledForest]:
+    """
+    Compile a tree model and verify it against the model's own predict_proba.
+    Returns None (so callers keep using sklearn) if the model can't be compiled
+    or any probability differs by more than `tolerance`.
+    """
+    try:
+        compiled = CompiledForest.from_sklearn(model)
+    except (ValueError, AttributeError) as e:
+        logger.info("Model not compiled: %s", e, extra={"model_type": type(model).__name__})
+        return None
+
+    rows = _check_rows(compiled, scaler)
+    expected = model.predict_proba(rows)
+    batch_error = float(np.max(np.abs(compiled.predict_proba(rows) - expected)))
+    # Single rows take a different traversal path, check it separately
+    single_error = max(
+        float(np.max(np.abs(compiled.predict_proba(rows[i]) - expected[i])))
+        for i in range(0, len(rows), 16)
+    )
+    max_error = max(batch_error, single_error)
+
+    if max_error > tolerance:
+        logger.warning("Compiled model failed self-check, using sklearn inference", extra={
+            "max_abs_error": max_error, "rows": len(rows)
+        })
+        return None
+
+    logger.info("Compiled model passed self-check", extra={
+        "trees": compiled.n_trees, "nodes": compiled.n_nodes, "depth": compiled.depth,
+        "rows": len(rows), "max_abs_error": max_error
+    })
+    return compiled
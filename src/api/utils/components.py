@@ -0,0 +1,88 @@
+"""Deferred loading of expensive startup components"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ..core.logger import get_logger
+
+logger = get_logger("components")
+
+
+# ============================================================================
+# LAZY COMPONENT
+# ============================================================================
+
+class LazyComponent:
+    """
+    A component built on first use or in a background thread.
+
+    With `blocking=True` the first get() builds the component and waits for it.
+    With `blocking=False` get() never waits: it returns None until a background
+    load started by start_background() has finished, so callers can serve a
+    cheaper fallback in the meantime.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        blocking: bool = True,
+        on_ready: Optional[Callable[[Any], None]] = None
+    ):
+        self.name = name
+        self.loader = loader
+        self.blocking = blocking
+        self.on_ready = on_ready
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "failed")
+
+    def get(self) -> Any:
+        """Return the component, loading it now if this component is blocking"""
+        if self.ready or not self.blocking:
+            return self._value
+        return self._load()
+
+    def start_background(self) -> threading.Thread:
+        """Build the component in a daemon thread"""
+        thread = threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self) -> Any:
+        with self._lock:
+            if self.ready:
+                return self._value
+
+            self.status = "loading"
+            started = time.perf_counter()
+            try:
+                self._value = self.loader()
+                self.status = "ready"
+            except Exception as e:
+                self.error = str(e)
+                self.status = "failed"
+                logger.error("Failed to load %s: %s", self.name, e)
+            self.load_seconds = time.perf_counter() - started
+            logger.info("Component loaded", extra={
+                "component": self.name, "status": self.status, "seconds": round(self.load_seconds, 4)
+            })
+
+        if self.status == "ready" and self.on_ready is not None:
+            self.on_ready(self._value)
+        return self._value
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "available": self._value is not None,
+            "load_seconds": self.load_seconds,
+            "error": self.error
+        }
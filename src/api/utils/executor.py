@@ -0,0 +1,95 @@
+"""Bounded execution layer for blocking model and SHAP work"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when no inference capacity is left and the request should be shed"""
+
+
+# ============================================================================
+# INFERENCE EXECUTOR
+# ============================================================================
+
+class InferenceExecutor:
+    """
+    Thread pool for model inference and explanations with back-pressure.
+
+    At most `max_workers` jobs run at once and at most `max_pending` more may
+    wait for a free worker. Anything beyond that is rejected immediately with
+    ExecutorSaturatedError instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(0, max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        # Only touched from the event loop thread, so no lock is needed
+        self._in_flight = 0
+
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_pending
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def saturated(self) -> bool:
+        return self._in_flight >= self.capacity
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn` in the pool, or raise ExecutorSaturatedError if it is full"""
+        if self.saturated:
+            self.rejected += 1
+            raise ExecutorSaturatedError(
+                f"Inference pool saturated ({self._in_flight}/{self.capacity} jobs in flight)"
+            )
+
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        job = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        # The slot is held until the job itself is done, not until this
+        # coroutine stops waiting: a cancelled request can't stop a job that
+        # is already running in a worker thread
+        job.add_done_callback(lambda _: self._release(loop))
+        try:
+            result = await asyncio.wrap_future(job)
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        """Free a slot; called from the worker thread once its job is done"""
+        def release():
+            self._in_flight -= 1
+
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            # The loop has already closed; nobody is left to admit
+            pass
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,192 @@
+"""Prometheus-style metrics for requests and prediction pipeline stages"""
+
+import bisect
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond model calls to slow explanations
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ============================================================================
+# METRIC TYPES
+# ============================================================================
+
+class Counter:
+    """Monotonically increasing counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(tuple(str(v) for v in labelvalues), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down, usually set at scrape time"""
+
+    kind = "gauge"
+
+    def set(self, *labelvalues: str, value: float):
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, sum and count per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labelvalues: str, value: float):
+        key = tuple(str(v) for v in labelvalues)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(tuple(str(v) for v in labelvalues))
+        return series[2] if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._series.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_COUNT = registry.register(Counter(
+    "pokemon_api_requests_total", "HTTP requests handled", ("method", "path", "status")
+))
+REQUEST_ERRORS = registry.register(Counter(
+    "pokemon_api_request_errors_total", "HTTP requests that ended in a 5xx response or exception", ("method", "path")
+))
+REQUEST_LATENCY = registry.register(Histogram(
+    "pokemon_api_request_duration_seconds", "End-to-end HTTP request latency", ("method", "path")
+))
+STAGE_LATENCY = registry.register(Histogram(
+    "pokemon_api_stage_duration_seconds", "Latency of each prediction pipeline stage", ("stage",)
+))
+EXPLANATIONS = registry.register(Counter(
+    "pokemon_api_explanations_total", "Predictions explained, by explanation method", ("method",)
+))
+RUNTIME_GAUGES = registry.register(Gauge(
+    "pokemon_api_runtime", "Point-in-time runtime values (cache, pool and batcher state)", ("name",)
+))
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Record how long the enclosed block takes as a pipeline stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(stage, value=time.perf_counter() - started)
+
+
+def process_memory() -> Dict[str, float]:
+    """
+    Memory of the current process in MB. On Linux this includes PSS, which
+    splits shared pages between the processes using them and so shows the
+    effect of copy-on-write sharing across gunicorn workers.
+    """
+    memory = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"):
+                    memory[key.lower() + "_mb"] = round(int(rest.split()[0]) / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    memory["peak_rss_mb"] = round(peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+    memory["pid"] = os.getpid()
+    return memory
@@ -1,14 +1,24 @@
 """Model loading and management utilities"""
 
 import os
+import gc
+import hashlib
 import joblib
 import numpy as np
 from typing import Optional, Any, Dict
 
 from ..core.config import (
     MODEL_PATH, SCALER_PATH, FEATURE_IMPORTANCE_PATH, 
-    TRAINING_DATA_PATH, BACKGROUND_DATA_PATH, FEATURE_NAMES
+    TRAINING_DATA_PATH, BACKGROUND_DATA_PATH, FEATURE_NAMES,
+    EXPLANATION_MODE, EXPLANATION_MODES, SHARED_ARRAYS_DIR, COMPILED_INFERENCE
 )
+from .similarity import SimilarityIndex, build_similarity_index, INDEX_LAYOUT_VERSION
+from .explainers import ExactShapExplainer
+from .compiled_model import CompiledForest, compile_model
+from .pipeline import InferencePipeline
+from ..core.logger import get_logger
+
+logger = get_logger("model_loader")
 
 # Check SHAP availability
 try:
@@ -16,7 +26,7 @@ try:
     SHAP_AVAILABLE = True
 except ImportError:
     SHAP_AVAILABLE = False
-    print("⚠️ SHAP not installed. Using fallback explanation method.")
+    logger.warning("SHAP not installed, SHAP explainers unavailable")
 
 
 # ============================================================================
@@ -29,25 +39,43 @@ def load_model(model_path: str = MODEL_PATH):
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found: {model_path}")
         model = joblib.load(model_path)
-        print(f"✅ Model loaded successfully: {type(model).__name__}")
+        logger.info("Model loaded successfully", extra={"model_type": type(model).__name__, "path": model_path})
         return model
     except Exception as e:
-        print(f"❌ Error loading model: {str(e)}")
+        logger.error("Error loading model: %s", e, extra={"path": model_path})
         raise
 
 
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents, as hex"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_model_version(model_path: str = MODEL_PATH) -> Optional[str]:
+    """Identify a model file by a short hash of its contents"""
+    try:
+        return file_digest(model_path)[:12]
+    except OSError as e:
+        logger.warning("Could not hash model file: %s", e)
+        return None
+
+
 def load_scaler(scaler_path: str = SCALER_PATH) -> Optional[Any]:
     """Load feature scaler"""
     try:
         if os.path.exists(scaler_path):
             scaler = joblib.load(scaler_path)
-            print(f"✅ Scaler loaded successfully")
+            logger.info("Scaler loaded successfully", extra={"path": scaler_path})
             return scaler
         else:
-            print("ℹ️ No scaler found")
+            logger.info("No scaler found", extra={"path": scaler_path})
             return None
     except Exception as e:
-        print(f"⚠️ Warning loading scaler: {str(e)}")
+        logger.warning("Error loading scaler: %s", e)
         return None
 
 
@@ -56,28 +84,70 @@ def load_feature_importance(importance_path: str = FEATURE_IMPORTANCE_PATH) -> O
     try:
         if os.path.exists(importance_path):
             importance = joblib.load(importance_path)
-            print(f"✅ Feature importance loaded")
+            logger.info("Feature importance loaded")
             return importance
         else:
-            print("ℹ️ No pre-computed feature importance found")
+            logger.info("No pre-computed feature importance found")
             return None
     except Exception as e:
-        print(f"⚠️ Warning loading feature importance: {str(e)}")
+        logger.warning("Error loading feature importance: %s", e)
         return None
 
 
-def load_training_data(data_path: str = TRAINING_DATA_PATH):
-    """Load training data for similar Pokemon comparisons"""
+def _source_signature(path: str) -> Dict[str, Any]:
+    # The layout version invalidates caches written by an older SimilarityIndex.save
+    return {'sha256': file_digest(path), 'layout': INDEX_LAYOUT_VERSION}
+
+
+def load_training_data(
+    data_path: str = TRAINING_DATA_PATH,
+    shared_dir: Optional[str] = SHARED_ARRAYS_DIR
+) -> Optional[SimilarityIndex]:
+    """
+    Load training data and build the similar Pokemon index.
+
+    With `shared_dir` set, the columnar index is cached there as .npy files
+    keyed on the source file's hash. Later starts (and every gunicorn worker)
+    memory-map those read-only instead of unpickling the DataFrame; the
+    pickle is only read again when its contents change. If the cache can't
+    be written, the index is built in memory as without `shared_dir`.
+    """
     try:
-        if os.path.exists(data_path):
-            data = joblib.load(data_path)
-            print(f"✅ Training data loaded: {len(data)} samples")
-            return data
-        else:
-            print("ℹ️ No training data file found")
+        if not os.path.exists(data_path):
+            logger.info("No training data file found", extra={"path": data_path})
             return None
+        
+        if shared_dir:
+            signature = _source_signature(data_path)
+            if SimilarityIndex.read_meta(shared_dir) == signature:
+                index = SimilarityIndex.load(shared_dir, mmap_mode='r')
+                logger.info("Training data attached (memory-mapped cache)", extra={"samples": len(index), "directory": shared_dir})
+                return index
+        
+        index = build_similarity_index(joblib.load(data_path))
+        logger.info("Training data loaded", extra={"samples": len(index)})
+        
+        if shared_dir:
+            try:
+                index.save(shared_dir, meta=signature)
+                index = SimilarityIndex.load(shared_dir, mmap_mode='r')
+                logger.info("Training data cache written", extra={"directory": shared_dir})
+            except OSError as e:
+                logger.warning("Could not write training data cache, keeping it in memory: %s", e, extra={"directory": shared_dir})
+        return index
+    except Exception as e:
+        logger.warning("Error loading training data: %s", e)
+        return None
+
+
+def load_compiled_model(model, scaler=None, enabled: bool = COMPILED_INFERENCE) -> Optional[CompiledForest]:
+    """Compiled copy of a tree model for fast inference, or None to use the model itself"""
+    if not enabled or model is None:
+        return None
+    try:
+        return compile_model(model, scaler)
     except Exception as e:
-        print(f"⚠️ Error loading training data: {str(e)}")
+        logger.warning("Model compilation failed, using sklearn inference: %s", e)
         return None
 
 
@@ -107,7 +177,7 @@ def extract_feature_importance(model) -> Dict[str, Any]:
         }
     
     except Exception as e:
-        print(f"⚠️ Error extracting feature importance: {str(e)}")
+        logger.warning("Error extracting feature importance: %s", e)
         return {
             'importances': np.ones(len(FEATURE_NAMES)) / len(FEATURE_NAMES),
             'type': 'uniform'
@@ -118,19 +188,42 @@ def extract_feature_importance(model) -> Dict[str, Any]:
 # SHAP EXPLAINER INITIALIZATION
 # ============================================================================
 
-def initialize_shap_explainer(model, background_data_path: str = BACKGROUND_DATA_PATH):
-    """Initialize SHAP explainer with proper error handling"""
-    if not SHAP_AVAILABLE:
-        print("ℹ️ SHAP not available, will use fallback method")
+def initialize_shap_explainer(
+    model,
+    background_data_path: str = BACKGROUND_DATA_PATH,
+    mode: str = EXPLANATION_MODE,
+    scaler=None
+):
+    """
+    Initialize the explainer selected by `mode` with proper error handling.
+
+    Modes:
+    - auto: TreeExplainer for tree models, LinearExplainer for linear models,
+      otherwise the exact coalition explainer
+    - tree / linear / kernel: the corresponding SHAP explainer
+    - exact: exact SHAP values by coalition enumeration (no SHAP package needed)
+    - none: no explainer, always use the fallback method
+    """
+    mode = (mode or "auto").lower()
+    if mode not in EXPLANATION_MODES:
+        logger.warning("Unknown explanation mode %r, using 'auto'", mode)
+        mode = "auto"
+    
+    if mode == "none":
+        logger.info("Explanation mode 'none', will use fallback method")
+        return None
+    
+    if mode in ("tree", "linear", "kernel") and not SHAP_AVAILABLE:
+        logger.warning("SHAP not available for mode %r, will use fallback method", mode)
         return None
     
     try:
         # Load or create background data
         if os.path.exists(background_data_path):
             background_data = joblib.load(background_data_path)
-            print(f"✅ Background data loaded: shape {background_data.shape}")
+            logger.info("Background data loaded", extra={"shape": background_data.shape})
         else:
-            print("⚠️ Creating synthetic background data for SHAP")
+            logger.info("Creating synthetic background data for SHAP")
             # Create diverse background samples
             background_data = np.array([
                 [45, 49, 49, 65, 65, 45],    # Weak pokemon
@@ -140,33 +233,109 @@ def initialize_shap_explainer(model, background_data_path: str = BACKGROUND_DATA
                 [120, 134, 110, 131, 110, 100], # Strong legendary
             ])
         
+        # Background rows are raw stats; explainers see the same scaled features as the model
+        if scaler is not None:
+            background_data = scaler.transform(np.asarray(background_data, dtype=float))
+        
         model_type = type(model).__name__
-        print(f"🔍 Attempting to initialize SHAP for {model_type}")
+        logger.debug("Attempting to initialize %s explainer for %s", mode, model_type)
+        
+        is_tree_model = any(x in model_type for x in ['RandomForest', 'XGB', 'GradientBoosting', 'DecisionTree', 'ExtraTrees'])
+        is_linear_model = hasattr(model, 'coef_')
         
         # Try TreeExplainer first for tree-based models
-        if any(x in model_type for x in ['RandomForest', 'XGB', 'GradientBoosting', 'DecisionTree', 'ExtraTrees']):
+        if SHAP_AVAILABLE and (mode == "tree" or (mode == "auto" and is_tree_model)):
             try:
                 explainer = shap.TreeExplainer(model)
-                print(f"✅ SHAP TreeExplainer initialized successfully")
+                logger.info("SHAP TreeExplainer initialized")
+                return explainer
+            except Exception as e:
+                logger.warning("TreeExplainer failed: %s", e)
+                if mode == "tree":
+                    return None
+        
+        # Exact closed form for linear models
+        if SHAP_AVAILABLE and (mode == "linear" or (mode == "auto" and is_linear_model)):
+            try:
+                explainer = shap.LinearExplainer(model, background_data)
+                logger.info("SHAP LinearExplainer initialized")
                 return explainer
             except Exception as e:
-                print(f"⚠️ TreeExplainer failed: {str(e)}, trying KernelExplainer")
+                logger.warning("LinearExplainer failed: %s", e)
+                if mode == "linear":
+                    return None
         
-        # Fallback to KernelExplainer
+        # Explainers for arbitrary models need the probability of class 1. Their
+        # inputs are already scaled, so the pipeline only runs the model; its
+        # calls get their own stage so they don't inflate predict_proba
+        explainer_pipeline = InferencePipeline(model)
+        predict_fn = lambda x: explainer_pipeline.predict(x, stage="explainer_predict")[1]
+        
+        if mode == "kernel":
+            try:
+                explainer = shap.KernelExplainer(predict_fn, background_data)
+                logger.info("SHAP KernelExplainer initialized")
+                return explainer
+            except Exception as e:
+                logger.warning("KernelExplainer failed: %s", e)
+                return None
+        
+        # Exact coalition enumeration for everything else
         try:
-            # For KernelExplainer, we need a prediction function
-            if hasattr(model, 'predict_proba'):
-                predict_fn = lambda x: model.predict_proba(x)[:, 1]  # Probability of class 1
-            else:
-                predict_fn = model.predict
-            
-            explainer = shap.KernelExplainer(predict_fn, background_data)
-            print(f"✅ SHAP KernelExplainer initialized successfully")
+            explainer = ExactShapExplainer(predict_fn, background_data)
+            logger.info("Exact SHAP explainer initialized")
             return explainer
         except Exception as e:
-            print(f"⚠️ KernelExplainer failed: {str(e)}")
+            logger.warning("Exact explainer failed: %s", e)
             return None
     
     except Exception as e:
-        print(f"❌ SHAP initialization failed completely: {str(e)}")
+        logger.error("SHAP initialization failed completely: %s", e)
         return None
+
+
+# ============================================================================
+# PRELOADING
+# ============================================================================
+
+# Artifacts loaded in the gunicorn master before workers fork
+_preloaded: Dict[str, Any] = {}
+
+
+def preload_artifacts() -> Dict[str, Any]:
+    """
+    Load every artifact once in the current (master) process.
+
+    Intended for gunicorn's preload_app: workers forked afterwards reuse these
+    objects copy-on-write instead of unpickling their own copies. The garbage
+    collector is frozen afterwards so collections in the workers don't write
+    to (and thereby un-share) the preloaded objects.
+    """
+    if _preloaded:
+        return _preloaded
+    
+    model = load_model()
+    scaler = load_scaler()
+    feature_importance = load_feature_importance()
+    if feature_importance is None:
+        feature_importance = extract_feature_importance(model)
+    
+    _preloaded.update({
+        'model': model,
+        'model_version': compute_model_version(),
+        'scaler': scaler,
+        'compiled_model': load_compiled_model(model, scaler),
+        'feature_importance': feature_importance,
+        'shap_explainer': initialize_shap_explainer(model, scaler=scaler),
+        'training_data': load_training_data(),
+    })
+    
+    gc.collect()
+    gc.freeze()
+    logger.info("Artifacts preloaded for forked workers", extra={"pid": os.getpid()})
+    return _preloaded
+
+
+def get_preloaded_artifacts() -> Dict[str, Any]:
+    """Artifacts loaded by preload_artifacts(), or an empty dict"""
+    return _preloaded
@@ -0,0 +1,138 @@
+"""Scaler and model fused into one inference step"""
+
+from operator import attrgetter
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+from ..core.config import FEATURE_NAMES, PREDICTION_THRESHOLD, COMPILED_MAX_ROWS
+from ..core.logger import get_logger
+from .metrics import time_stage
+
+logger = get_logger("pipeline")
+
+# Reads the six stats off a PokemonStats in FEATURE_NAMES order
+_stat_values = attrgetter(*FEATURE_NAMES)
+
+
+# ============================================================================
+# INFERENCE PIPELINE
+# ============================================================================
+
+class InferencePipeline:
+    """
+    Preprocessing and inference for one model version, built once at load time.
+
+    A StandardScaler or RobustScaler is kept as its raw center and scale
+    arrays and applied in place, with the same operations sklearn uses, so
+    results are bit-identical without sklearn's per-call input validation
+    (or its feature-name warning for plain arrays). Other scalers, or any
+    scaler with `fuse_scaler=False`, are called as-is. Small inputs go to
+    the compiled model, larger ones to sklearn, the same routing as before.
+    """
+
+    def __init__(
+        self,
+        model,
+        scaler=None,
+        compiled_model=None,
+        threshold: float = PREDICTION_THRESHOLD,
+        fuse_scaler: bool = True
+    ):
+        self.model = model
+        self.compiled_model = compiled_model
+        self.threshold = threshold
+        self.n_features = len(FEATURE_NAMES)
+        self.scaler = None
+        self.center: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+        if fuse_scaler and scaler is not None and type(scaler).__name__ in ('StandardScaler', 'RobustScaler'):
+            center = getattr(scaler, 'mean_', getattr(scaler, 'center_', None))
+            if getattr(scaler, 'with_mean', getattr(scaler, 'with_centering', True)) and center is not None:
+                self.center = np.asarray(center, dtype=float)
+            if getattr(scaler, 'with_std', getattr(scaler, 'with_scaling', True)) and scaler.scale_ is not None:
+                self.scale = np.asarray(scaler.scale_, dtype=float)
+        elif scaler is not None:
+            # Unknown transform; keep calling it rather than guess its arithmetic
+            self.scaler = scaler
+            logger.info("Scaler not fused, calling transform()", extra={"scaler_type": type(scaler).__name__})
+
+        classes = list(getattr(model, 'classes_', [0, 1]))
+        self.legendary_column = classes.index(1) if 1 in classes else len(classes) - 1
+        self.non_legendary_column = classes.index(0) if 0 in classes else 0
+
+    @property
+    def fused(self) -> bool:
+        return self.scaler is None
+
+    def buffer(self, n_rows: int) -> np.ndarray:
+        """An uninitialized (n_rows, n_features) buffer to pass as `out`"""
+        return np.empty((n_rows, self.n_features))
+
+    def features(self, stats_list: Sequence, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Model input for PokemonStats rows, written into `out` if given"""
+        with time_stage("prepare_features"):
+            if out is None:
+                out = self.buffer(len(stats_list))
+            for row, stats in enumerate(stats_list):
+                out[row] = _stat_values(stats)
+        return self.transform(out, out=out)
+
+    def transform(self, stats_matrix: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Scale raw stats in FEATURE_NAMES order. With `out` (which may be the
+        input itself) the result is written there instead of a new array.
+        """
+        with time_stage("scaler_transform"):
+            if self.scaler is not None:
+                scaled = self.scaler.transform(np.asarray(stats_matrix, dtype=float).reshape(-1, self.n_features))
+                if out is None:
+                    return scaled
+                out[...] = scaled
+                return out
+
+            if out is None:
+                out = np.array(stats_matrix, dtype=float).reshape(-1, self.n_features)
+            elif out is not stats_matrix:
+                out[...] = stats_matrix
+            if self.center is not None:
+                np.subtract(out, self.center, out=out)
+            if self.scale is not None:
+                np.divide(out, self.scale, out=out)
+            return out
+
+    def predict(self, features: np.ndarray, stage: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(predictions, legendary_probabilities) for already scaled features"""
+        predictions, prob_legendary, _ = self.predict_probabilities(features, stage)
+        return predictions, prob_legendary
+
+    def predict_probabilities(self, features: np.ndarray, stage: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (predictions, legendary_probabilities, non_legendary_probabilities)
+        for already scaled features, both probabilities from one predict_proba
+        call. `stage` overrides the timing label of the model call.
+        """
+        model = self.model
+        if self.compiled_model is not None and len(features) <= COMPILED_MAX_ROWS:
+            model = self.compiled_model
+
+        if not hasattr(model, 'predict_proba'):
+            with time_stage(stage or "predict"):
+                predictions = np.asarray(model.predict(features)).astype(int)
+            prob_legendary = (predictions == 1).astype(float)
+            return predictions, prob_legendary, 1.0 - prob_legendary
+
+        with time_stage(stage or "predict_proba"):
+            probabilities = model.predict_proba(features)
+        prob_legendary = probabilities[:, self.legendary_column].astype(float)
+        prob_non_legendary = probabilities[:, self.non_legendary_column].astype(float)
+        return (prob_legendary > self.threshold).astype(int), prob_legendary, prob_non_legendary
+
+    def score(self, stats_list: Sequence, out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (features, predictions, legendary_probabilities, non_legendary_probabilities)
+        for PokemonStats rows
+        """
+        features = self.features(stats_list, out=out)
+        predictions, prob_legendary, prob_non_legendary = self.predict_probabilities(features)
+        return features, predictions, prob_legendary, prob_non_legendary
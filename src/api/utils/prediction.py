@@ -1,31 +1,17 @@
 """Prediction and explanation utilities"""
 
-from typing import List, Tuple
+import logging
+from typing import List, Optional, Sequence, Tuple
 import numpy as np
 
 from ..core.config import FEATURE_NAMES, FEATURE_DISPLAY_NAMES, REFERENCE_STATS
 from ..core.schemas import PokemonStats, FeatureContribution
+from ..core.logger import get_logger, get_request_logger
+from .cache import stats_key
+from .metrics import time_stage, EXPLANATIONS
 
-
-# ============================================================================
-# FEATURE PREPARATION
-# ============================================================================
-
-def prepare_features(stats: PokemonStats, scaler=None) -> np.ndarray:
-    """Prepare feature array from Pokemon stats"""
-    features = np.array([
-        stats.hp,
-        stats.attack,
-        stats.defense,
-        stats.sp_attack,
-        stats.sp_defense,
-        stats.speed
-    ]).reshape(1, -1)
-    
-    if scaler is not None:
-        features = scaler.transform(features)
-    
-    return features
+logger = get_logger("prediction")
+request_logger = get_request_logger()
 
 
 # ============================================================================
@@ -46,6 +32,133 @@ def calculate_confidence(probability: float) -> str:
 # FALLBACK CONTRIBUTIONS
 # ============================================================================
 
+# Reference stat lines as rows indexed by prediction (0 = non-legendary, 1 = legendary)
+REFERENCE_MATRIX = np.array([
+    [REFERENCE_STATS['non_legendary'][name] for name in FEATURE_NAMES],
+    [REFERENCE_STATS['legendary'][name] for name in FEATURE_NAMES],
+])
+
+# explanation_method of contributions computed without an explainer
+FALLBACK_METHOD = "fallback (importance-based)"
+
+# Label codes produced by classify_fallback_contributions
+IMPACT_LABELS = ("Negative", "Positive", "Neutral")
+MAGNITUDE_LABELS = ("Low", "Medium", "High")
+# Same references as plain tuples for the single-row path
+REFERENCE_ROWS = tuple(tuple(row) for row in REFERENCE_MATRIX.tolist())
+# Upper bounds (inclusive) of the Low and Medium fallback magnitudes
+FALLBACK_MAGNITUDE_BINS = np.array([0.05, 0.15])
+FALLBACK_MAGNITUDE_BOUNDS = tuple(FALLBACK_MAGNITUDE_BINS.tolist())
+FALLBACK_NEUTRAL_BELOW = 0.01
+
+
+def fallback_contribution_values(
+    stats_matrix: np.ndarray,
+    predictions: Sequence[int],
+    probabilities: Sequence[float],
+    feature_importance: dict
+) -> np.ndarray:
+    """
+    Importance-weighted deviation from the reference stats for a whole batch.
+    Returns an (n_samples, n_features) matrix in FEATURE_NAMES order.
+    """
+    legendary = np.asarray(predictions).reshape(-1) == 1
+    probabilities = np.asarray(probabilities, dtype=float).reshape(-1)
+    
+    # Normalized deviation (-1 to 1) from the reference for the predicted class
+    reference = np.where(legendary[:, None], REFERENCE_MATRIX[1], REFERENCE_MATRIX[0])
+    deviation = (np.asarray(stats_matrix) - reference) / 100.0
+    
+    # Weighted by importance and by the probability of the predicted class, negated
+    # for non-legendary (p - 1 is exactly -(1 - p), so values match the scalar formula)
+    weight = np.where(legendary, probabilities, probabilities - 1)
+    return deviation * feature_importance['importances'] * weight[:, None]
+
+
+def classify_fallback_contributions(values: np.ndarray, abs_values: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Impact and magnitude codes (indices into IMPACT_LABELS and
+    MAGNITUDE_LABELS) for a matrix of fallback contribution values.
+    """
+    if abs_values is None:
+        abs_values = np.abs(values)
+    neutral = abs_values < FALLBACK_NEUTRAL_BELOW
+    impact = np.where(neutral, 2, values > 0)
+    # searchsorted(side='left') is digitize(right=True): 0.05 is Low, 0.15 is Medium
+    magnitude = np.where(neutral, 0, np.searchsorted(FALLBACK_MAGNITUDE_BINS, abs_values))
+    return impact, magnitude
+
+
+# (feature, display name) in FEATURE_NAMES order, shared by every contribution built
+FEATURE_LABELS = tuple((name, FEATURE_DISPLAY_NAMES[name]) for name in FEATURE_NAMES)
+
+# "HP is ", "Attack is ", ... in FEATURE_NAMES order
+_EXPLANATION_PREFIXES = [f"{FEATURE_DISPLAY_NAMES[name]} is " for name in FEATURE_NAMES]
+
+
+def _fallback_explanation(i: int, value: int, ref_value: int) -> str:
+    if value > ref_value:
+        return f"{_EXPLANATION_PREFIXES[i]}above average ({value} vs {ref_value})"
+    if value < ref_value:
+        return f"{_EXPLANATION_PREFIXES[i]}below average ({value} vs {ref_value})"
+    return f"{_EXPLANATION_PREFIXES[i]}at average ({value})"
+
+
+def build_fallback_contributions(
+    stats_row: Sequence[int],
+    reference: Sequence[int],
+    order: Sequence[int],
+    values: Sequence[float],
+    impact: Sequence[int],
+    magnitude: Sequence[int]
+) -> List[FeatureContribution]:
+    """
+    Create one row's contributions, in `order`, from precomputed values and
+    label codes. Explanation strings are only built here, so callers that
+    need the numbers alone never pay for them.
+    """
+    return [
+        FeatureContribution(
+            feature=FEATURE_LABELS[i][0],
+            display_name=FEATURE_LABELS[i][1],
+            value=float(stats_row[i]),
+            contribution=values[i],
+            impact=IMPACT_LABELS[impact[i]],
+            magnitude=MAGNITUDE_LABELS[magnitude[i]],
+            explanation=_fallback_explanation(i, stats_row[i], reference[i])
+        )
+        for i in order
+    ]
+
+
+def calculate_fallback_contributions_batch(
+    stats_list: List[PokemonStats],
+    predictions: Sequence[int],
+    probabilities: Sequence[float],
+    feature_importance: dict
+) -> List[List[FeatureContribution]]:
+    """Fallback contributions for many rows, largest first, with one vectorized pass"""
+    if not stats_list:
+        return []
+    stats_matrix = np.array([stats_key(stats) for stats in stats_list], dtype=np.int64)
+    legendary = np.asarray(predictions).reshape(-1) == 1
+    values = fallback_contribution_values(stats_matrix, legendary, probabilities, feature_importance)
+    abs_values = np.abs(values)
+    impact, magnitude = classify_fallback_contributions(values, abs_values)
+    # Stable sort keeps feature order among equal contributions
+    order = np.argsort(-abs_values, axis=1, kind='stable')
+    references = np.where(legendary[:, None], REFERENCE_MATRIX[1], REFERENCE_MATRIX[0])
+    
+    # Plain Python lists: per-element NumPy scalar access is slower than the work itself
+    return [
+        build_fallback_contributions(*row)
+        for row in zip(
+            stats_matrix.tolist(), references.tolist(), order.tolist(),
+            values.tolist(), impact.tolist(), magnitude.tolist()
+        )
+    ]
+
+
 def calculate_fallback_contributions(
     stats: PokemonStats, 
     prediction: int, 
@@ -55,77 +168,123 @@ def calculate_fallback_contributions(
     """
     Fallback method when SHAP is not available.
     Uses feature importance weighted by deviation from reference values.
+
+    Plain Python for the single row /predict needs: the arithmetic and
+    labels are the same as calculate_fallback_contributions_batch, without
+    its fixed NumPy setup cost.
     """
-    contributions = []
-    
-    # Get feature importance
+    legendary = int(prediction) == 1
+    reference = REFERENCE_ROWS[legendary]
     importances = feature_importance['importances']
+    # Same operand order as fallback_contribution_values, so results are bit-identical
+    weight = probability if legendary else probability - 1
+    stats_row = stats_key(stats)
+    low_bound, medium_bound = FALLBACK_MAGNITUDE_BOUNDS
+
+    values, impact, magnitude = [], [], []
+    for i, value in enumerate(stats_row):
+        contribution = (value - reference[i]) / 100.0 * float(importances[i]) * weight
+        abs_contribution = abs(contribution)
+        values.append(contribution)
+        if abs_contribution < FALLBACK_NEUTRAL_BELOW:
+            impact.append(2)
+            magnitude.append(0)
+        else:
+            impact.append(int(contribution > 0))
+            magnitude.append(0 if abs_contribution <= low_bound else 1 if abs_contribution <= medium_bound else 2)
+
+    # Stable, so equal contributions keep feature order
+    order = sorted(range(len(values)), key=lambda i: -abs(values[i]))
+    return build_fallback_contributions(stats_row, reference, order, values, impact, magnitude)
+
+
+# ============================================================================
+# SHAP CONTRIBUTIONS
+# ============================================================================
+
+def compute_shap_values(features: np.ndarray, shap_explainer) -> np.ndarray:
+    """
+    Run the SHAP explainer once over an (n_samples, n_features) matrix.
+    Returns the legendary-class SHAP values with shape (n_samples, n_features).
+    """
+    shap_values = shap_explainer.shap_values(features)
     
-    # Reference stats based on prediction
-    if prediction == 1:
-        reference = REFERENCE_STATS['legendary']
-    else:
-        reference = REFERENCE_STATS['non_legendary']
+    if request_logger.isEnabledFor(logging.DEBUG):
+        request_logger.debug("Raw SHAP values (%s): %s", type(shap_values).__name__, shap_values)
     
-    # Calculate contributions for each feature
-    for i, feature_name in enumerate(FEATURE_NAMES):
-        value = getattr(stats, feature_name)
-        ref_value = reference[feature_name]
-        importance = importances[i]
-        
-        # Calculate normalized deviation (-1 to 1)
-        deviation = (value - ref_value) / 100.0
-        
-        # Weight deviation by feature importance and prediction probability
-        if prediction == 1:
-            contribution_value = deviation * importance * probability
+    # Handle different SHAP output formats
+    if isinstance(shap_values, list):
+        # Binary classification returns list [class_0_values, class_1_values]
+        if len(shap_values) == 2:
+            shap_values = shap_values[1]  # Use class 1 (legendary)
         else:
-            contribution_value = -deviation * importance * (1 - probability)
+            shap_values = shap_values[0]
+    
+    shap_values = np.asarray(shap_values)
+    
+    # Newer SHAP versions return (n_samples, n_features, n_classes)
+    if shap_values.ndim == 3:
+        shap_values = shap_values[:, :, 1] if shap_values.shape[2] == 2 else shap_values[:, :, 0]
+    
+    return shap_values.reshape(len(features), -1)
+
+
+def describe_explainer(shap_explainer) -> str:
+    """
+    Name of the explanation path served by an explainer, e.g. 'SHAP (TreeExplainer)',
+    or FALLBACK_METHOD when there is no explainer
+    """
+    if shap_explainer is None:
+        return FALLBACK_METHOD
+    name = getattr(shap_explainer, 'method_name', None) or type(shap_explainer).__name__
+    return f"SHAP ({name})"
+
+
+_SHAP_EXPLANATIONS = {
+    "Positive": "Pushes prediction toward Legendary",
+    "Negative": "Pushes prediction toward Non-Legendary",
+    "Neutral": "Minimal impact on prediction",
+}
+
+
+def build_shap_contributions(stats: PokemonStats, shap_values: np.ndarray) -> List[FeatureContribution]:
+    """Create per-feature contributions from one row of SHAP values"""
+    values = stats_key(stats)
+    rows = []
+    for i, contribution_value in enumerate(np.asarray(shap_values, dtype=float).tolist()):
+        abs_contrib = abs(contribution_value)
         
         # Determine impact
-        if abs(contribution_value) < 0.01:
+        if abs_contrib < 0.001:
             impact = "Neutral"
             magnitude = "Low"
         else:
             impact = "Positive" if contribution_value > 0 else "Negative"
-            abs_contrib = abs(contribution_value)
-            if abs_contrib > 0.15:
+            if abs_contrib > 0.1:
                 magnitude = "High"
-            elif abs_contrib > 0.05:
+            elif abs_contrib > 0.03:
                 magnitude = "Medium"
             else:
                 magnitude = "Low"
-        
-        # Generate explanation
-        if value > ref_value:
-            comparison = f"above average ({value} vs {ref_value})"
-        elif value < ref_value:
-            comparison = f"below average ({value} vs {ref_value})"
-        else:
-            comparison = f"at average ({value})"
-        
-        explanation = f"{FEATURE_DISPLAY_NAMES[feature_name]} is {comparison}"
-        
-        contributions.append(FeatureContribution(
-            feature=feature_name,
-            display_name=FEATURE_DISPLAY_NAMES[feature_name],
-            value=float(value),
-            contribution=float(contribution_value),
-            impact=impact,
-            magnitude=magnitude,
-            explanation=explanation
-        ))
+        rows.append((abs_contrib, i, contribution_value, impact, magnitude))
     
-    # Sort by absolute contribution
-    contributions.sort(key=lambda x: abs(x.contribution), reverse=True)
+    # Sort by absolute contribution (stable, so ties keep feature order)
+    rows.sort(key=lambda row: row[0], reverse=True)
     
-    return contributions
+    return [
+        FeatureContribution(
+            feature=FEATURE_LABELS[i][0],
+            display_name=FEATURE_LABELS[i][1],
+            value=float(values[i]),
+            contribution=contribution_value,
+            impact=impact,
+            magnitude=magnitude,
+            explanation=_SHAP_EXPLANATIONS[impact]
+        )
+        for _, i, contribution_value, impact, magnitude in rows
+    ]
 
 
-# ============================================================================
-# SHAP CONTRIBUTIONS
-# ============================================================================
-
 def calculate_shap_contributions(
     features: np.ndarray,
     stats: PokemonStats,
@@ -138,86 +297,78 @@ def calculate_shap_contributions(
     Calculate SHAP values or use fallback method.
     Returns (contributions_list, method_used)
     """
-    
+    return calculate_batch_contributions(
+        features, [stats], [prediction], [probability],
+        feature_importance, shap_explainer
+    )[0]
+
+
+def calculate_batch_contributions(
+    features: np.ndarray,
+    stats_list: List[PokemonStats],
+    predictions: Sequence[int],
+    probabilities: Sequence[float],
+    feature_importance: dict,
+    shap_explainer=None
+) -> List[Tuple[List[FeatureContribution], str]]:
+    """
+    Calculate contributions for a batch with a single SHAP call.
+    Rows where SHAP is unusable fall back individually.
+    Returns one (contributions_list, method_used) tuple per row.
+    """
+    results = _batch_contributions(
+        features, stats_list, predictions, probabilities, feature_importance, shap_explainer
+    )
+    for _, method in results:
+        EXPLANATIONS.inc(method)
+    return results
+
+
+def _batch_contributions(features, stats_list, predictions, probabilities, feature_importance, shap_explainer):
     # Try SHAP first
     if shap_explainer is not None:
         try:
-            print("🔍 Calculating SHAP values...")
-            
-            # Calculate SHAP values
-            shap_values = shap_explainer.shap_values(features)
-            
-            print(f"📊 Raw SHAP values: {shap_values}")
-            print(f"📊 Type: {type(shap_values)}")
-            
-            # Handle different SHAP output formats
-            if isinstance(shap_values, list):
-                # Binary classification returns list [class_0_values, class_1_values]
-                if len(shap_values) == 2:
-                    shap_values = shap_values[1]  # Use class 1 (legendary)
-                    print(f"📊 Using class 1 SHAP values: {shap_values}")
-                else:
-                    shap_values = shap_values[0]
-            
-            # Extract first sample if it's 2D
-            if len(shap_values.shape) > 1:
-                shap_values = shap_values[0]
+            request_logger.debug("Calculating SHAP values for %d sample(s)", len(stats_list))
+            with time_stage("shap"):
+                shap_matrix = compute_shap_values(features, shap_explainer)
+            method = describe_explainer(shap_explainer)
             
-            print(f"📊 Final SHAP values: {shap_values}")
-            
-            # Check if we got meaningful values
-            if np.all(shap_values == 0) or np.isnan(shap_values).any():
-                print("⚠️ SHAP returned all zeros or NaN, using fallback")
-                return calculate_fallback_contributions(stats, prediction, probability, feature_importance), "fallback (SHAP returned zeros)"
-            
-            # Create contributions from SHAP values
-            contributions = []
-            for i, feature_name in enumerate(FEATURE_NAMES):
-                value = getattr(stats, feature_name)
-                contribution_value = float(shap_values[i])
+            results = []
+            unusable = []
+            for row, stats in enumerate(stats_list):
+                shap_values = shap_matrix[row]
                 
-                # Determine impact
-                if abs(contribution_value) < 0.001:
-                    impact = "Neutral"
-                    magnitude = "Low"
+                # Check if we got meaningful values
+                if np.all(shap_values == 0) or np.isnan(shap_values).any():
+                    logger.warning("SHAP returned all zeros or NaN, using fallback", extra={"stats": stats_key(stats)})
+                    unusable.append(row)
+                    results.append(None)
                 else:
-                    impact = "Positive" if contribution_value > 0 else "Negative"
-                    abs_contrib = abs(contribution_value)
-                    if abs_contrib > 0.1:
-                        magnitude = "High"
-                    elif abs_contrib > 0.03:
-                        magnitude = "Medium"
-                    else:
-                        magnitude = "Low"
-                
-                # Generate explanation
-                if impact == "Positive":
-                    explanation = f"Pushes prediction toward Legendary"
-                elif impact == "Negative":
-                    explanation = f"Pushes prediction toward Non-Legendary"
-                else:
-                    explanation = f"Minimal impact on prediction"
-                
-                contributions.append(FeatureContribution(
-                    feature=feature_name,
-                    display_name=FEATURE_DISPLAY_NAMES[feature_name],
-                    value=float(value),
-                    contribution=contribution_value,
-                    impact=impact,
-                    magnitude=magnitude,
-                    explanation=explanation
-                ))
+                    with time_stage("shap_contributions"):
+                        results.append((build_shap_contributions(stats, shap_values), method))
             
-            # Sort by absolute contribution
-            contributions.sort(key=lambda x: abs(x.contribution), reverse=True)
+            if unusable:
+                with time_stage("fallback_contributions"):
+                    fallback = calculate_fallback_contributions_batch(
+                        [stats_list[row] for row in unusable],
+                        [predictions[row] for row in unusable],
+                        [probabilities[row] for row in unusable],
+                        feature_importance
+                    )
+                for row, contributions in zip(unusable, fallback):
+                    results[row] = (contributions, "fallback (SHAP returned zeros)")
             
-            return contributions, "SHAP"
+            return results
         
         except Exception as e:
-            print(f"❌ SHAP calculation failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("SHAP calculation failed: %s", e, exc_info=request_logger.isEnabledFor(logging.DEBUG))
     
     # Fallback method
-    print("ℹ️ Using fallback contribution method")
-    return calculate_fallback_contributions(stats, prediction, probability, feature_importance), "fallback (importance-based)"
+    request_logger.debug("Using fallback contribution method")
+    with time_stage("fallback_contributions"):
+        return [
+            (contributions, FALLBACK_METHOD)
+            for contributions in calculate_fallback_contributions_batch(
+                stats_list, predictions, probabilities, feature_importance
+            )
+        ]
@@ -0,0 +1,372 @@
+"""Versioned model artifacts with background loading and atomic hot-swap"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+from ..core.config import (
+    MODEL_PATH, SCALER_PATH, FEATURE_IMPORTANCE_PATH, FEATURE_NAMES, REFERENCE_STATS,
+    EXPLANATION_MODE, MODEL_REGISTRY_KEEP
+)
+from ..core.logger import get_logger
+from .model_loader import (
+    load_model, compute_model_version, load_scaler, load_feature_importance,
+    extract_feature_importance, initialize_shap_explainer, load_compiled_model
+)
+from .pipeline import InferencePipeline
+from .prediction import compute_shap_values, fallback_contribution_values
+
+logger = get_logger("registry")
+
+# Stat lines pushed through a freshly loaded version before it takes traffic
+WARMUP_STATS = np.array([
+    [REFERENCE_STATS['non_legendary'][name] for name in FEATURE_NAMES],
+    [REFERENCE_STATS['legendary'][name] for name in FEATURE_NAMES],
+    [1] * len(FEATURE_NAMES),
+    [255] * len(FEATURE_NAMES),
+], dtype=float)
+
+
+class ModelLoadInProgressError(RuntimeError):
+    """Raised when a load is requested while another one is still running"""
+
+
+# ============================================================================
+# MODEL VERSION
+# ============================================================================
+
+class ModelVersion:
+    """
+    One model together with the scaler, compiled copy, fused inference
+    pipeline, feature importance and explainer built for it. Requests score against a single version from start
+    to finish (see ModelRegistry.use), so a swap never mixes artifacts.
+    """
+
+    def __init__(
+        self,
+        version: Optional[str],
+        model,
+        scaler=None,
+        compiled_model=None,
+        feature_importance: Optional[Dict] = None,
+        shap_explainer=None,
+        source: Optional[Dict[str, str]] = None
+    ):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.compiled_model = compiled_model
+        self.feature_importance = feature_importance
+        self.shap_explainer = shap_explainer
+        self.pipeline = InferencePipeline(model, scaler, compiled_model)
+        self.source = source or {}
+        # Deferred artifacts of this version (the startup version in lazy/background mode)
+        self.components: Dict[str, Any] = {}
+        self.loaded_at = time.time()
+        self.activated_at: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def model_type(self) -> str:
+        return type(self.model).__name__
+
+    def explainer(self):
+        """The SHAP explainer, triggering a deferred load if it is lazy"""
+        explainer = self.shap_explainer
+        component = self.components.get('shap_explainer')
+        if explainer is None and component is not None:
+            explainer = component.get()
+        return explainer
+
+    def acquire(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self) -> int:
+        with self._lock:
+            self.in_flight -= 1
+            return self.in_flight
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "model_type": self.model_type,
+            "source": self.source,
+            "scaler": self.scaler is not None,
+            "compiled": self.compiled_model is not None,
+            "fused_scaler": self.pipeline.fused,
+            "explainer": type(self.shap_explainer).__name__ if self.shap_explainer is not None else None,
+            "loaded_at": self.loaded_at,
+            "activated_at": self.activated_at,
+            "warmup_seconds": self.warmup_seconds,
+            "in_flight": self.in_flight
+        }
+
+
+def load_model_version(
+    model_path: str = MODEL_PATH,
+    scaler_path: str = SCALER_PATH,
+    importance_path: str = FEATURE_IMPORTANCE_PATH,
+    explanation_mode: str = EXPLANATION_MODE
+) -> ModelVersion:
+    """Load a model and build every artifact that belongs to it"""
+    model = load_model(model_path)
+    scaler = load_scaler(scaler_path)
+    feature_importance = load_feature_importance(importance_path)
+    if feature_importance is None:
+        feature_importance = extract_feature_importance(model)
+
+    return ModelVersion(
+        compute_model_version(model_path),
+        model,
+        scaler=scaler,
+        compiled_model=load_compiled_model(model, scaler),
+        feature_importance=feature_importance,
+        shap_explainer=initialize_shap_explainer(model, mode=explanation_mode, scaler=scaler),
+        source={'model': model_path, 'scaler': scaler_path, 'feature_importance': importance_path}
+    )
+
+
+def warm_up(version: ModelVersion, stats: np.ndarray = WARMUP_STATS) -> float:
+    """Run sample predictions through every artifact; returns the seconds taken"""
+    started = time.perf_counter()
+    pipeline = version.pipeline
+    features = pipeline.transform(stats)
+
+    # One row and a batch, through both the compiled and the sklearn model
+    pipeline.predict(features[:1])
+    predictions, probabilities = pipeline.predict(features)
+    if version.compiled_model is not None:
+        version.model.predict_proba(features)
+
+    if version.shap_explainer is not None:
+        compute_shap_values(features[:1], version.shap_explainer)
+    fallback_contribution_values(stats, predictions, probabilities, version.feature_importance)
+
+    version.warmup_seconds = time.perf_counter() - started
+    return version.warmup_seconds
+
+
+# ============================================================================
+# MODEL REGISTRY
+# ============================================================================
+
+class ModelRegistry:
+    """
+    Loaded model versions and the one currently serving.
+
+    Activation swaps a single reference, so every request sees either the old
+    version or the new one. Up to `keep` previous versions stay loaded for
+    rollback; older ones are dropped once their in-flight requests drain.
+    """
+
+    def __init__(self, keep: int = MODEL_REGISTRY_KEEP):
+        self.keep = max(0, keep)
+        self.active: Optional[ModelVersion] = None
+        self.versions: "OrderedDict[str, ModelVersion]" = OrderedDict()
+        self.draining: List[ModelVersion] = []
+        self.loading: Optional[Dict[str, str]] = None
+        self._listeners: List[Callable[[ModelVersion, Optional[ModelVersion]], None]] = []
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+        # Metrics
+        self.swaps = 0
+        self.failed_loads = 0
+        self.last_error: Optional[str] = None
+
+    def on_activate(self, listener: Callable[[ModelVersion, Optional[ModelVersion]], None]):
+        """Call `listener(new, previous)` after every activation"""
+        self._listeners.append(listener)
+
+    def add(self, version: ModelVersion) -> ModelVersion:
+        """Register a loaded version without serving it"""
+        with self._lock:
+            replaced = self.versions.pop(version.version, None)
+            if replaced is not None and replaced is not self.active:
+                self.draining.append(replaced)
+            self.versions[version.version] = version
+        # Not retired on arrival, even with keep=0: load() still has to activate it
+        self._prune(spare=version)
+        return version
+
+    def activate(self, version_id: Optional[str]) -> ModelVersion:
+        """Serve a registered version from the next request on"""
+        with self._lock:
+            version = self.versions.get(version_id)
+            if version is None:
+                raise KeyError(version_id)
+            previous = self.active
+            if version is previous:
+                return version
+            version.activated_at = time.time()
+            self.active = version
+            self.versions.move_to_end(version_id)
+            if previous is not None:
+                self.swaps += 1
+                # A reload of the same version replaced the entry; drain the old object
+                if self.versions.get(previous.version) is not previous:
+                    self.draining.append(previous)
+
+        logger.info("Model version activated", extra={
+            "model_version": version.version,
+            "previous_version": previous.version if previous is not None else None
+        })
+        for listener in self._listeners:
+            listener(version, previous)
+        self._prune()
+        return version
+
+    def load(self, activate: bool = True, **paths) -> ModelVersion:
+        """
+        Load, warm up and register a version from artifact paths (see
+        load_model_version), then optionally activate it. Runs in the calling
+        thread; the serving version is untouched until the swap.
+        """
+        if not self._load_lock.acquire(blocking=False):
+            raise ModelLoadInProgressError("Another model version is already loading")
+        try:
+            self.loading = {name: str(path) for name, path in paths.items()}
+            started = time.perf_counter()
+            try:
+                version = load_model_version(**paths)
+                warm_up(version)
+            except Exception as e:
+                self.failed_loads += 1
+                self.last_error = str(e)
+                logger.error("Model version failed to load: %s", e, extra={"paths": self.loading})
+                raise
+
+            logger.info("Model version loaded", extra={
+                "model_version": version.version, "seconds": round(time.perf_counter() - started, 4),
+                "warmup_seconds": round(version.warmup_seconds, 4)
+            })
+            self.last_error = None
+            self.add(version)
+            if activate:
+                self.activate(version.version)
+            return version
+        finally:
+            self.loading = None
+            self._load_lock.release()
+
+    @contextmanager
+    def use(self) -> Iterator[Optional[ModelVersion]]:
+        """Pin the active version for the duration of one request"""
+        version = self.active
+        if version is None:
+            yield None
+            return
+        version.acquire()
+        try:
+            yield version
+        finally:
+            if version.release() == 0 and version in self.draining:
+                self._prune()
+
+    def _prune(self, spare: Optional[ModelVersion] = None):
+        with self._lock:
+            # Retire the oldest inactive versions beyond `keep`
+            inactive = [v for v in self.versions.values() if v is not self.active and v is not spare]
+            for version in inactive[:max(0, len(inactive) - self.keep)]:
+                del self.versions[version.version]
+                self.draining.append(version)
+
+            drained = [v for v in self.draining if v.in_flight <= 0]
+            self.draining = [v for v in self.draining if v.in_flight > 0]
+
+        for version in drained:
+            logger.info("Model version unloaded", extra={"model_version": version.version})
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "active": self.active.version if self.active is not None else None,
+            "versions": [v.describe() for v in reversed(self.versions.values())],
+            "draining": [v.describe() for v in self.draining],
+            "loading": self.loading,
+            "keep": self.keep,
+            "swaps": self.swaps,
+            "failed_loads": self.failed_loads,
+            "last_error": self.last_error
+        }
+
+
+# ============================================================================
+# FILE WATCHER
+# ============================================================================
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
+
+class ModelWatcher:
+    """
+    Poll artifact files and load a new version when they change.
+
+    A change is acted on once the files have looked the same for two polls
+    in a row, so a model that is still being copied into place is not read
+    half-written. Each worker process runs its own watcher.
+    """
+
+    def __init__(self, registry: ModelRegistry, interval: float, paths: Optional[Dict[str, str]] = None):
+        self.registry = registry
+        self.interval = interval
+        self.paths = paths or {
+            'model_path': MODEL_PATH, 'scaler_path': SCALER_PATH, 'importance_path': FEATURE_IMPORTANCE_PATH
+        }
+        self.reloads = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loaded = self._signature()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _signature(self) -> Tuple:
+        return tuple(_file_signature(path) for path in self.paths.values())
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def _run(self):
+        previous = self._loaded
+        while not self._stop.wait(self.interval):
+            current = self._signature()
+            stable = current == previous
+            previous = current
+            if not stable or current == self._loaded or current[0] is None:
+                continue
+
+            logger.info("Model files changed, loading new version", extra={"paths": self.paths})
+            try:
+                self.registry.load(**self.paths)
+                self.reloads += 1
+            except ModelLoadInProgressError:
+                continue
+            except Exception:
+                pass  # logged by the registry; retried only after the files change again
+            self._loaded = current
+
+    def describe(self) -> Dict[str, Any]:
+        return {"running": self.running, "interval_seconds": self.interval, "reloads": self.reloads, "paths": self.paths}
@@ -0,0 +1,56 @@
+"""Fast JSON rendering for responses built from already validated models"""
+
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from .metrics import time_stage
+
+# orjson is optional; without it plain payloads fall back to the standard encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Pydantic 2 serializes models to JSON in its compiled core, faster than
+# dumping to dicts and encoding those (even with orjson)
+PYDANTIC_JSON = hasattr(BaseModel, 'model_dump_json')
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def dump_model(model: BaseModel, exclude_none: bool = False) -> Dict[str, Any]:
+    """A model as plain Python data (nested models included)"""
+    if PYDANTIC_JSON:
+        return model.model_dump(exclude_none=exclude_none)
+    return model.dict(exclude_none=exclude_none)
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON for plain data, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    # Same settings as starlette's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def render_model(model: BaseModel, exclude_none: bool = True) -> bytes:
+    """A model as compact JSON, the same bytes FastAPI would send for it"""
+    if PYDANTIC_JSON:
+        return model.model_dump_json(exclude_none=exclude_none).encode("utf-8")
+    return dumps(dump_model(model, exclude_none=exclude_none))
+
+
+def model_response(model: BaseModel, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Send a response model the endpoint built (and so validated) itself.
+    Returning a Response makes FastAPI skip its own validation and
+    serialization pass against `response_model`, which stays on the route
+    for the schema. None fields are left out, as with response_model_exclude_none.
+    """
+    with time_stage("serialize"):
+        body = render_model(model)
+    return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
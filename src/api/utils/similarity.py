@@ -0,0 +1,276 @@
+"""Similar Pokemon lookup utilities"""
+
+import json
+import os
+from typing import Dict, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from ..core.config import FEATURE_NAMES
+
+# Columns that may hold the Pokemon name, in order of preference
+NAME_COLUMNS = ['name_stats', 'Name', 'pokemon_name']
+
+# Arrays written by SimilarityIndex.save, one .npy file each
+INDEX_ARRAYS = ('stats', 'names', 'bst', 'legendary', 'sq_norms', 'row_ids')
+INDEX_META_FILE = 'index_meta.json'
+# Bump when the saved arrays change shape or meaning, so old caches are rebuilt
+INDEX_LAYOUT_VERSION = 2
+
+# euclidean: raw stats; standardized: stats divided by per-feature scale;
+# cosine: 1 - cosine similarity, i.e. stat shape regardless of total
+METRICS = ('euclidean', 'standardized', 'cosine')
+
+
+# ============================================================================
+# SIMILARITY INDEX
+# ============================================================================
+
+class SimilarityIndex:
+    """
+    Precomputed nearest-neighbour index over the training data.
+
+    Stats are held as a contiguous float32 matrix together with names, BST
+    and legendary flags resolved once, so queries never touch pandas. All
+    arrays are read-only, whether built in memory or memory-mapped.
+
+    Rows are sorted by BST (`row_ids` keeps each row's position in the
+    training data), so a BST range is found by binary search and only the
+    rows inside it, optionally only legendary or non-legendary ones, are
+    scored.
+    """
+
+    def __init__(
+        self,
+        stats: np.ndarray,
+        names: np.ndarray,
+        bst: np.ndarray,
+        legendary: np.ndarray,
+        sq_norms: Optional[np.ndarray] = None,
+        row_ids: Optional[np.ndarray] = None
+    ):
+        # Plain ndarray views: indexing an np.memmap goes through Python-level
+        # subclass hooks on every call, the same data without them does not
+        names, bst, legendary = np.asarray(names), np.asarray(bst), np.asarray(legendary)
+        if row_ids is None:
+            # Stable, so rows with equal BST keep training-data order
+            row_ids = np.argsort(bst, kind='stable')
+            stats, names, bst, legendary = stats[row_ids], names[row_ids], bst[row_ids], legendary[row_ids]
+            sq_norms = None
+        self.stats = np.ascontiguousarray(stats, dtype=np.float32)
+        self.names = names
+        self.bst = bst
+        self.legendary = legendary
+        self.row_ids = np.asarray(row_ids)
+        # Squared norms let distances be computed as |a|^2 - 2ab + |b|^2
+        if sq_norms is None:
+            sq_norms = np.einsum('ij,ij->i', self.stats, self.stats)
+        self.sq_norms = np.asarray(sq_norms)
+        for array in (self.stats, self.names, self.bst, self.legendary, self.sq_norms, self.row_ids):
+            if array.flags.writeable:
+                array.setflags(write=False)
+
+        # Rows of each legendary group (still in BST order) for filtered queries
+        self._groups = {
+            flag: np.flatnonzero(self.legendary == int(flag)) for flag in (True, False)
+        }
+        # Metric spaces derived from the stats on first use
+        self._spaces: Dict[Tuple, Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]] = {}
+        self._default_scale: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    @classmethod
+    def from_dataframe(cls, data) -> "SimilarityIndex":
+        """Build the index from the training DataFrame"""
+        stats = data[FEATURE_NAMES].to_numpy(dtype=np.float32)
+        # Fixed-width unicode, the same dtype save() writes
+        names = _resolve_names(data).astype(str)
+        bst = stats.sum(axis=1).astype(np.int64)
+        if 'legendary' in data.columns:
+            legendary = data['legendary'].fillna(0).to_numpy().astype(np.int64)
+        else:
+            legendary = np.zeros(len(data), dtype=np.int64)
+        return cls(stats, names, bst, legendary)
+
+    def save(self, directory: str, meta: Optional[dict] = None):
+        """
+        Write the index as plain .npy files that can be memory-mapped.
+        Names are stored as fixed-width unicode so no pickling is involved.
+        """
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            'stats': self.stats,
+            'names': np.asarray(self.names, dtype=str),
+            'bst': np.asarray(self.bst, dtype=np.int64),
+            'legendary': np.asarray(self.legendary, dtype=np.int64),
+            'sq_norms': np.asarray(self.sq_norms, dtype=np.float32),
+            'row_ids': np.asarray(self.row_ids, dtype=np.int64),
+        }
+        # Write to temporary files first so concurrent workers never see partial arrays
+        for name, array in arrays.items():
+            tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.npy")
+            np.save(tmp_path, array, allow_pickle=False)
+            os.replace(tmp_path, os.path.join(directory, f"{name}.npy"))
+        
+        tmp_meta = os.path.join(directory, f".{INDEX_META_FILE}.{os.getpid()}")
+        with open(tmp_meta, 'w') as f:
+            json.dump(meta or {}, f)
+        os.replace(tmp_meta, os.path.join(directory, INDEX_META_FILE))
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> "SimilarityIndex":
+        """Attach to arrays written by save(), memory-mapped read-only by default"""
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in INDEX_ARRAYS
+        }
+        return cls(**arrays)
+
+    @staticmethod
+    def read_meta(directory: str) -> Optional[dict]:
+        """Metadata stored alongside saved arrays, or None if there are none"""
+        try:
+            with open(os.path.join(directory, INDEX_META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def default_scale(self) -> np.ndarray:
+        """Per-feature standard deviation of the training stats (what a StandardScaler fit on them uses)"""
+        if self._default_scale is None:
+            scale = self.stats.astype(np.float64).std(axis=0)
+            scale[scale == 0] = 1.0
+            scale.setflags(write=False)
+            self._default_scale = scale
+        return self._default_scale
+
+    def _space(self, metric: str, scale: Optional[np.ndarray]):
+        """(matrix, squared row norms, feature weights) the metric compares in"""
+        key = (metric, scale.tobytes() if scale is not None else None)
+        space = self._spaces.get(key)
+        if space is not None:
+            return space
+
+        if metric == 'euclidean':
+            space = (self.stats, self.sq_norms, None)
+        elif metric == 'standardized':
+            weights = 1.0 / scale
+            matrix = (self.stats.astype(np.float64) * weights).astype(np.float32)
+            space = (matrix, np.einsum('ij,ij->i', matrix, matrix), weights)
+        elif metric == 'cosine':
+            stats = self.stats.astype(np.float64)
+            matrix = (stats / np.sqrt(np.einsum('ij,ij->i', stats, stats))[:, None]).astype(np.float32)
+            space = (matrix, None, None)
+        else:
+            raise ValueError(f"Unknown similarity metric: {metric} (expected one of {', '.join(METRICS)})")
+
+        for array in space:
+            if array is not None:
+                array.setflags(write=False)
+        self._spaces[key] = space
+        return space
+
+    def _candidates(self, legendary: Optional[bool], min_bst: Optional[int], max_bst: Optional[int]) -> Union[slice, np.ndarray]:
+        """Rows passing the filters: a slice when only BST is filtered, else row numbers"""
+        if legendary is None:
+            bst = self.bst
+        else:
+            rows = self._groups[bool(legendary)]
+            bst = self.bst[rows]
+        lo = 0 if min_bst is None else int(np.searchsorted(bst, min_bst, side='left'))
+        hi = len(bst) if max_bst is None else int(np.searchsorted(bst, max_bst, side='right'))
+        hi = max(lo, hi)
+        return slice(lo, hi) if legendary is None else rows[lo:hi]
+
+    def query(
+        self,
+        vector,
+        k: int = 5,
+        metric: str = 'euclidean',
+        scale: Optional[Sequence[float]] = None,
+        legendary: Optional[bool] = None,
+        min_bst: Optional[int] = None,
+        max_bst: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (indices, distances) of the k nearest rows, closest first.
+
+        `scale` is the per-feature divisor for the standardized metric (for
+        example the model's scaler); without it the training data's own
+        standard deviation is used. `legendary` keeps only legendary (True)
+        or non-legendary (False) rows, and `min_bst`/`max_bst` bound the BST
+        inclusively.
+        """
+        if metric == 'standardized':
+            scale = np.asarray(scale, dtype=np.float64).reshape(-1) if scale is not None else self.default_scale()
+        else:
+            scale = None
+        matrix, sq_norms, weights = self._space(metric, scale)
+
+        rows = self._candidates(legendary, min_bst, max_bst)
+        subset = matrix[rows]
+        k = min(k, len(subset))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        # Rank in the float32 space; only the winners get exact distances
+        query = np.asarray(vector, dtype=np.float32).reshape(-1)
+        exact_query = query.astype(np.float64)
+        if metric == 'cosine':
+            unit = exact_query / np.sqrt(exact_query @ exact_query)
+            score = -(subset @ unit.astype(np.float32))
+        else:
+            if weights is not None:
+                query = (exact_query * weights).astype(np.float32)
+            score = sq_norms[rows] - 2.0 * (subset @ query) + float(query @ query)
+
+        if k < len(subset):
+            partition = np.argpartition(score, k)
+            candidates = partition[:k]
+            bound = score[candidates].max()
+            if score[partition[k]] <= bound:
+                # Rows tied with the k-th at the cut-off; keep them all so the order below settles it
+                candidates = np.flatnonzero(score <= bound)
+        else:
+            candidates = np.arange(len(subset))
+        positions = candidates + rows.start if isinstance(rows, slice) else rows[candidates]
+        # Ties keep training-data order, matching a stable sort over all rows
+        order = positions[np.lexsort((self.row_ids[positions], score[candidates]))][:k]
+
+        # Recompute exact distances for the winners to avoid float32 cancellation
+        stats = self.stats[order].astype(np.float64)
+        if metric == 'cosine':
+            similarity = (stats @ unit) / np.sqrt(np.einsum('ij,ij->i', stats, stats))
+            distances = np.clip(1.0 - similarity, 0.0, 2.0)
+        else:
+            diff = stats - exact_query
+            if weights is not None:
+                diff *= weights
+            distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        return order, distances
+
+
+def _resolve_names(data) -> np.ndarray:
+    """Resolve a display name per row from the first usable name column"""
+    names = np.full(len(data), None, dtype=object)
+    for col_name in NAME_COLUMNS:
+        if col_name not in data.columns:
+            continue
+        column = data[col_name]
+        usable = column.notna().to_numpy() & (column.astype(str) != '').to_numpy()
+        fill = (names == None) & usable  # noqa: E711 - elementwise comparison
+        names[fill] = column.astype(str).to_numpy()[fill]
+
+    # Fallback to Pokemon number if no name found
+    missing = np.flatnonzero(names == None)  # noqa: E711 - elementwise comparison
+    for idx in missing:
+        names[idx] = f"Pokemon #{idx + 1}"
+    return names
+
+
+def build_similarity_index(data) -> Optional[SimilarityIndex]:
+    """Build a similarity index from training data, or None if unavailable"""
+    if data is None:
+        return None
+    return SimilarityIndex.from_dataframe(data)
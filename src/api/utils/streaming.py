@@ -0,0 +1,149 @@
+"""Incremental parsing of NDJSON and CSV request bodies for bulk scoring"""
+
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from ..core.config import FEATURE_NAMES, STREAM_MAX_LINE_BYTES
+from ..core.schemas import PokemonStats
+
+# Columns copied from an input row to its result so callers can match them up
+ID_FIELDS = ('id', 'name')
+
+CSV_CONTENT_TYPES = ('text/csv', 'application/csv')
+
+
+async def prime_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Start reading a request body inside the endpoint. The request's receive
+    channel is only usable while the endpoint runs, so a StreamingResponse
+    generator must continue a body stream opened here rather than open one.
+    """
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def resumed() -> AsyncIterator[bytes]:
+        if first is not None:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+
+    return resumed()
+
+
+class LineTooLongError(ValueError):
+    """An input line is longer than the stream accepts"""
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: int = STREAM_MAX_LINE_BYTES
+) -> AsyncIterator[Union[bytes, LineTooLongError]]:
+    """
+    Split a byte stream into raw lines without buffering the whole body.
+    Lines stay undecoded (see decode_line) so a bad one fails on its own
+    row. A line over `max_line_bytes` is not buffered: a LineTooLongError
+    takes its place and its remaining bytes are skipped.
+    """
+    pending = bytearray()
+    # Inside an overlong line, dropping bytes up to its newline
+    skipping = False
+    async for chunk in chunks:
+        view = memoryview(chunk)
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            end = len(chunk) if newline < 0 else newline
+            if not skipping:
+                pending += view[start:end]
+                if len(pending) > max_line_bytes:
+                    yield LineTooLongError(f"Line is longer than {max_line_bytes} bytes")
+                    pending.clear()
+                    skipping = True
+            if newline < 0:
+                break
+            if skipping:
+                skipping = False
+            else:
+                yield bytes(pending)
+                pending.clear()
+            start = newline + 1
+    if pending and not skipping:
+        yield bytes(pending)
+
+
+def decode_line(line: Union[bytes, LineTooLongError]) -> str:
+    """A line from iter_lines as text; raises ValueError for an unusable line"""
+    if isinstance(line, LineTooLongError):
+        raise line
+    try:
+        return line.decode("utf-8-sig").rstrip("\r")
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Line is not valid UTF-8 (byte {e.start})") from None
+
+
+# ============================================================================
+# ROW PARSERS
+# ============================================================================
+
+class HeaderError(ValueError):
+    """The body's header is unusable, so none of its rows can be read"""
+
+
+class NdjsonRowParser:
+    """One JSON object with the six stats per line"""
+
+    def parse(self, line: str) -> Optional[Dict[str, Any]]:
+        if not line.strip():
+            return None
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Each line must be a JSON object")
+        return record
+
+
+class CsvRowParser:
+    """CSV with a header row naming at least the six stat columns"""
+
+    def __init__(self):
+        self.columns: Optional[List[str]] = None
+
+    def parse(self, line: str) -> Optional[Dict[str, Any]]:
+        if not line.strip():
+            return None
+        values = next(csv.reader([line]))
+        if self.columns is None:
+            columns = [column.strip().lower() for column in values]
+            missing = [name for name in FEATURE_NAMES if name not in columns]
+            if missing:
+                raise HeaderError(f"CSV header is missing columns: {', '.join(missing)}")
+            self.columns = columns
+            return None
+        if len(values) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} fields, got {len(values)}")
+        return dict(zip(self.columns, (value.strip() for value in values)))
+
+
+def make_row_parser(content_type: Optional[str]):
+    """Pick a parser from the request Content-Type (NDJSON unless it says CSV)"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return CsvRowParser() if media_type in CSV_CONTENT_TYPES else NdjsonRowParser()
+
+
+def to_stats(record: Dict[str, Any]) -> Tuple[PokemonStats, Dict[str, Any]]:
+    """Validate a parsed row; returns the stats and the identifying fields to echo back"""
+    stats = PokemonStats(**{name: record.get(name) for name in FEATURE_NAMES})
+    ids = {field: record[field] for field in ID_FIELDS if record.get(field) not in (None, "")}
+    return stats, ids
+
+
+def describe_row_error(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
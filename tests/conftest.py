@@ -0,0 +1,59 @@
+"""
+Shared fixtures: the API served in process through FastAPI's TestClient,
+with the repository's model artifacts.
+
+Settings are read at import time, so they are pinned here before the app
+is imported: eager startup, no micro-batching, no file watcher, no answer
+table and no on-disk training data cache, so tests neither depend on nor
+write local state. An admin token is set so the /admin endpoints exist.
+"""
+
+import os
+
+os.environ.update({
+    "STARTUP_MODE": "eager",
+    "PRELOAD_ARTIFACTS": "false",
+    "MICRO_BATCH_ENABLED": "false",
+    "MODEL_WATCH_INTERVAL_SECONDS": "0",
+    "ANSWER_TABLE_PATH": "",
+    "SHARED_ARRAYS_DIR": "",
+    "LOG_LEVEL": "WARNING",
+    "ADMIN_TOKEN": "test-admin-token",
+})
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import app
+from src.api.routes.predict import cache, state
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Client for the app, started once for the whole session"""
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def admin_client(client):
+    """The session client, sending the admin token for the duration of a test"""
+    client.headers["Authorization"] = f"Bearer {os.environ['ADMIN_TOKEN']}"
+    try:
+        yield client
+    finally:
+        del client.headers["Authorization"]
+
+
+@pytest.fixture
+def empty_cache():
+    """Start from (and leave behind) an empty response cache"""
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def current_model(client):
+    """The active model version's artifacts"""
+    return {name: state[name] for name in ('model', 'scaler', 'compiled_model', 'model_version')}
@@ -0,0 +1,38 @@
+"""/admin/logging: runtime log settings, behind the admin token"""
+
+import pytest
+
+from src.api.core.logger import get_log_level, request_debug_enabled, set_log_level, set_request_debug
+
+
+@pytest.fixture
+def restore_logging():
+    level, debug = get_log_level(), request_debug_enabled()
+    yield
+    set_log_level(level)
+    set_request_debug(debug)
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer wrong-token"])
+def test_logging_settings_require_the_token(client, restore_logging, authorization):
+    headers = {"Authorization": authorization} if authorization else {}
+    level, debug = get_log_level(), request_debug_enabled()
+
+    assert client.get("/admin/logging", headers=headers).status_code == 401
+    response = client.put("/admin/logging", json={"level": "DEBUG", "request_debug": not debug}, headers=headers)
+    assert response.status_code == 401
+    assert (get_log_level(), request_debug_enabled()) == (level, debug)
+
+
+def test_logging_settings_change_with_the_token(admin_client, restore_logging):
+    response = admin_client.put("/admin/logging", json={"level": "error", "request_debug": True})
+    assert response.status_code == 200
+    assert response.json() == {"level": "ERROR", "request_debug": True}
+    assert admin_client.get("/admin/logging").json() == response.json()
+    assert request_debug_enabled()
+
+
+def test_unknown_log_level_is_rejected(admin_client, restore_logging):
+    level = get_log_level()
+    assert admin_client.put("/admin/logging", json={"level": "LOUD"}).status_code == 422
+    assert get_log_level() == level
@@ -0,0 +1,64 @@
+"""/analyze: prediction and similar Pokémon in one call, same answers as the separate endpoints"""
+
+import pytest
+
+from src.api.routes import predict
+
+ROWS = [
+    {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80},
+    {"hp": 35, "attack": 55, "defense": 40, "sp_attack": 50, "sp_defense": 50, "speed": 90},
+    {"hp": 106, "attack": 110, "defense": 90, "sp_attack": 154, "sp_defense": 90, "speed": 130},
+]
+
+
+@pytest.mark.parametrize("stats", ROWS)
+def test_matches_separate_predict_and_similar_calls(client, empty_cache, stats):
+    response = client.post("/analyze", json=stats)
+    assert response.status_code == 200
+    body = response.json()
+
+    assert set(body) == {"prediction", "similar"}
+    assert body["prediction"] == client.post("/predict", json=stats).json()
+    assert body["similar"] == client.post("/similar-pokemon", json=stats).json()
+    assert response.headers["X-Model-Version"] == body["prediction"]["model_version"]
+
+
+def test_answers_agree_whichever_endpoint_runs_first(client, empty_cache):
+    # Both computed from a cold cache, not one served from the other's entries
+    separate = client.post("/predict", json=ROWS[0]).json(), client.post("/similar-pokemon", json=ROWS[0]).json()
+    empty_cache.clear()
+    body = client.post("/analyze", json=ROWS[0]).json()
+    assert (body["prediction"], body["similar"]) == separate
+
+
+def test_include_importance(client):
+    body = client.post("/analyze", json=ROWS[0], params={"include_importance": "true"}).json()
+    assert body["feature_importance"] == client.get("/feature-importance").json()
+
+
+def test_similar_is_omitted_without_training_data(client, empty_cache, monkeypatch):
+    async def no_training_data(name):
+        return None
+
+    monkeypatch.setattr(predict, "load_component", no_training_data)
+    body = client.post("/analyze", json=ROWS[0]).json()
+    assert "similar" not in body
+    assert body["prediction"]["prediction"] in (0, 1)
+
+
+@pytest.mark.parametrize("payload", [
+    {**ROWS[0], "hp": 0},
+    {**ROWS[0], "speed": 256},
+    {key: value for key, value in ROWS[0].items() if key != "attack"},
+    {**ROWS[0], "defense": "lots"},
+    [ROWS[0]],
+])
+def test_invalid_stats_are_422(client, payload):
+    response = client.post("/analyze", json=payload)
+    assert response.status_code == 422
+    assert response.json()["detail"] == client.post("/predict", json=payload).json()["detail"]
+
+
+def test_malformed_body_is_422(client):
+    response = client.post("/analyze", content=b"{not json", headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
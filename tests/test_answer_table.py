@@ -0,0 +1,138 @@
+"""Answer table: file round trip, validity checks and serving precomputed answers"""
+
+import numpy as np
+import pytest
+
+from src.api.core.config import FEATURE_NAMES
+from src.api.routes.predict import attach_answer_table, registry, set_answer_table, state
+from src.api.utils import answer_table
+from src.api.utils.answer_table import AnswerTable, load_answer_table, write_answer_table
+from src.api.utils.components import LazyComponent
+from src.api.utils.prediction import FALLBACK_METHOD, describe_explainer
+from src.api.utils.registry import ModelVersion
+
+ROWS = [
+    {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80},
+    {"hp": 35, "attack": 55, "defense": 40, "sp_attack": 50, "sp_defense": 50, "speed": 90},
+    {"hp": 106, "attack": 110, "defense": 90, "sp_attack": 154, "sp_defense": 90, "speed": 130},
+]
+MISS = {"hp": 1, "attack": 2, "defense": 3, "sp_attack": 4, "sp_defense": 5, "speed": 6}
+
+
+def _values(row):
+    return [row[name] for name in FEATURE_NAMES]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "table.bin")
+    entries = [
+        (_values(row), 0.1 * i, 1 - 0.1 * i, "SHAP (TreeExplainer)" if i else FALLBACK_METHOD, np.arange(6) + i)
+        for i, row in enumerate(ROWS)
+    ]
+    header = write_answer_table(path, entries, "v1", explanation_method="SHAP (TreeExplainer)")
+    table = AnswerTable.load(path)
+
+    assert len(table) == len(ROWS) == header['entries']
+    for values, probability, non_legendary, method, contributions in entries:
+        found = table.lookup(values)
+        assert found[:3] == (probability, non_legendary, method)
+        np.testing.assert_array_equal(found[3], contributions)
+    assert table.lookup(_values(MISS)) is None
+    assert (table.hits, table.misses) == (len(ROWS), 1)
+
+
+def test_load_rejects_tables_for_another_model_or_explainer(tmp_path):
+    path = str(tmp_path / "table.bin")
+    write_answer_table(path, [(_values(ROWS[0]), 0.9, 0.1, "m", np.zeros(6))], "v1", explanation_method="SHAP (TreeExplainer)")
+
+    assert load_answer_table(path, "v1", "SHAP (TreeExplainer)") is not None
+    assert load_answer_table(path, "v2", "SHAP (TreeExplainer)") is None
+    assert load_answer_table(path, "v1", FALLBACK_METHOD) is None
+    assert load_answer_table(str(tmp_path / "missing.bin"), "v1", "SHAP (TreeExplainer)") is None
+    assert load_answer_table("", "v1", "SHAP (TreeExplainer)") is None
+
+
+def test_load_rejects_other_formats(tmp_path, monkeypatch):
+    path = str(tmp_path / "table.bin")
+    monkeypatch.setattr(answer_table, "TABLE_FORMAT", answer_table.TABLE_FORMAT - 1)
+    write_answer_table(path, [(_values(ROWS[0]), 0.9, 0.1, "m", np.zeros(6))], "v1")
+    monkeypatch.undo()
+
+    with pytest.raises(ValueError):
+        AnswerTable.load(path)
+    assert load_answer_table(path, "v1", None) is None
+
+
+@pytest.fixture
+def live_table(client, tmp_path, monkeypatch, empty_cache):
+    """
+    A table of the live answers for ROWS, built for the serving model and
+    explainer and attached as the app would at startup
+    """
+    live = [client.post("/predict", json=row).json() for row in ROWS]
+    empty_cache.clear()
+    entries = [
+        (
+            _values(row), result["probability_legendary"], result["probability_non_legendary"],
+            result["explanation_method"],
+            [{c["feature"]: c["contribution"] for c in result["feature_contributions"]}[name] for name in FEATURE_NAMES]
+        )
+        for row, result in zip(ROWS, live)
+    ]
+    path = str(tmp_path / "answer_table.bin")
+    write_answer_table(path, entries, state['model_version'], explanation_method=describe_explainer(state['shap_explainer']))
+    monkeypatch.setattr("src.api.routes.predict.ANSWER_TABLE_PATH", path)
+    attach_answer_table(registry.active)
+    try:
+        yield state['answer_table'], live
+    finally:
+        set_answer_table(None)
+
+
+def test_predict_serves_precomputed_answers(client, live_table):
+    table, live = live_table
+    assert table is not None
+
+    for row, expected in zip(ROWS, live):
+        hits = table.hits
+        assert client.post("/predict", json=row).json() == expected
+        assert table.hits == hits + 1
+
+    summary = client.post("/predict", params={"detail": "probability"}, json=ROWS[0]).json()
+    assert summary["probability_non_legendary"] == live[0]["probability_non_legendary"]
+
+    batch = client.post("/predict/batch", json={"pokemon": ROWS + [MISS]}).json()["predictions"]
+    assert batch[:len(ROWS)] == live
+    assert batch[-1]["stats"] == MISS
+
+
+def test_table_built_with_another_explainer_is_not_attached(client, tmp_path, monkeypatch):
+    path = str(tmp_path / "answer_table.bin")
+    write_answer_table(path, [(_values(ROWS[0]), 0.9, 0.1, FALLBACK_METHOD, np.zeros(6))], state['model_version'], explanation_method=FALLBACK_METHOD)
+    monkeypatch.setattr("src.api.routes.predict.ANSWER_TABLE_PATH", path)
+    try:
+        attach_answer_table(registry.active)
+        assert state['answer_table'] is None
+    finally:
+        set_answer_table(None)
+
+
+def test_table_waits_for_a_deferred_explainer(client, tmp_path, monkeypatch):
+    active = registry.active
+    path = str(tmp_path / "answer_table.bin")
+    write_answer_table(path, [(_values(ROWS[0]), 0.9, 0.1, "m", np.zeros(6))], active.version, explanation_method=describe_explainer(active.shap_explainer))
+    monkeypatch.setattr("src.api.routes.predict.ANSWER_TABLE_PATH", path)
+
+    # The startup version in lazy/background mode: explainer not built yet
+    version = ModelVersion(active.version, active.model, scaler=active.scaler, feature_importance=active.feature_importance)
+    component = LazyComponent('shap_explainer', lambda: active.shap_explainer)
+    version.components['shap_explainer'] = component
+    try:
+        attach_answer_table(version)
+        assert state['answer_table'] is None
+
+        version.shap_explainer = component.get()
+        attach_answer_table(version)
+        assert state['answer_table'] is not None
+    finally:
+        set_answer_table(None)
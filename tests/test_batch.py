@@ -0,0 +1,63 @@
+"""/predict/batch: vectorized scoring, row order and batch limits"""
+
+import numpy as np
+import pytest
+
+from src.api.core.config import FEATURE_NAMES, MAX_BATCH_SIZE
+
+ROWS = [
+    {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80},
+    {"hp": 35, "attack": 55, "defense": 40, "sp_attack": 50, "sp_defense": 50, "speed": 90},
+    {"hp": 106, "attack": 110, "defense": 90, "sp_attack": 154, "sp_defense": 90, "speed": 130},
+    {"hp": 50, "attack": 20, "defense": 55, "sp_attack": 25, "sp_defense": 25, "speed": 30},
+]
+
+
+def test_batch_matches_single_predictions(client, empty_cache):
+    response = client.post("/predict/batch", json={"pokemon": ROWS})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == len(ROWS)
+
+    for row, result in zip(ROWS, body["predictions"]):
+        single = client.post("/predict", json=row).json()
+        assert result["stats"] == row
+        assert result["prediction"] == single["prediction"]
+        assert result["probability_legendary"] == pytest.approx(single["probability_legendary"], abs=1e-12)
+        assert result["explanation_method"] == single["explanation_method"]
+        batch_contributions = {c["feature"]: c["contribution"] for c in result["feature_contributions"]}
+        single_contributions = {c["feature"]: c["contribution"] for c in single["feature_contributions"]}
+        assert batch_contributions == pytest.approx(single_contributions, abs=1e-9)
+
+
+def test_batch_probabilities_match_model(client, current_model):
+    body = client.post("/predict/batch", params={"detail": "probability"}, json={"pokemon": ROWS}).json()
+    features = current_model['scaler'].transform(np.array([[row[name] for name in FEATURE_NAMES] for row in ROWS], dtype=float))
+    expected = current_model['model'].predict_proba(features)
+    classes = list(current_model['model'].classes_)
+
+    for result, probabilities in zip(body["predictions"], expected):
+        assert set(result) >= {"prediction", "probability_legendary", "probability_non_legendary", "confidence"}
+        assert "feature_contributions" not in result
+        assert result["probability_legendary"] == pytest.approx(probabilities[classes.index(1)], abs=1e-12)
+        assert result["probability_non_legendary"] == pytest.approx(probabilities[classes.index(0)], abs=1e-12)
+
+
+def test_batch_too_large_is_rejected(client):
+    response = client.post("/predict/batch", json={"pokemon": [ROWS[0]] * (MAX_BATCH_SIZE + 1)})
+    assert response.status_code == 413
+
+
+def test_empty_batch_is_rejected(client):
+    assert client.post("/predict/batch", json={"pokemon": []}).status_code == 422
+
+
+def test_invalid_row_rejects_the_batch(client):
+    rows = ROWS + [{**ROWS[0], "speed": 0}]
+    assert client.post("/predict/batch", json={"pokemon": rows}).status_code == 422
+
+
+def test_batch_model_version_header(client, current_model):
+    response = client.post("/predict/batch", json={"pokemon": ROWS[:1]})
+    assert response.headers["X-Model-Version"] == current_model['model_version']
+    assert all(result["model_version"] == current_model['model_version'] for result in response.json()["predictions"])
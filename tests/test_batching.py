@@ -0,0 +1,153 @@
+"""MicroBatcher: batching concurrent submissions, back-pressure and shutdown"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.api.routes.predict import state, start_micro_batcher, stop_micro_batcher
+from src.api.utils.batching import MicroBatcher
+from src.api.utils.executor import ExecutorSaturatedError
+
+ROWS = [
+    {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80},
+    {"hp": 35, "attack": 55, "defense": 40, "sp_attack": 50, "sp_defense": 50, "speed": 90},
+    {"hp": 106, "attack": 110, "defense": 90, "sp_attack": 154, "sp_defense": 90, "speed": 130},
+    {"hp": 50, "attack": 20, "defense": 55, "sp_attack": 25, "sp_defense": 25, "speed": 30},
+]
+
+
+def test_concurrent_submissions_share_a_batch():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process, window_ms=50, max_batch_size=8)
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == [0, 10, 20, 30, 40]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+def test_batches_are_capped_at_max_batch_size():
+    sizes = []
+
+    def process(items):
+        sizes.append(len(items))
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(process, window_ms=50, max_batch_size=2)
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == list(range(5))
+    assert max(sizes) == 2 and sum(sizes) == 5
+
+
+def test_batch_errors_reach_every_caller():
+    def process(items):
+        raise ValueError("model failed")
+
+    async def scenario():
+        batcher = MicroBatcher(process, window_ms=20)
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_full_queue_rejects_submissions():
+    release = threading.Event()
+
+    def process(items):
+        release.wait(5)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(process, window_ms=1, max_batch_size=1, max_queue_size=1)
+        batcher.start()
+        # The first item is taken into a batch, the second fills the queue
+        first = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(ExecutorSaturatedError):
+                await batcher.submit(3)
+            assert batcher.rejected == 1
+        finally:
+            release.set()
+        results = await asyncio.gather(first, second)
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_stop_fails_queued_and_in_flight_requests():
+    started = threading.Event()
+    release = threading.Event()
+
+    def process(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    async def scenario():
+        batcher = MicroBatcher(process, window_ms=1, max_batch_size=1)
+        batcher.start()
+        in_flight = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.to_thread(started.wait, 5)
+        queued = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0.01)
+        try:
+            await asyncio.wait_for(batcher.stop(), timeout=2)
+            return await asyncio.wait_for(asyncio.gather(in_flight, queued, return_exceptions=True), timeout=2)
+        finally:
+            release.set()
+
+    results = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["Micro-batcher stopped"] * 2
+
+
+def test_submit_requires_a_running_batcher():
+    async def scenario():
+        await MicroBatcher(lambda items: items).submit(1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+
+def test_predict_through_the_micro_batcher(client, empty_cache):
+    expected = [client.post("/predict", json=row).json() for row in ROWS]
+    empty_cache.clear()
+
+    batcher = client.portal.call(start_micro_batcher, 50, 8)
+    try:
+        with ThreadPoolExecutor(max_workers=len(ROWS)) as pool:
+            responses = list(pool.map(lambda row: client.post("/predict", json=row), ROWS))
+        assert batcher.items_processed == len(ROWS)
+        assert batcher.batches_processed < len(ROWS)
+    finally:
+        client.portal.call(stop_micro_batcher)
+    assert state['batcher'] is None
+
+    for response, single in zip(responses, expected):
+        assert response.status_code == 200
+        assert response.json() == single
@@ -0,0 +1,108 @@
+"""PredictionCache: LRU/TTL behaviour and invalidation on model activation"""
+
+import pytest
+
+from src.api.routes.predict import cache, registry
+from src.api.utils.cache import PredictionCache
+from src.api.utils.registry import ModelVersion
+
+KEY = (91, 134, 95, 100, 100, 80)
+STATS = dict(zip(("hp", "attack", "defense", "sp_attack", "sp_defense", "speed"), KEY))
+
+
+def test_get_after_put_hits():
+    cache = PredictionCache(capacity=4)
+    assert cache.get('predict', KEY) is None
+    cache.put('predict', KEY, "answer")
+    assert cache.get('predict', KEY) == "answer"
+    # Kinds don't share entries
+    assert cache.get('similar', KEY) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(capacity=2)
+    cache.put('predict', (1,), "a")
+    cache.put('predict', (2,), "b")
+    cache.get('predict', (1,))
+    cache.put('predict', (3,), "c")
+    assert cache.get('predict', (2,)) is None
+    assert cache.get('predict', (1,)) == "a" and cache.get('predict', (3,)) == "c"
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("src.api.utils.cache.time.monotonic", lambda: clock[0])
+    cache = PredictionCache(capacity=4, ttl_seconds=10)
+    cache.put('predict', KEY, "answer")
+    clock[0] += 5
+    assert cache.get('predict', KEY) == "answer"
+    clock[0] += 6
+    assert cache.get('predict', KEY) is None
+    assert cache.expirations == 1
+
+
+def test_zero_capacity_disables_the_cache():
+    cache = PredictionCache(capacity=0)
+    cache.put('predict', KEY, "answer")
+    assert not cache.enabled
+    assert cache.get('predict', KEY) is None
+
+
+def test_model_version_change_drops_entries():
+    cache = PredictionCache(capacity=4)
+    cache.set_model_version("v1")
+    cache.put('predict', KEY, "answer")
+    cache.set_model_version("v1")
+    assert cache.get('predict', KEY) == "answer"
+    cache.set_model_version("v2")
+    assert cache.get('predict', KEY) is None
+    assert cache.stats()["size"] == 0 and cache.invalidations == 1
+
+
+def test_repeated_predict_is_served_from_cache(client, empty_cache):
+    first = client.post("/predict", json=STATS)
+    hits = cache.hits
+    second = client.post("/predict", json=STATS)
+    assert cache.hits == hits + 1
+    assert second.json() == first.json()
+
+
+def test_repeated_similar_search_is_served_from_cache(client, empty_cache):
+    first = client.post("/similar-pokemon", json=STATS, params={"k": 3})
+    hits = cache.hits
+    second = client.post("/similar-pokemon", json=STATS, params={"k": 3})
+    assert cache.hits == hits + 1
+    assert second.json() == first.json()
+    # Other options are other entries
+    client.post("/similar-pokemon", json=STATS, params={"k": 4})
+    assert cache.hits == hits + 1
+
+
+@pytest.fixture
+def other_version(client):
+    """A second registered version (the same model under another id), removed afterwards"""
+    original = registry.active
+    version = registry.add(ModelVersion(
+        "test-version", original.model, scaler=original.scaler, compiled_model=original.compiled_model,
+        feature_importance=original.feature_importance, shap_explainer=original.shap_explainer
+    ))
+    try:
+        yield version
+    finally:
+        registry.activate(original.version)
+        registry.versions.pop(version.version, None)
+
+
+def test_activate_drops_cached_responses(client, empty_cache, other_version):
+    client.post("/predict", json=STATS)
+    assert cache.stats()["size"] == 1
+
+    registry.activate(other_version.version)
+    assert cache.stats()["size"] == 0
+    assert cache.model_version == other_version.version
+
+    response = client.post("/predict", json=STATS)
+    assert response.json()["model_version"] == other_version.version
+    assert response.headers["X-Model-Version"] == other_version.version
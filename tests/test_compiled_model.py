@@ -0,0 +1,62 @@
+"""CompiledForest: flattened tree inference must match sklearn exactly"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from src.api.utils.compiled_model import CHUNK_ROWS, CompiledForest, _check_rows, compile_model
+
+
+def _fit(model, seed=0, n_rows=300):
+    rng = np.random.default_rng(seed)
+    X = rng.integers(1, 256, size=(n_rows, 6)).astype(float)
+    y = (X.sum(axis=1) + rng.normal(0, 60, n_rows) > 800).astype(int)
+    return model.fit(X, y), X
+
+
+def test_serving_model_is_compiled(current_model):
+    assert isinstance(current_model['compiled_model'], CompiledForest)
+
+
+def test_serving_model_matches_sklearn(current_model):
+    model, scaler = current_model['model'], current_model['scaler']
+    compiled = CompiledForest.from_sklearn(model)
+    # Realistic scaled rows plus values exactly on split thresholds
+    rows = _check_rows(compiled, scaler, n_rows=CHUNK_ROWS * 3 + 5, seed=1)
+    expected = model.predict_proba(rows)
+
+    np.testing.assert_allclose(compiled.predict_proba(rows), expected, rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+    # The single-row traversal is a separate code path
+    for row, probabilities in zip(rows[::25], expected[::25]):
+        np.testing.assert_allclose(compiled.predict_proba(row)[0], probabilities, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestClassifier(n_estimators=15, random_state=0),
+    RandomForestClassifier(n_estimators=10, max_depth=3, random_state=0),
+    ExtraTreesClassifier(n_estimators=10, random_state=0),
+    DecisionTreeClassifier(random_state=0),
+])
+def test_tree_models_match_sklearn(model):
+    model, X = _fit(model)
+    compiled = compile_model(model)
+    assert compiled is not None
+    rows = np.vstack([X, _check_rows(compiled, n_rows=200, seed=2)])
+    np.testing.assert_allclose(compiled.predict_proba(rows), model.predict_proba(rows), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(compiled.classes_, model.classes_)
+
+
+def test_non_tree_models_are_not_compiled():
+    model, _ = _fit(LogisticRegression(max_iter=1000))
+    with pytest.raises(ValueError):
+        CompiledForest.from_sklearn(model)
+    assert compile_model(model) is None
+
+
+def test_failed_self_check_falls_back_to_sklearn(monkeypatch):
+    model, _ = _fit(RandomForestClassifier(n_estimators=5, random_state=0))
+    monkeypatch.setattr(CompiledForest, "predict_proba", lambda self, X: np.zeros((np.asarray(X).reshape(-1, 6).shape[0], 2)))
+    assert compile_model(model) is None
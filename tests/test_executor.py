@@ -0,0 +1,157 @@
+"""InferenceExecutor: running work off the event loop with bounded capacity"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.api.routes.predict import state
+from src.api.utils.executor import InferenceExecutor, ExecutorSaturatedError
+
+STATS = {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80}
+
+
+def test_jobs_run_in_worker_threads():
+    executor = InferenceExecutor(max_workers=2, max_pending=0)
+
+    async def scenario():
+        return await executor.run(lambda: threading.current_thread().name)
+
+    try:
+        assert asyncio.run(scenario()).startswith("inference")
+        assert executor.completed == 1 and executor.in_flight == 0
+    finally:
+        executor.shutdown()
+
+
+def test_saturated_pool_rejects_jobs():
+    executor = InferenceExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(executor.capacity)]
+        await asyncio.sleep(0.01)
+        try:
+            assert executor.saturated
+            with pytest.raises(ExecutorSaturatedError):
+                await executor.run(lambda: None)
+        finally:
+            release.set()
+        await asyncio.gather(*running)
+
+    try:
+        asyncio.run(scenario())
+        assert executor.rejected == 1 and executor.completed == 2 and executor.in_flight == 0
+    finally:
+        executor.shutdown()
+
+
+def test_job_errors_propagate_and_free_the_slot():
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+
+    def fail():
+        raise ValueError("bad row")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        return await executor.run(lambda: "ok")
+
+    try:
+        assert asyncio.run(scenario()) == "ok"
+        assert executor.failed == 1
+    finally:
+        executor.shutdown()
+
+
+
+def test_cancelled_request_keeps_its_slot_until_the_job_finishes():
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    started, release = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        request = asyncio.ensure_future(executor.run(job))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        # The worker is still busy, so the pool must still count as full
+        assert executor.in_flight == 1 and executor.saturated
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: None)
+
+        release.set()
+        while executor.in_flight:
+            await asyncio.sleep(0.001)
+        return await executor.run(lambda: "ok")
+
+    try:
+        assert asyncio.run(scenario()) == "ok"
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_cancelled_queued_job_frees_its_slot_at_once():
+    executor = InferenceExecutor(max_workers=1, max_pending=1)
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        queued = asyncio.ensure_future(executor.run(ran.append, "queued"))
+        await asyncio.sleep(0.01)
+        assert executor.in_flight == 2
+        queued.cancel()
+        await asyncio.sleep(0.01)
+        # The queued job never started, so cancelling it released its slot
+        assert executor.in_flight == 1
+        release.set()
+        await running
+
+    try:
+        asyncio.run(scenario())
+        assert ran == [] and executor.in_flight == 0
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.fixture
+def blocked_pool(client):
+    """Swap in a one-slot pool held by a blocking job for the duration of a test"""
+    original = state['executor']
+    executor = InferenceExecutor(max_workers=1, max_pending=0)
+    release = threading.Event()
+    state['executor'] = executor
+    job = client.portal.start_task_soon(executor.run, release.wait, 5)
+    try:
+        while not executor.saturated:
+            time.sleep(0.001)
+        yield executor
+    finally:
+        release.set()
+        job.result(5)
+        state['executor'] = original
+        executor.shutdown()
+
+
+def test_predict_sheds_load_when_the_pool_is_full(client, empty_cache, blocked_pool):
+    for path, payload in (("/predict", STATS), ("/predict/batch", {"pokemon": [STATS]})):
+        response = client.post(path, json=payload)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    response = client.post("/predict/stream", content=b'{"hp": 1}\n')
+    assert response.status_code == 503
+
+
+def test_event_loop_serves_while_inference_is_busy(client, blocked_pool):
+    # The pool's only worker is blocked, yet the loop still answers
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,69 @@
+"""ExactShapExplainer: exact Shapley values by coalition enumeration"""
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+from src.api.utils.explainers import ExactShapExplainer
+from src.api.utils.model_loader import SHAP_AVAILABLE, initialize_shap_explainer
+
+
+@pytest.fixture(scope="module", params=["forest", "logistic"])
+def small_model(request):
+    """(model, its class-1 probability function, background, rows to explain)"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    y = (X[:, 0] + 2 * X[:, 1] * X[:, 2] - X[:, 5] > 0).astype(int)
+    if request.param == "forest":
+        model = RandomForestClassifier(n_estimators=10, max_depth=4, random_state=0).fit(X, y)
+    else:
+        model = LogisticRegression().fit(X, y)
+    return model, (lambda x: model.predict_proba(x)[:, 1]), X[:7], rng.normal(size=(5, 6))
+
+
+def test_values_add_up_to_the_model_output(small_model):
+    _, predict_fn, background, rows = small_model
+    explainer = ExactShapExplainer(predict_fn, background, chunk_size=2)
+    phi = explainer.shap_values(rows)
+
+    assert phi.shape == rows.shape
+    assert explainer.expected_value == pytest.approx(predict_fn(background).mean(), abs=1e-12)
+    np.testing.assert_allclose(explainer.expected_value + phi.sum(axis=1), predict_fn(rows), rtol=0, atol=1e-12)
+
+
+def test_rows_equal_to_the_background_point_get_zero_values(small_model):
+    _, predict_fn, background, _ = small_model
+    explainer = ExactShapExplainer(predict_fn, background[:1])
+    np.testing.assert_allclose(explainer.shap_values(background[:1]), 0.0, atol=1e-12)
+
+
+@pytest.mark.skipif(not SHAP_AVAILABLE, reason="shap is not installed")
+def test_matches_kernel_explainer(small_model):
+    import shap
+
+    _, predict_fn, background, rows = small_model
+    exact = ExactShapExplainer(predict_fn, background)
+    # With 6 features KernelExplainer enumerates all 64 coalitions, so without
+    # L1 feature selection it solves for the exact values too
+    kernel = shap.KernelExplainer(predict_fn, background)
+
+    assert exact.expected_value == pytest.approx(float(np.asarray(kernel.expected_value).ravel()[0]), abs=1e-9)
+    np.testing.assert_allclose(
+        exact.shap_values(rows), kernel.shap_values(rows, nsamples=1000, l1_reg=False, silent=True), rtol=0, atol=1e-6
+    )
+
+
+def test_loaded_background_is_scaled_like_the_model_input(small_model, tmp_path):
+    model, _, background, _ = small_model
+    raw = background * 40 + 80
+    scaler = StandardScaler().fit(raw)
+    joblib.dump(raw, tmp_path / "background.pkl")
+
+    explainer = initialize_shap_explainer(model, str(tmp_path / "background.pkl"), mode="exact", scaler=scaler)
+    np.testing.assert_allclose(explainer.background, scaler.transform(raw))
+
+    synthetic = initialize_shap_explainer(model, str(tmp_path / "missing.pkl"), mode="exact", scaler=scaler)
+    assert np.abs(synthetic.background).max() < 10
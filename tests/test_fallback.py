@@ -0,0 +1,84 @@
+"""Fallback contributions: the vectorized batch path against the scalar /predict path"""
+
+import numpy as np
+import pytest
+
+from src.api.core.config import FEATURE_NAMES, REFERENCE_STATS
+from src.api.core.schemas import PokemonStats
+from src.api.utils.prediction import (
+    calculate_fallback_contributions, calculate_fallback_contributions_batch, fallback_contribution_values
+)
+
+REFERENCES = [[REFERENCE_STATS[label][name] for name in FEATURE_NAMES] for label in ('non_legendary', 'legendary')]
+
+
+def _rows(seed, n_random=200):
+    """Random stat lines plus the awkward ones: reference means, and equal or mirrored deviations"""
+    rng = np.random.default_rng(seed)
+    rows = [list(row) for row in rng.integers(1, 256, size=(n_random, len(FEATURE_NAMES)))]
+    for reference in REFERENCES:
+        rows.append(list(reference))
+        for delta in (1, 10, 37):
+            # Every feature the same distance above, or alternately above and below, the reference
+            rows.append([value + delta for value in reference])
+            rows.append([value + delta * (-1) ** i for i, value in enumerate(reference)])
+        # Some features exactly at the reference, the rest off it
+        mixed = list(reference)
+        mixed[1] += 20
+        mixed[4] -= 20
+        rows.append(mixed)
+    return [PokemonStats(**dict(zip(FEATURE_NAMES, map(int, row)))) for row in rows]
+
+
+@pytest.fixture(params=["model", "equal"])
+def feature_importance(request, current_model):
+    if request.param == "model":
+        importances = current_model['model'].feature_importances_
+    else:
+        # Equal weights turn equal deviations into equal contributions
+        importances = np.full(len(FEATURE_NAMES), 1 / len(FEATURE_NAMES))
+    return {'importances': np.asarray(importances, dtype=float), 'type': request.param}
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_matches_the_scalar_path_bit_for_bit(feature_importance, seed):
+    stats_list = _rows(seed)
+    rng = np.random.default_rng(seed + 100)
+    predictions = rng.integers(0, 2, size=len(stats_list)).tolist()
+    probabilities = rng.random(len(stats_list))
+    probabilities[:6] = [0.0, 1.0, 0.5, 0.2, 0.8, 0.35]
+    probabilities = probabilities.tolist()
+
+    batch = calculate_fallback_contributions_batch(stats_list, predictions, probabilities, feature_importance)
+    assert len(batch) == len(stats_list)
+    for row, stats in enumerate(stats_list):
+        scalar = calculate_fallback_contributions(stats, predictions[row], probabilities[row], feature_importance)
+        # Same features in the same order with identical floats and labels
+        assert [c.model_dump() for c in batch[row]] == [c.model_dump() for c in scalar]
+
+
+def test_values_match_the_scalar_contributions(feature_importance):
+    stats_list = _rows(3)
+    rng = np.random.default_rng(3)
+    predictions = rng.integers(0, 2, size=len(stats_list))
+    probabilities = rng.random(len(stats_list))
+    matrix = np.array([[getattr(stats, name) for name in FEATURE_NAMES] for stats in stats_list])
+
+    values = fallback_contribution_values(matrix, predictions, probabilities, feature_importance)
+    for row, stats in enumerate(stats_list):
+        scalar = calculate_fallback_contributions(stats, int(predictions[row]), float(probabilities[row]), feature_importance)
+        by_feature = {c.feature: c.contribution for c in scalar}
+        assert values[row].tolist() == [by_feature[name] for name in FEATURE_NAMES]
+
+
+def test_ties_keep_feature_order(feature_importance):
+    reference = REFERENCES[1]
+    stats = PokemonStats(**dict(zip(FEATURE_NAMES, reference)))
+    # At the reference every contribution is zero, so the order is the feature order
+    for contributions in (
+        calculate_fallback_contributions(stats, 1, 0.9, feature_importance),
+        calculate_fallback_contributions_batch([stats], [1], [0.9], feature_importance)[0]
+    ):
+        assert [c.feature for c in contributions] == list(FEATURE_NAMES)
+        assert {c.impact for c in contributions} == {"Neutral"}
+        assert all("at average" in c.explanation for c in contributions)
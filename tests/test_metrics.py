@@ -0,0 +1,100 @@
+"""/metrics: request counters and latency histograms in the Prometheus text format"""
+
+import asyncio
+import re
+
+from src.api.routes import stream
+
+STATS = {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80}
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def scrape(client):
+    """{(name, frozenset(labels)): value} for every sample, checking HELP/TYPE come first"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    samples, typed = {}, set()
+    for line in response.text.splitlines():
+        if line.startswith("# TYPE "):
+            typed.add(line.split()[2])
+            continue
+        if line.startswith("#") or not line:
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"unparseable sample: {line!r}"
+        name, labels, value = match.groups()
+        assert re.sub(r'_(bucket|sum|count)$', '', name) in typed or name in typed
+        samples[(name, frozenset(LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+def value(samples, name, **labels):
+    return samples.get((name, frozenset(labels.items())), 0.0)
+
+
+def buckets(samples, name, **labels):
+    """(upper bound, cumulative count) pairs of one histogram series, in bucket order"""
+    series = []
+    for (sample, sample_labels), count in samples.items():
+        sample_labels = dict(sample_labels)
+        bound = sample_labels.pop("le", None)
+        if sample == f"{name}_bucket" and sample_labels == labels:
+            series.append((float(bound), count))
+    return sorted(series)
+
+
+def test_requests_are_counted_and_timed_by_route(client):
+    labels = {"method": "POST", "path": "/predict"}
+    before = scrape(client)
+    for _ in range(3):
+        assert client.post("/predict", json=STATS).status_code == 200
+    assert client.post("/predict", json={**STATS, "hp": 0}).status_code == 422
+    after = scrape(client)
+
+    requests = "pokemon_api_requests_total"
+    assert value(after, requests, **labels, status="200") - value(before, requests, **labels, status="200") == 3
+    assert value(after, requests, **labels, status="422") - value(before, requests, **labels, status="422") == 1
+
+    latency = "pokemon_api_request_duration_seconds"
+    assert value(after, f"{latency}_count", **labels) - value(before, f"{latency}_count", **labels) == 4
+    assert value(after, f"{latency}_sum", **labels) > value(before, f"{latency}_sum", **labels)
+    series = buckets(after, latency, **labels)
+    counts = [count for _, count in series]
+    assert series[-1][0] == float("inf") and counts == sorted(counts)
+    assert counts[-1] == value(after, f"{latency}_count", **labels)
+
+
+def test_unmatched_paths_share_one_label(client):
+    before = scrape(client)
+    assert client.get("/no-such-page").status_code == 404
+    after = scrape(client)
+    labels = {"method": "GET", "path": "unmatched", "status": "404"}
+    assert value(after, "pokemon_api_requests_total", **labels) - value(before, "pokemon_api_requests_total", **labels) == 1
+
+
+def test_model_version_header_defaults_to_the_active_version(client, current_model):
+    assert client.get("/health").headers["X-Model-Version"] == current_model['model_version']
+
+
+def test_streamed_responses_are_timed_until_the_last_byte(client, monkeypatch):
+    async def slow_stream(chunks, content_type, detail):
+        async for _ in chunks:
+            pass
+        yield b'{"row": 0}\n'
+        await asyncio.sleep(0.3)
+        yield b'{"row": 1}\n'
+
+    monkeypatch.setattr(stream, "stream_predictions", slow_stream)
+    labels = {"method": "POST", "path": "/predict/stream"}
+    latency = "pokemon_api_request_duration_seconds"
+    before = scrape(client)
+    response = client.post("/predict/stream", content=b'{"hp": 1}\n')
+    after = scrape(client)
+
+    assert response.text.splitlines() == ['{"row": 0}', '{"row": 1}']
+    assert value(after, f"{latency}_count", **labels) - value(before, f"{latency}_count", **labels) == 1
+    assert value(after, f"{latency}_sum", **labels) - value(before, f"{latency}_sum", **labels) >= 0.3
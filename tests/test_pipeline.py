@@ -0,0 +1,53 @@
+"""InferencePipeline: the fused scaler gives exactly what the scaler's transform() gives"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import RobustScaler, StandardScaler
+
+from src.api.core.config import FEATURE_NAMES
+from src.api.core.schemas import PokemonStats
+from src.api.utils.pipeline import InferencePipeline
+
+
+def _stats(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(1, 256, size=(n_rows, len(FEATURE_NAMES))).astype(float)
+
+
+def _assert_identical(fused, unfused, stats):
+    assert fused.fused and not unfused.fused
+    rows = [PokemonStats(**dict(zip(FEATURE_NAMES, map(int, row)))) for row in stats]
+    for expected, actual in zip(unfused.score(rows), fused.score(rows)):
+        np.testing.assert_array_equal(actual, expected)
+    # In place, as the offline scorer uses it
+    features = stats.copy()
+    np.testing.assert_array_equal(fused.transform(features, out=features), unfused.transform(stats))
+
+
+@pytest.mark.parametrize("n_rows", [1, 7, 300])
+def test_served_model_fused_and_unfused_are_identical(current_model, n_rows):
+    model, scaler, compiled = current_model['model'], current_model['scaler'], current_model['compiled_model']
+    if scaler is None:
+        pytest.skip("the served model has no scaler")
+    fused = InferencePipeline(model, scaler, compiled)
+    unfused = InferencePipeline(model, scaler, compiled, fuse_scaler=False)
+    _assert_identical(fused, unfused, _stats(n_rows, seed=n_rows))
+
+
+@pytest.mark.parametrize("scaler", [
+    StandardScaler(),
+    StandardScaler(with_mean=False),
+    StandardScaler(with_std=False),
+    RobustScaler(),
+    RobustScaler(with_centering=False),
+])
+def test_fused_scalers_match_sklearn_bit_for_bit(scaler):
+    train = _stats(400, seed=1) * np.array([1.0, 0.5, 2.0, 1.5, 0.7, 3.0])
+    scaler.fit(train)
+    model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=0)
+    model.fit(scaler.transform(train), (train.sum(axis=1) > np.median(train.sum(axis=1))).astype(int))
+
+    fused = InferencePipeline(model, scaler)
+    unfused = InferencePipeline(model, scaler, fuse_scaler=False)
+    _assert_identical(fused, unfused, _stats(50, seed=2))
@@ -0,0 +1,64 @@
+"""/predict detail modes: probability, contributions (the default) and full"""
+
+import warnings
+
+import pytest
+from pydantic.warnings import PydanticDeprecatedSince20
+
+from src.api.routes import predict
+from src.api.utils.metrics import EXPLANATIONS
+
+STATS = {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80}
+
+SUMMARY_FIELDS = {"prediction", "probability_legendary", "probability_non_legendary", "confidence", "model_type", "model_version"}
+CONTRIBUTION_FIELDS = SUMMARY_FIELDS | {"stats", "feature_contributions", "explanation_method"}
+
+
+def _explanations():
+    return sum(EXPLANATIONS._values.values())
+
+
+def test_contributions_is_the_default(client):
+    default = client.post("/predict", json=STATS).json()
+    assert set(default) == CONTRIBUTION_FIELDS
+    assert default == client.post("/predict", params={"detail": "contributions"}, json=STATS).json()
+    assert default["stats"] == STATS
+    assert {c["feature"] for c in default["feature_contributions"]} == set(STATS)
+
+
+def test_probability_skips_the_explainer(client, empty_cache):
+    explained = _explanations()
+    summary = client.post("/predict", params={"detail": "probability"}, json=STATS).json()
+    assert set(summary) == SUMMARY_FIELDS
+    assert _explanations() == explained
+
+    full = client.post("/predict", json=STATS).json()
+    assert _explanations() == explained + 1
+    assert summary == {field: full[field] for field in SUMMARY_FIELDS}
+
+
+def test_full_adds_similar_pokemon(client, empty_cache):
+    contributions = client.post("/predict", json=STATS).json()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", PydanticDeprecatedSince20)
+        full = client.post("/predict", params={"detail": "full"}, json=STATS).json()
+
+    assert set(full) == CONTRIBUTION_FIELDS | {"similar_pokemon"}
+    assert {field: full[field] for field in CONTRIBUTION_FIELDS} == contributions
+    assert len(full["similar_pokemon"]) == 5
+    # The cached contributions answer is copied, not changed in place
+    assert "similar_pokemon" not in client.post("/predict", json=STATS).json()
+
+
+def test_full_without_training_data_is_503(client, empty_cache, monkeypatch):
+    async def no_training_data(name):
+        return None
+
+    monkeypatch.setattr(predict, "load_component", no_training_data)
+    assert client.post("/predict", params={"detail": "full"}, json=STATS).status_code == 503
+    assert client.post("/predict", json=STATS).status_code == 200
+
+
+@pytest.mark.parametrize("detail", ["", "everything", "FULL"])
+def test_unknown_detail_is_422(client, detail):
+    assert client.post("/predict", params={"detail": detail}, json=STATS).status_code == 422
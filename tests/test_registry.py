@@ -0,0 +1,139 @@
+"""Model registry: admin loading, hot-swap, rollback and the MODEL_DIR boundary"""
+
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.api.routes import admin
+from src.api.routes.predict import cache, registry
+from src.api.utils.model_loader import compute_model_version
+
+STATS = {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80}
+
+
+@pytest.fixture
+def model_dir(admin_client, tmp_path, monkeypatch):
+    """
+    A model directory holding a second, differently trained model. Whatever
+    a test loads is unloaded again and the original version reactivated.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 6))
+    y = (X.sum(axis=1) > 0).astype(int)
+    joblib.dump(RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0).fit(X, y), tmp_path / "candidate.pkl")
+    monkeypatch.setattr(admin, "MODEL_DIR", str(tmp_path))
+
+    original = registry.active
+    before = set(registry.versions)
+    try:
+        yield tmp_path
+    finally:
+        if original.version not in registry.versions:
+            registry.add(original)
+        registry.activate(original.version)
+        for version in set(registry.versions) - before:
+            registry.versions.pop(version)
+
+
+@pytest.mark.parametrize("path", ["../outside.pkl", "../../etc/passwd", "/etc/passwd", "nested/../../outside.pkl"])
+def test_paths_outside_model_dir_are_rejected(admin_client, model_dir, path):
+    before = registry.describe()
+    response = admin_client.post("/admin/models", json={"model_path": path})
+    assert response.status_code == 422
+    assert "inside the model directory" in response.json()["detail"]
+    assert registry.describe()["failed_loads"] == before["failed_loads"]
+
+
+def test_symlinks_out_of_model_dir_are_rejected(admin_client, model_dir, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside") / "model.pkl"
+    os.replace(model_dir / "candidate.pkl", outside)
+    os.symlink(outside, model_dir / "link.pkl")
+    assert admin_client.post("/admin/models", json={"model_path": "link.pkl"}).status_code == 422
+    for field in ("scaler_path", "feature_importance_path"):
+        response = admin_client.post("/admin/models", json={"model_path": "link.pkl", field: "../x.pkl"})
+        assert response.status_code == 422
+
+
+def test_unloadable_model_is_reported_and_the_active_one_keeps_serving(admin_client, model_dir):
+    active = registry.active.version
+    (model_dir / "broken.pkl").write_bytes(b"not a pickle")
+    response = admin_client.post("/admin/models", json={"model_path": "broken.pkl"})
+    assert response.status_code == 422
+    assert registry.active.version == active
+    assert admin_client.post("/predict", json=STATS).json()["model_version"] == active
+
+
+def test_hot_swap_and_rollback(admin_client, model_dir, empty_cache):
+    original = registry.active.version
+    candidate = compute_model_version(str(model_dir / "candidate.pkl"))
+    assert candidate != original
+    admin_client.post("/predict", json=STATS)
+
+    response = admin_client.post("/admin/models", json={"model_path": "candidate.pkl"})
+    assert response.status_code == 200
+    assert response.json()["active"] == candidate
+    # Answers cached for the previous model are gone
+    assert cache.stats()["size"] == 0
+
+    swapped = admin_client.post("/predict", json=STATS)
+    assert swapped.json()["model_version"] == candidate
+    assert swapped.headers["X-Model-Version"] == candidate
+    listed = admin_client.get("/admin/models").json()
+    assert listed["active"] == candidate
+    assert [v["version"] for v in listed["versions"]] == [candidate, original]
+
+    rolled_back = admin_client.post(f"/admin/models/{original}/activate")
+    assert rolled_back.status_code == 200 and rolled_back.json()["active"] == original
+    assert admin_client.post("/predict", json=STATS).json()["model_version"] == original
+
+
+def test_load_without_activating(admin_client, model_dir):
+    original = registry.active.version
+    response = admin_client.post("/admin/models", json={"model_path": "candidate.pkl", "activate": False})
+    assert response.status_code == 200
+    assert response.json()["active"] == original
+    assert response.json()["loaded"]["version"] in registry.versions
+    assert admin_client.post("/predict", json=STATS).json()["model_version"] == original
+
+
+def test_activating_an_unknown_version_is_404(admin_client):
+    assert admin_client.post("/admin/models/not-a-version/activate").status_code == 404
+
+
+def test_swapped_out_version_drains_before_unloading(admin_client, model_dir, monkeypatch):
+    monkeypatch.setattr(registry, "keep", 0)
+    original = registry.active
+    with registry.use() as pinned:
+        assert admin_client.post("/admin/models", json={"model_path": "candidate.pkl"}).status_code == 200
+        # A request still scoring on the old version keeps it alive
+        assert pinned is original and registry.active is not original
+        assert original.version not in registry.versions
+        assert original in registry.draining
+    assert original not in registry.draining
+
+
+ADMIN_REQUESTS = [
+    ("get", "/admin/models", None),
+    ("post", "/admin/models", {"model_path": "candidate.pkl"}),
+    ("post", "/admin/models/any-version/activate", None),
+]
+
+
+@pytest.mark.parametrize("method,path,body", ADMIN_REQUESTS)
+@pytest.mark.parametrize("authorization", [None, "Bearer wrong-token", "test-admin-token", "Basic test-admin-token"])
+def test_admin_endpoints_require_the_token(client, method, path, body, authorization):
+    swaps = registry.swaps
+    headers = {"Authorization": authorization} if authorization else {}
+    response = client.request(method, path, json=body, headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    assert registry.swaps == swaps
+
+
+@pytest.mark.parametrize("method,path,body", ADMIN_REQUESTS)
+def test_admin_endpoints_are_off_without_a_configured_token(admin_client, monkeypatch, method, path, body):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    assert admin_client.request(method, path, json=body).status_code == 404
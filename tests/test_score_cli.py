@@ -0,0 +1,138 @@
+"""Offline batch scorer: same answers as the API, chunk by chunk, CSV and Parquet"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.cli import score
+from src.api.core.config import FEATURE_NAMES
+from src.api.utils.prediction import FALLBACK_METHOD
+
+ROWS = [
+    {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80},
+    {"hp": 35, "attack": 55, "defense": 40, "sp_attack": 50, "sp_defense": 50, "speed": 90},
+    {"hp": 106, "attack": 110, "defense": 90, "sp_attack": 154, "sp_defense": 90, "speed": 130},
+    {"hp": 50, "attack": 20, "defense": 55, "sp_attack": 25, "sp_defense": 25, "speed": 30},
+]
+
+requires_parquet = pytest.mark.skipif(not score.PARQUET_AVAILABLE, reason="pyarrow is not installed")
+
+
+def _roster(n_rows=12):
+    """ROWS repeated, with a name column, upper-case headers and a few invalid rows"""
+    records = []
+    for i in range(n_rows):
+        record = {name.upper(): value for name, value in ROWS[i % len(ROWS)].items()}
+        if i % 5 == 4:
+            record["HP"] = 0
+        records.append({"Name": f"{i:03d}", **record})
+    return pd.DataFrame(records)
+
+
+def _stats(frame):
+    return [{name: int(frame.loc[i, name.upper()]) for name in FEATURE_NAMES} for i in frame.index]
+
+
+def test_csv_matches_the_api(client, tmp_path):
+    roster = _roster()
+    roster.to_csv(tmp_path / "in.csv", index=False)
+    summary = score.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), chunk_size=5)
+    out = pd.read_csv(tmp_path / "out.csv", dtype={"name": str})
+
+    assert summary["rows"] == len(roster) and summary["errors"] == 2
+    # Extra columns are copied as they were written
+    assert out["name"].tolist() == roster["Name"].tolist()
+
+    valid = out["error"].isna()
+    assert out.loc[~valid, "prediction"].isna().all()
+    expected = client.post(
+        "/predict/batch", params={"detail": "probability"}, json={"pokemon": _stats(roster[valid.to_numpy()])}
+    ).json()["predictions"]
+    np.testing.assert_allclose(out.loc[valid, "probability_legendary"], [e["probability_legendary"] for e in expected], rtol=0, atol=1e-12)
+    assert out.loc[valid, "prediction"].tolist() == [e["prediction"] for e in expected]
+    assert out.loc[valid, "confidence"].tolist() == [e["confidence"] for e in expected]
+
+
+def test_contributions_and_neighbors_match_the_api(client, tmp_path):
+    roster = _roster(4)
+    roster.to_csv(tmp_path / "in.csv", index=False)
+    score.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), contributions=True, neighbors=3)
+    out = pd.read_csv(tmp_path / "out.csv")
+
+    for i, stats in enumerate(_stats(roster)):
+        single = client.post("/predict", json=stats).json()
+        contributions = {c["feature"]: c["contribution"] for c in single["feature_contributions"]}
+        for name in FEATURE_NAMES:
+            assert out.loc[i, f"contribution_{name}"] == pytest.approx(contributions[name], abs=1e-9)
+        assert out.loc[i, "explanation_method"] == single["explanation_method"]
+
+        similar = client.post("/similar-pokemon", json=stats, params={"k": 3}).json()["similar_pokemon"]
+        assert out.loc[i, "similar_pokemon"].split(";") == [item["name"] for item in similar]
+
+
+@requires_parquet
+@pytest.mark.parametrize("source", ["csv", "parquet"])
+@pytest.mark.parametrize("extras", [False, True])
+def test_parquet_output_with_an_all_null_first_chunk(tmp_path, source, extras):
+    # The first chunk is all invalid and its 'note' column all null, so
+    # nothing in it says what type 'note' or the result columns have
+    roster = _roster(30)
+    roster.loc[:9, "HP"] = 0
+    roster["note"] = [None] * 10 + [f"n{i}" for i in range(20)]
+    path = tmp_path / f"in.{source}"
+    if source == "csv":
+        roster.to_csv(path, index=False)
+    else:
+        roster.to_parquet(path, index=False)
+
+    options = {"contributions": True, "neighbors": 2} if extras else {}
+    summary = score.run(str(path), str(tmp_path / "out.parquet"), chunk_size=10, **options)
+    out = pd.read_parquet(tmp_path / "out.parquet")
+    schema = score.pq.read_schema(tmp_path / "out.parquet")
+
+    assert summary["rows"] == len(out) == 30
+    assert out["note"].tolist() == roster["note"].tolist()
+    assert out["prediction"].isna().sum() == summary["errors"]
+    assert str(schema.field("prediction").type) == "int64"
+    assert str(schema.field("probability_legendary").type) == "double"
+    assert str(schema.field("note").type) in ("string", "large_string")
+    if extras:
+        assert str(schema.field("contribution_hp").type) == "double"
+        assert (out["similar_pokemon"].notna() == out["prediction"].notna()).all()
+
+
+@requires_parquet
+def test_parquet_input_types_are_kept(tmp_path):
+    roster = _roster(6)
+    roster["weight"] = np.linspace(1.5, 9.0, 6)
+    roster.to_parquet(tmp_path / "in.parquet", index=False)
+    score.run(str(tmp_path / "in.parquet"), str(tmp_path / "out.parquet"), chunk_size=4)
+
+    schema = score.pq.read_schema(tmp_path / "out.parquet")
+    assert str(schema.field("hp").type) == "int64"
+    assert str(schema.field("weight").type) == "double"
+    assert pd.read_parquet(tmp_path / "out.parquet")["weight"].tolist() == roster["weight"].tolist()
+
+
+@pytest.mark.parametrize("names", [("in.csv", "out.parquet"), ("in.parquet", "out.csv")])
+def test_parquet_without_pyarrow_is_a_clear_error(tmp_path, monkeypatch, names):
+    monkeypatch.setattr(score, "PARQUET_AVAILABLE", False)
+    for name in ("pa", "pq"):
+        monkeypatch.delattr(score, name, raising=False)
+    _roster(4).to_csv(tmp_path / "in.csv", index=False)
+    source, target = names
+    with pytest.raises(SystemExit, match="pyarrow"):
+        score.run(str(tmp_path / source), str(tmp_path / target))
+    assert not (tmp_path / target).exists()
+
+
+def test_fallback_contributions_without_an_explainer(tmp_path):
+    roster = _roster(8)
+    roster.to_csv(tmp_path / "in.csv", index=False)
+    score.run(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), contributions=True, explanation_mode="none")
+    out = pd.read_csv(tmp_path / "out.csv")
+
+    valid = out["error"].isna()
+    assert (out.loc[valid, "explanation_method"] == FALLBACK_METHOD).all()
+    assert out.loc[~valid, "explanation_method"].isna().all()
+    assert out.loc[valid, [f"contribution_{name}" for name in FEATURE_NAMES]].abs().sum(axis=1).gt(0).all()
@@ -0,0 +1,138 @@
+"""/similar-pokemon and SimilarityIndex: top-k order, metrics and filters"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.core.config import FEATURE_NAMES, MAX_SIMILAR_K
+from src.api.utils.similarity import SimilarityIndex
+
+STATS = {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80}
+
+
+@pytest.fixture(scope="module")
+def index():
+    """A small index with many exact duplicates, so ties fall on the k cut-off"""
+    rng = np.random.default_rng(0)
+    base = rng.integers(1, 256, size=(40, len(FEATURE_NAMES)))
+    stats = np.vstack([base, base[::2], base[::3]])
+    data = pd.DataFrame(stats, columns=FEATURE_NAMES)
+    data['Name'] = [f"p{i}" for i in range(len(data))]
+    data['legendary'] = rng.integers(0, 2, size=len(data))
+    return SimilarityIndex.from_dataframe(data), data
+
+
+def _brute_force(data, query, k, legendary=None, min_bst=None, max_bst=None):
+    """Original row numbers of the k nearest rows: a stable sort over exact distances"""
+    stats = data[FEATURE_NAMES].to_numpy(dtype=float)
+    distances = np.sqrt(((stats - np.asarray(query, dtype=float)) ** 2).sum(axis=1))
+    bst = stats.sum(axis=1)
+    keep = np.ones(len(data), dtype=bool)
+    if legendary is not None:
+        keep &= data['legendary'].to_numpy() == int(legendary)
+    if min_bst is not None:
+        keep &= bst >= min_bst
+    if max_bst is not None:
+        keep &= bst <= max_bst
+    rows = np.flatnonzero(keep)
+    order = rows[np.argsort(distances[rows], kind='stable')][:k]
+    return order, distances[order]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"legendary": True},
+    {"legendary": False},
+    {"min_bst": 600},
+    {"max_bst": 700, "legendary": False},
+    {"min_bst": 650, "max_bst": 800},
+    {"min_bst": 5000},
+])
+@pytest.mark.parametrize("k", [1, 3, 5, 17, 200])
+def test_euclidean_matches_a_stable_brute_force_sort(index, filters, k):
+    index, data = index
+    rng = np.random.default_rng(k)
+    # Queries on existing rows put duplicates at equal distance
+    queries = [data.loc[i, FEATURE_NAMES].to_numpy() for i in (0, 3, 7)] + list(rng.integers(1, 256, size=(3, 6)))
+    for query in queries:
+        found, distances = index.query(query, k=k, **filters)
+        expected, expected_distances = _brute_force(data, query, k, **filters)
+        np.testing.assert_array_equal(index.row_ids[found], expected)
+        np.testing.assert_allclose(distances, expected_distances, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("metric", ["standardized", "cosine"])
+def test_other_metrics_return_the_nearest_rows_in_order(index, metric):
+    index, data = index
+    stats = data[FEATURE_NAMES].to_numpy(dtype=float)
+    query = np.array([80, 120, 70, 60, 90, 100], dtype=float)
+    if metric == "standardized":
+        scale = stats.std(axis=0)
+        exact = np.sqrt((((stats - query) / scale) ** 2).sum(axis=1))
+    else:
+        exact = 1 - (stats @ query) / (np.linalg.norm(stats, axis=1) * np.linalg.norm(query))
+
+    found, distances = index.query(query, k=8, metric=metric)
+    np.testing.assert_allclose(distances, exact[index.row_ids[found]], rtol=0, atol=1e-9)
+    assert np.all(np.diff(distances) >= -1e-6)
+    np.testing.assert_allclose(distances, np.sort(exact)[:8], rtol=0, atol=1e-5)
+
+
+def test_unknown_metric_is_rejected(index):
+    with pytest.raises(ValueError):
+        index[0].query(list(STATS.values()), metric="manhattan")
+
+
+def test_default_search(client):
+    body = client.post("/similar-pokemon", json=STATS).json()
+    assert body["count"] == len(body["similar_pokemon"]) == 5
+    distances = [item["distance"] for item in body["similar_pokemon"]]
+    assert distances == sorted(distances)
+
+
+def test_k_and_filters(client):
+    params = {"k": 12, "legendary": "true", "min_bst": 500, "max_bst": 620}
+    body = client.post("/similar-pokemon", json=STATS, params=params).json()
+    assert 0 < body["count"] <= 12
+    for item in body["similar_pokemon"]:
+        assert item["legendary"] == 1
+        assert 500 <= item["bst"] <= 620
+
+    non_legendary = client.post("/similar-pokemon", json=STATS, params={"k": 20, "legendary": "false"}).json()
+    assert {item["legendary"] for item in non_legendary["similar_pokemon"]} == {0}
+
+
+def test_bst_bounds_are_inclusive(client):
+    first = client.post("/similar-pokemon", json=STATS, params={"k": 1}).json()["similar_pokemon"][0]
+    bst = first["bst"]
+    body = client.post("/similar-pokemon", json=STATS, params={"k": 1, "min_bst": bst, "max_bst": bst}).json()
+    assert body["similar_pokemon"] == [first]
+
+
+def test_metric_changes_the_ranking_space(client):
+    euclidean = client.post("/similar-pokemon", json=STATS, params={"k": 10}).json()
+    cosine = client.post("/similar-pokemon", json=STATS, params={"k": 10, "metric": "cosine"}).json()
+    assert all(0 <= item["distance"] <= 2 for item in cosine["similar_pokemon"])
+    assert cosine != euclidean
+
+
+def test_empty_bst_range_returns_nothing(client):
+    body = client.post("/similar-pokemon", json=STATS, params={"min_bst": 1500}).json()
+    assert body == {"similar_pokemon": [], "count": 0}
+
+
+@pytest.mark.parametrize("params", [
+    {"min_bst": 600, "max_bst": 500},
+    {"k": 0},
+    {"k": MAX_SIMILAR_K + 1},
+    {"metric": "manhattan"},
+    {"min_bst": -1},
+])
+def test_invalid_options_are_422(client, params):
+    assert client.post("/similar-pokemon", json=STATS, params=params).status_code == 422
+
+
+def test_full_detail_uses_the_default_search(client):
+    similar = client.post("/similar-pokemon", json=STATS).json()["similar_pokemon"]
+    full = client.post("/predict", params={"detail": "full"}, json=STATS).json()
+    assert full["similar_pokemon"] == similar
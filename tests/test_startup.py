@@ -0,0 +1,112 @@
+"""STARTUP_MODE background and lazy: serving before the explainer and training data are loaded"""
+
+import threading
+import time
+
+import pytest
+
+from src.api import app as app_module
+from src.api.routes.predict import cache, components_ready, registry, state
+from src.api.utils.prediction import FALLBACK_METHOD
+
+STATS = {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80}
+
+
+@pytest.fixture
+def deferred_startup(client, empty_cache, monkeypatch):
+    """
+    Rerun load_artifacts in a deferred mode with loaders that record their
+    calls and wait for `release` before building anything. Afterwards the
+    eagerly loaded version and training data are put back.
+    """
+    original, training_data = registry.active, state['training_data']
+    components = dict(state['components'])
+    release = threading.Event()
+    calls = []
+
+    def gated(name, loader):
+        def load(*args, **kwargs):
+            calls.append(name)
+            assert release.wait(5), f"{name} was never released"
+            return loader(*args, **kwargs)
+        return load
+
+    monkeypatch.setattr(app_module, "initialize_shap_explainer", gated('shap_explainer', app_module.initialize_shap_explainer))
+    monkeypatch.setattr(app_module, "load_training_data", gated('training_data', app_module.load_training_data))
+
+    def start(mode):
+        app_module.load_artifacts(mode)
+        return registry.active
+
+    try:
+        yield start, release, calls
+    finally:
+        release.set()
+        deadline = time.monotonic() + 5
+        while not components_ready() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        registry.add(original)
+        registry.activate(original.version)
+        state['training_data'] = training_data
+        state['components'].clear()
+        state['components'].update(components)
+        cache.clear()
+
+
+def _wait_until_ready(timeout=5):
+    deadline = time.monotonic() + timeout
+    while not components_ready():
+        assert time.monotonic() < deadline, "deferred components never finished loading"
+        time.sleep(0.01)
+
+
+def test_background_mode_serves_predictions_before_the_explainer_loads(client, deferred_startup):
+    start, release, calls = deferred_startup
+    version = start("background")
+    while len(calls) < 2:
+        time.sleep(0.001)
+
+    health = client.get("/health").json()
+    assert health["ready"] is False
+    assert health["components"]["shap_explainer"]["status"] == "loading"
+
+    response = client.post("/predict", json=STATS)
+    assert response.status_code == 200
+    assert response.json()["explanation_method"] == FALLBACK_METHOD
+    assert response.json()["model_version"] == version.version
+    # Fallback answers given while SHAP loads are not cached
+    assert cache.stats()["size"] == 0
+    assert client.post("/similar-pokemon", json=STATS).status_code == 503
+
+    release.set()
+    _wait_until_ready()
+    assert client.get("/health").json()["ready"] is True
+    explained = client.post("/predict", json=STATS).json()
+    assert explained["explanation_method"].startswith("SHAP")
+    assert explained["prediction"] == response.json()["prediction"]
+    assert client.post("/similar-pokemon", json=STATS).status_code == 200
+    assert sorted(calls) == ['shap_explainer', 'training_data']
+
+
+def test_lazy_mode_loads_on_the_first_request(client, deferred_startup):
+    start, release, calls = deferred_startup
+    release.set()
+    start("lazy")
+
+    assert calls == []
+    health = client.get("/health").json()
+    assert health["components"]["shap_explainer"]["status"] == "pending"
+    assert health["components"]["training_data"]["status"] == "pending"
+
+    assert client.post("/predict", json=STATS).json()["explanation_method"].startswith("SHAP")
+    assert calls == ['shap_explainer']
+    assert client.get("/health").json()["components"]["shap_explainer"]["status"] == "ready"
+
+    assert client.post("/similar-pokemon", json=STATS).json()["count"] == 5
+    assert calls == ['shap_explainer', 'training_data']
+
+    # Loaded once; later requests reuse it
+    cache.clear()
+    client.post("/predict", json={**STATS, "hp": 92})
+    client.post("/similar-pokemon", json={**STATS, "hp": 92})
+    assert calls == ['shap_explainer', 'training_data']
@@ -0,0 +1,144 @@
+"""/predict/stream: NDJSON and CSV bodies scored in chunks, one result line per row"""
+
+import asyncio
+import json
+
+import pytest
+from starlette.background import BackgroundTask
+
+from src.api.core.config import FEATURE_NAMES, STREAM_MAX_LINE_BYTES
+from src.api.core.schemas import ResponseDetail
+from src.api.routes.stream import DuplexStreamingResponse, stream_predictions
+from src.api.utils.streaming import LineTooLongError, decode_line, iter_lines
+
+ROWS = [
+    {"hp": 91, "attack": 134, "defense": 95, "sp_attack": 100, "sp_defense": 100, "speed": 80},
+    {"hp": 35, "attack": 55, "defense": 40, "sp_attack": 50, "sp_defense": 50, "speed": 90},
+    {"hp": 106, "attack": 110, "defense": 90, "sp_attack": 154, "sp_defense": 90, "speed": 130},
+    {"hp": 50, "attack": 20, "defense": 55, "sp_attack": 25, "sp_defense": 25, "speed": 30},
+]
+
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_rows_are_scored_in_order(client):
+    records = [{**ROWS[0], "name": "a"}, ROWS[1], {**ROWS[2], "hp": 0}, ROWS[3], {**ROWS[1], "id": 7}]
+    body = "\n".join(json.dumps(record) for record in records[:2]) + "\n\n" + "\n".join(json.dumps(record) for record in records[2:])
+
+    lines = _lines(client.post("/predict/stream", content=body.encode()))
+    expected = client.post("/predict/batch", json={"pokemon": [ROWS[0], ROWS[1], ROWS[3], ROWS[1]]}).json()["predictions"]
+
+    assert [line["row"] for line in lines] == [0, 1, 2, 3, 4]
+    assert lines[0]["name"] == "a" and lines[4]["id"] == 7
+    assert "error" in lines[2] and "prediction" not in lines[2]
+    for line, result in zip([lines[0], lines[1], lines[3], lines[4]], expected):
+        assert {key: line[key] for key in result} == result
+
+
+def test_rows_keep_their_order_across_chunks(client):
+    records = [ROWS[i % len(ROWS)] if i % 3 else {"hp": "x"} for i in range(7)]
+    # Arbitrary byte boundaries, as a network read would deliver them
+    payload = "".join(json.dumps(record) + "\n" for record in records).encode()
+
+    async def read_stream():
+        async def chunks():
+            for start in range(0, len(payload), 13):
+                yield payload[start:start + 13]
+        return [json.loads(line) async for line in stream_predictions(chunks(), None, chunk_size=2, detail=ResponseDetail.probability)]
+
+    lines = client.portal.call(read_stream)
+    assert [line["row"] for line in lines] == list(range(7))
+    assert [("error" in line) for line in lines] == [i % 3 == 0 for i in range(7)]
+
+
+def test_csv_body(client):
+    header = ",".join(["name"] + [name.upper() for name in FEATURE_NAMES])
+    rows = [",".join([f"p{i}"] + [str(row[name]) for name in FEATURE_NAMES]) for i, row in enumerate(ROWS)]
+    body = "\r\n".join([header] + rows + ["x,1,2"]) + "\r\n"
+
+    lines = _lines(client.post(
+        "/predict/stream", params={"detail": "probability"},
+        content=body.encode(), headers={"Content-Type": "text/csv"}
+    ))
+    expected = client.post("/predict/batch", params={"detail": "probability"}, json={"pokemon": ROWS}).json()["predictions"]
+
+    assert [line["name"] for line in lines[:len(ROWS)]] == ["p0", "p1", "p2", "p3"]
+    for line, result in zip(lines, expected):
+        assert {key: line[key] for key in result} == result
+    assert "error" in lines[-1]
+
+
+def test_csv_without_stat_columns_stops_with_an_error(client):
+    lines = _lines(client.post("/predict/stream", content=b"name,hp\nx,1\n", headers={"Content-Type": "text/csv"}))
+    assert len(lines) == 1
+    assert lines[0]["row"] is None and "missing columns" in lines[0]["error"]
+
+
+def _iter_lines(payload, chunk_bytes, **kwargs):
+    async def collect():
+        async def chunks():
+            for start in range(0, len(payload), chunk_bytes):
+                yield payload[start:start + chunk_bytes]
+        return [line async for line in iter_lines(chunks(), **kwargs)]
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 3, 7, 1000])
+def test_overlong_lines_are_replaced_by_an_error(chunk_bytes):
+    payload = b"short\n" + b"x" * 25 + b"\nexactly-ten\n\n" + b"y" * 11 + b"\r\nlast"
+    lines = _iter_lines(payload, chunk_bytes, max_line_bytes=11)
+
+    assert lines[0] == b"short"
+    assert isinstance(lines[1], LineTooLongError)
+    assert lines[2:4] == [b"exactly-ten", b""]
+    # The \r counts towards the limit; it is only stripped when decoding
+    assert isinstance(lines[4], LineTooLongError)
+    assert lines[5:] == [b"last"]
+
+
+def test_decode_line():
+    assert decode_line(b"\xef\xbb\xbfhp,attack\r") == "hp,attack"
+    with pytest.raises(ValueError, match="UTF-8"):
+        decode_line(b'{"hp": "\xff"}')
+    with pytest.raises(ValueError, match="longer than"):
+        decode_line(LineTooLongError("Line is longer than 10 bytes"))
+
+
+def test_bad_lines_become_error_rows(client):
+    body = (
+        json.dumps(ROWS[0]).encode() + b"\n"
+        + b'{"hp": "\xff\xfe"}\n'
+        + b'{"name": "' + b"z" * (STREAM_MAX_LINE_BYTES + 10) + b'"}\n'
+        + json.dumps(ROWS[1]).encode() + b"\n"
+    )
+    lines = _lines(client.post("/predict/stream", content=body))
+
+    assert [line["row"] for line in lines] == [0, 1, 2, 3]
+    assert "UTF-8" in lines[1]["error"] and "longer than" in lines[2]["error"]
+    assert "prediction" in lines[0] and "prediction" in lines[3]
+
+
+def test_background_tasks_run_after_the_stream():
+    ran = []
+
+    async def body():
+        yield b"a\n"
+        ran.append("body")
+
+    async def scenario():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        response = DuplexStreamingResponse(body(), media_type="application/x-ndjson", background=BackgroundTask(ran.append, "background"))
+        await response({"type": "http"}, None, send)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert ran == ["body", "background"]
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
@@ -0,0 +1,102 @@
+"""load_training_data: the memory-mapped index cache in SHARED_ARRAYS_DIR"""
+
+import mmap
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.core.config import FEATURE_NAMES
+from src.api.utils import model_loader
+from src.api.utils.similarity import SimilarityIndex
+
+
+def _training_data(n_rows=30, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.integers(1, 256, size=(n_rows, len(FEATURE_NAMES))), columns=FEATURE_NAMES)
+    data['Name'] = [f"p{seed}-{i}" for i in range(n_rows)]
+    data['legendary'] = rng.integers(0, 2, size=n_rows)
+    return data
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    """A training data pickle, with a count of how often the index gets built from it"""
+    path = tmp_path / "training_data.pkl"
+    joblib.dump(_training_data(), path)
+    builds = []
+    build = model_loader.build_similarity_index
+
+    def counting_build(data):
+        builds.append(len(data))
+        return build(data)
+
+    monkeypatch.setattr(model_loader, "build_similarity_index", counting_build)
+    return path, builds
+
+
+def _load(path, shared_dir):
+    return model_loader.load_training_data(str(path), shared_dir=str(shared_dir))
+
+
+def _is_memory_mapped(index):
+    """Whether the index's stats live in a mapped file (the index keeps plain views of it)"""
+    array = index.stats
+    while isinstance(array, np.ndarray):
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+
+def test_unchanged_pickle_is_served_from_the_cache(source, tmp_path):
+    path, builds = source
+    first = _load(path, tmp_path / "cache")
+    assert builds == [30] and _is_memory_mapped(first)
+    assert SimilarityIndex.read_meta(str(tmp_path / "cache"))['layout'] == model_loader.INDEX_LAYOUT_VERSION
+
+    # Rewriting the same contents (a new mtime) is still a hit: the cache is keyed on the hash
+    joblib.dump(_training_data(), path)
+    second = _load(path, tmp_path / "cache")
+    assert builds == [30] and _is_memory_mapped(second)
+    np.testing.assert_array_equal(second.stats, first.stats)
+    assert list(second.names) == list(first.names)
+
+
+def test_changed_contents_rebuild_the_cache(source, tmp_path):
+    path, builds = source
+    _load(path, tmp_path / "cache")
+    joblib.dump(_training_data(n_rows=12, seed=1), path)
+
+    index = _load(path, tmp_path / "cache")
+    assert builds == [30, 12] and len(index) == 12
+    assert set(index.names) == {f"p1-{i}" for i in range(12)}
+    # The rebuilt cache is the one served next time
+    assert len(_load(path, tmp_path / "cache")) == 12 and builds == [30, 12]
+
+
+def test_layout_version_change_rebuilds_the_cache(source, tmp_path, monkeypatch):
+    path, builds = source
+    _load(path, tmp_path / "cache")
+    monkeypatch.setattr(model_loader, "INDEX_LAYOUT_VERSION", model_loader.INDEX_LAYOUT_VERSION + 1)
+
+    index = _load(path, tmp_path / "cache")
+    assert builds == [30, 30] and _is_memory_mapped(index)
+    assert SimilarityIndex.read_meta(str(tmp_path / "cache"))['layout'] == model_loader.INDEX_LAYOUT_VERSION
+
+
+def test_unwritable_cache_directory_keeps_the_index_in_memory(source, tmp_path):
+    path, builds = source
+    # A directory can't be created under a regular file, even as root
+    (tmp_path / "not-a-directory").write_text("")
+    index = _load(path, tmp_path / "not-a-directory" / "cache")
+
+    assert index is not None and len(index) == 30 and not _is_memory_mapped(index)
+    assert _load(path, tmp_path / "not-a-directory" / "cache") is not None
+    assert builds == [30, 30]
+
+
+def test_without_a_cache_directory_nothing_is_written(source, tmp_path):
+    path, builds = source
+    index = model_loader.load_training_data(str(path), shared_dir="")
+    assert len(index) == 30 and not _is_memory_mapped(index)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["training_data.pkl"]